@@ -0,0 +1,86 @@
+// Microbenchmark de generateMessage (mensajes/segundo por escenario).
+//
+//   node scripts/bench-chat-generator.mjs [iteraciones] [--seed <n>]
+//
+// Carga src/lib/chatGenerator.ts con el SSR de Vite (dependencia de Astro),
+// así que mide el mismo código que sirve /api/chat-stream. Para comparar
+// antes/después basta con ejecutarlo en cada commit.
+//
+// Con --seed cada escenario usa una sesión con esa semilla (como un stream
+// SSE: PRNG xoshiro128**, pool de usernames propio, ids monótonos) e imprime
+// un checksum de id, username, contenido y categoría de todos los mensajes.
+// Dos ejecuciones con la misma semilla deben dar los mismos checksums.
+
+import { parseArgs } from 'node:util';
+import { createServer } from 'vite';
+
+const { values: args, positionals } = parseArgs({
+  allowPositionals: true,
+  options: { seed: { type: 'string' } },
+});
+
+const ITERATIONS = Number(positionals[0]) || 1_000_000;
+const WARMUP = 50_000;
+const SEED = args.seed !== undefined ? Number(args.seed) >>> 0 : null;
+
+const server = await createServer({
+  appType: 'custom',
+  logLevel: 'error',
+  server: { middlewareMode: true, hmr: false },
+});
+
+try {
+  const { generateMessage } = await server.ssrLoadModule('/src/lib/chatGenerator.ts');
+  const { setCachedPhrases } = await server.ssrLoadModule('/src/lib/phraseCache.ts');
+  const { createStreamSession } = await server.ssrLoadModule('/src/lib/streamSession.ts');
+  const { hashString } = await server.ssrLoadModule('/src/lib/random.ts');
+
+  // Sin semilla: camino sin sesión (Math.random). Con semilla: sesión nueva por pasada
+  const newSession = () => (SEED === null ? undefined : createStreamSession(SEED));
+
+  // Juego "generado por IA" con el tamaño típico de una respuesta real
+  const list = (n, build) => Array.from({ length: n }, (_, i) => build(i));
+  setCachedPhrases('hollow knight', {
+    gameplay: list(200, (i) => `Jugada ${i} en Hollow Knight`),
+    reactions: list(60, (i) => `JAJAJA ${i}`),
+    questions: list(120, (i) => `Pregunta ${i}?`),
+    usernames: list(180, (i) => `viewer_${i}`),
+  }, 'bench');
+
+  const scenarios = [
+    ['hardcodeado (minecraft)', 'Minecraft', 'game'],
+    ['cache IA (hollow knight)', 'Hollow Knight', 'game'],
+    ['sin frases (fallback)', 'Juego Desconocido', 'game'],
+    ['just chatting', 'Charla con el chat', 'justchatting'],
+  ];
+
+  const seedLabel = SEED === null ? '' : `, semilla ${SEED}`;
+  console.log(`${ITERATIONS.toLocaleString()} mensajes por escenario${seedLabel}\n`);
+  for (const [label, game, mode] of scenarios) {
+    const warmupSession = newSession();
+    for (let i = 0; i < WARMUP; i++) generateMessage(game, mode, warmupSession);
+
+    const session = newSession();
+    const start = performance.now();
+    let bytes = 0;
+    for (let i = 0; i < ITERATIONS; i++) bytes += generateMessage(game, mode, session).content.length;
+    const elapsed = performance.now() - start;
+
+    const perSecond = Math.round(ITERATIONS / (elapsed / 1000));
+    let line = `${label.padEnd(28)} ${perSecond.toLocaleString().padStart(12)} msg/s  (${elapsed.toFixed(0)} ms, ${bytes} chars)`;
+
+    if (SEED !== null) {
+      // Segunda pasada, fuera del tiempo medido: misma semilla, mismos mensajes
+      const replay = newSession();
+      let checksum = 0;
+      for (let i = 0; i < ITERATIONS; i++) {
+        const message = generateMessage(game, mode, replay);
+        checksum = hashString(`${checksum}|${message.id}|${message.username}|${message.content}|${message.category}`);
+      }
+      line += `  checksum ${checksum.toString(16).padStart(8, '0')}`;
+    }
+    console.log(line);
+  }
+} finally {
+  await server.close();
+}
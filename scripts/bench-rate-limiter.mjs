@@ -0,0 +1,55 @@
+// Microbenchmark del rate limiter (comprobaciones/segundo y memoria).
+//
+//   node scripts/bench-rate-limiter.mjs [comprobaciones]
+//
+// Carga src/lib/rateLimiter.ts con el SSR de Vite, como el benchmark del
+// generador, y mide checkIpRateLimit en tres escenarios:
+// - una IP caliente que supera su cupo una y otra vez,
+// - una inundación de IPs distintas (cada una nueva: desalojos del LRU),
+// - tráfico mixto: 1.000 IPs legítimas repartidas entre las tres rutas.
+// El número de keys seguidas nunca pasa de RATE_LIMIT_MAX_KEYS.
+
+import { createServer } from 'vite';
+
+const CHECKS = Number(process.argv[2]) || 2_000_000;
+
+const server = await createServer({
+  appType: 'custom',
+  logLevel: 'error',
+  server: { middlewareMode: true, hmr: false },
+});
+
+const heapMB = () => (process.memoryUsage().heapUsed / 1024 / 1024).toFixed(1);
+
+try {
+  const { checkIpRateLimit, getRateLimitStats } = await server.ssrLoadModule('/src/lib/rateLimiter.ts');
+
+  const routes = ['api', 'sse', 'generate'];
+  const scenarios = [
+    ['IP caliente', () => '203.0.113.7', () => 'api'],
+    ['inundación de IPs', (i) => `10.${(i >> 16) & 255}.${(i >> 8) & 255}.${i & 255}`, () => 'api'],
+    ['mixto (1.000 IPs)', (i) => `192.0.2.${i % 1000}`, (i) => routes[i % 3]],
+  ];
+
+  console.log(`${CHECKS.toLocaleString()} comprobaciones por escenario (heap inicial ${heapMB()} MB)\n`);
+  for (const [label, ipFor, routeFor] of scenarios) {
+    const before = getRateLimitStats();
+    const start = performance.now();
+    let allowed = 0;
+    for (let i = 0; i < CHECKS; i++) {
+      if (checkIpRateLimit(ipFor(i), routeFor(i)).allowed) allowed++;
+    }
+    const elapsed = performance.now() - start;
+    const stats = getRateLimitStats();
+
+    const perSecond = Math.round(CHECKS / (elapsed / 1000));
+    console.log(
+      `${label.padEnd(20)} ${perSecond.toLocaleString().padStart(12)} checks/s  ` +
+      `(${elapsed.toFixed(0)} ms, ${allowed.toLocaleString()} permitidos, ` +
+      `${stats.trackedKeys.toLocaleString()}/${stats.maxKeys.toLocaleString()} keys, ` +
+      `${(stats.evictions - before.evictions).toLocaleString()} desalojos, heap ${heapMB()} MB)`
+    );
+  }
+} finally {
+  await server.close();
+}
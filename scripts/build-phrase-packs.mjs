@@ -0,0 +1,131 @@
+// Genera los paquetes de frases precompilados (src/data/phrase-packs/).
+//
+//   node scripts/build-phrase-packs.mjs [--force] [--only <nombre>] [--concurrency <n>] [--seed <fichero>] [--if-configured]
+//
+// Lee la lista semilla (scripts/phrase-packs.seed.json por defecto), pide las
+// frases al proveedor configurado y escribe un JSON deduplicado por juego más
+// index.json (nombre y alias normalizados -> slug). Los paquetes ya generados
+// se conservan salvo con --force, así que relanzarlo solo completa lo que falta.
+// Usa los mismos proveedores que el servidor:
+//
+//   AI_PROVIDERS=local node scripts/build-phrase-packs.mjs   # stub sin red
+//   GROQ_API_KEY=... node scripts/build-phrase-packs.mjs     # Groq/Cerebras
+//
+// Carga el código con el SSR de Vite (dependencia de Astro), como el benchmark
+// del generador, para que import.meta.env y import.meta.glob funcionen igual.
+//
+// `pnpm build` lo lanza con --if-configured antes de `astro build`: sin
+// GROQ_API_KEY ni CEREBRAS_API_KEY (entorno o .env) no hace nada, y un juego
+// que falla se avisa sin romper el despliegue (se sirve con IA como antes).
+
+import { existsSync } from 'node:fs';
+import { mkdir, readFile, writeFile } from 'node:fs/promises';
+import { join, resolve } from 'node:path';
+import { parseArgs } from 'node:util';
+import { createServer, loadEnv } from 'vite';
+
+const ROOT = resolve(import.meta.dirname, '..');
+const PACKS_DIR = join(ROOT, 'src/data/phrase-packs');
+
+const { values: args } = parseArgs({
+  options: {
+    force: { type: 'boolean', default: false },
+    only: { type: 'string', multiple: true },
+    concurrency: { type: 'string', default: '2' },
+    seed: { type: 'string', default: join(ROOT, 'scripts/phrase-packs.seed.json') },
+    'if-configured': { type: 'boolean', default: false },
+  },
+});
+
+if (args['if-configured']) {
+  // El stub local (AI_PROVIDERS=local) no cuenta: no debe acabar en un despliegue
+  const env = { ...loadEnv('production', ROOT, ['GROQ_', 'CEREBRAS_']), ...process.env };
+  if (!env.GROQ_API_KEY && !env.CEREBRAS_API_KEY) {
+    console.log('[build:packs] Sin GROQ_API_KEY ni CEREBRAS_API_KEY: no se generan paquetes');
+    process.exit(0);
+  }
+}
+
+const seed = JSON.parse(await readFile(args.seed, 'utf8'));
+const concurrency = Math.max(1, Number(args.concurrency) || 1);
+
+const server = await createServer({
+  root: ROOT,
+  appType: 'custom',
+  logLevel: 'error',
+  server: { middlewareMode: true, hmr: false },
+  // Exponer a import.meta.env las variables de servidor que leen los proveedores
+  envPrefix: ['VITE_', 'AI_', 'LOCAL_AI_', 'GROQ_', 'CEREBRAS_'],
+});
+
+let failed = 0;
+
+try {
+  const { generateGamePhrases, generateChatTopicPhrases } = await server.ssrLoadModule('/src/lib/ai/index.ts');
+  const { encodePhrasePack, phrasePackSlug } = await server.ssrLoadModule('/src/lib/phrasePacks.ts');
+  const { normalizeGameName } = await server.ssrLoadModule('/src/lib/phraseCache.ts');
+
+  await mkdir(PACKS_DIR, { recursive: true });
+
+  const only = args.only ? new Set(args.only.map(normalizeGameName)) : null;
+  const items = seed.map((item) => {
+    const name = normalizeGameName(item.name);
+    return {
+      name,
+      mode: item.mode === 'justchatting' ? 'justchatting' : 'game',
+      aliases: (item.aliases ?? []).map(normalizeGameName),
+      slug: phrasePackSlug(name),
+    };
+  });
+
+  const pending = items.filter((item) => {
+    if (only && !only.has(item.name)) return false;
+    return args.force || !existsSync(join(PACKS_DIR, `${item.slug}.json`));
+  });
+
+  console.log(`${items.length} juegos en la semilla, ${pending.length} por generar (concurrencia ${concurrency})\n`);
+
+  let next = 0;
+  const worker = async () => {
+    while (next < pending.length) {
+      const item = pending[next++];
+      const start = performance.now();
+      try {
+        const phrases = item.mode === 'justchatting'
+          ? await generateChatTopicPhrases(item.name)
+          : await generateGamePhrases(item.name);
+        const pack = encodePhrasePack(item.name, item.mode, phrases, 'phrase-packs');
+        const json = JSON.stringify(pack);
+        await writeFile(join(PACKS_DIR, `${item.slug}.json`), json);
+
+        const total = Object.values(pack.categories).reduce((sum, list) => sum + list.length, 0);
+        console.log(
+          `${item.name.padEnd(42)} ${String(pack.strings.length).padStart(5)} strings ` +
+          `(${total} frases) ${(json.length / 1024).toFixed(1).padStart(7)} KB ` +
+          `${((performance.now() - start) / 1000).toFixed(1)}s`
+        );
+      } catch (error) {
+        failed++;
+        console.error(`${item.name.padEnd(42)} ERROR: ${error.message}`);
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(concurrency, pending.length) }, worker));
+
+  // El índice solo apunta a paquetes que existen en disco
+  const index = {};
+  for (const item of items) {
+    if (!existsSync(join(PACKS_DIR, `${item.slug}.json`))) continue;
+    for (const alias of item.aliases) index[alias] ??= item.slug;
+    index[item.name] = item.slug;
+  }
+  const sorted = Object.fromEntries(Object.entries(index).sort(([a], [b]) => a.localeCompare(b)));
+  await writeFile(join(PACKS_DIR, 'index.json'), `${JSON.stringify(sorted, null, 2)}\n`);
+
+  const packs = new Set(Object.values(sorted)).size;
+  console.log(`\nindex.json: ${Object.keys(sorted).length} nombres -> ${packs} paquetes${failed ? `, ${failed} fallidos` : ''}`);
+} finally {
+  await server.close();
+}
+
+process.exitCode = failed > 0 && !args['if-configured'] ? 1 : 0;
@@ -0,0 +1,70 @@
+// Comprobaciones del índice difuso de nombres de juego.
+//
+//   node scripts/check-game-names.mjs
+//
+// Carga src/lib/gameNameIndex.ts con el SSR de Vite, como los benchmarks,
+// indexa unos cuantos juegos y comprueba qué resuelve cada variante: las
+// erratas y abreviaturas deben ir al juego indexado y los nombres de juegos
+// distintos que se parecen ("postal 2" / "portal 2") no deben resolver a nada.
+// Sale con código 1 si alguna falla.
+
+import { createServer } from 'vite';
+
+const INDEXED = [
+  'portal 2',
+  'fable',
+  'minecraft',
+  'hollow knight',
+  'red dead redemption 2',
+  'grand theft auto 5',
+  'fifa 24',
+  'rust',
+  'doom',
+];
+
+/** [lo que escribe el usuario, key esperada o null] */
+const CASES = [
+  // Variantes del mismo juego
+  ['portal2', 'portal 2'],
+  ['minecaft', 'minecraft'],
+  ['minecraftt', 'minecraft'],
+  ['holow knight', 'hollow knight'],
+  ['hollow knigth', 'hollow knight'],
+  ['rdr 2', 'red dead redemption 2'],
+  ['red dead 2', 'red dead redemption 2'],
+  ['GTA V', 'grand theft auto 5'],
+  // Juegos distintos: una letra cambiada, de más en un borde o otro número
+  ['postal 2', null],
+  ['sable', null],
+  ['fabel', null],
+  ['fifa 23', null],
+  ['portal', null],
+  ['fables', null],
+  ['crust', null],
+  ['rusty', null],
+  ['dooms', null],
+];
+
+const server = await createServer({
+  appType: 'custom',
+  logLevel: 'error',
+  server: { middlewareMode: true, hmr: false },
+});
+
+let failed = 0;
+try {
+  const { addGameName, findGameName } = await server.ssrLoadModule('/src/lib/gameNameIndex.ts');
+  for (const key of INDEXED) addGameName(key);
+
+  for (const [query, expected] of CASES) {
+    const found = findGameName(query);
+    const ok = found === expected;
+    if (!ok) failed++;
+    console.log(`${ok ? 'ok  ' : 'FAIL'} ${JSON.stringify(query)} -> ${JSON.stringify(found)}${ok ? '' : ` (esperado ${JSON.stringify(expected)})`}`);
+  }
+  console.log(`\n${CASES.length - failed}/${CASES.length} comprobaciones correctas`);
+} finally {
+  await server.close();
+}
+
+process.exit(failed > 0 ? 1 : 0);
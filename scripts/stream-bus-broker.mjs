@@ -0,0 +1,140 @@
+// Broker mínimo compatible con Redis para probar el bus de streams en local
+// (varias instancias de `pnpm preview`, o los procesos que quieras) sin
+// instalar Redis.
+//
+//   node scripts/stream-bus-broker.mjs [socket | puerto]
+//   STREAM_BUS_URL=unix://$PWD/.cache/stream-bus.sock pnpm preview
+//
+// Sin argumento escucha en el socket Unix .cache/stream-bus.sock; con un
+// número, en 127.0.0.1:<puerto> (STREAM_BUS_URL=redis://127.0.0.1:<puerto>).
+// Solo entiende lo que usa src/lib/streamBus/transports/redis.ts: PING, AUTH,
+// SET (con PX), GET, DEL, PUBLISH, SUBSCRIBE y EVAL, que aquí siempre es el
+// borrado condicional del bus (borra KEYS[1] si vale ARGV[1]).
+
+import { mkdirSync, rmSync } from 'node:fs';
+import { createServer } from 'node:net';
+import { dirname, resolve } from 'node:path';
+
+const target = process.argv[2] ?? '.cache/stream-bus.sock';
+const port = /^\d+$/.test(target) ? Number(target) : null;
+
+/** key -> { value, expiresAt } (expiresAt 0 = sin caducidad) */
+const keys = new Map();
+/** canal -> Set<socket> */
+const channels = new Map();
+
+const OK = '+OK\r\n';
+const bulk = (value) => (value === null ? '$-1\r\n' : `$${Buffer.byteLength(value)}\r\n${value}\r\n`);
+const integer = (value) => `:${value}\r\n`;
+const array = (items) => `*${items.length}\r\n${items.join('')}`;
+
+function read(key) {
+  const entry = keys.get(key);
+  if (!entry) return null;
+  if (entry.expiresAt > 0 && entry.expiresAt <= Date.now()) {
+    keys.delete(key);
+    return null;
+  }
+  return entry.value;
+}
+
+/** Un comando RESP (array de bulk strings), o null si aún no ha llegado entero */
+function parseCommand(buffer, offset) {
+  let lineEnd = buffer.indexOf('\r\n', offset);
+  if (lineEnd === -1) return null;
+  if (buffer[offset] !== 0x2a) throw new Error('se esperaba un array RESP');
+  const count = Number(buffer.toString('utf8', offset + 1, lineEnd));
+  let cursor = lineEnd + 2;
+  const args = [];
+  for (let i = 0; i < count; i++) {
+    lineEnd = buffer.indexOf('\r\n', cursor);
+    if (lineEnd === -1) return null;
+    const length = Number(buffer.toString('utf8', cursor + 1, lineEnd));
+    const start = lineEnd + 2;
+    if (buffer.length < start + length + 2) return null;
+    args.push(buffer.toString('utf8', start, start + length));
+    cursor = start + length + 2;
+  }
+  return [args, cursor];
+}
+
+function run(socket, args) {
+  const name = args[0].toUpperCase();
+  switch (name) {
+    case 'PING':
+      return '+PONG\r\n';
+    case 'AUTH':
+    case 'SELECT':
+      return OK;
+    case 'SET': {
+      const px = args.findIndex((arg, i) => i > 2 && arg.toUpperCase() === 'PX');
+      const expiresAt = px > 0 ? Date.now() + Number(args[px + 1]) : 0;
+      keys.set(args[1], { value: args[2], expiresAt });
+      return OK;
+    }
+    case 'GET':
+      return bulk(read(args[1]));
+    case 'DEL':
+      return integer(args.slice(1).filter((key) => read(key) !== null && keys.delete(key)).length);
+    case 'EVAL': {
+      const [, , , key, expected] = args;
+      if (read(key) !== expected) return integer(0);
+      keys.delete(key);
+      return integer(1);
+    }
+    case 'PUBLISH': {
+      const subscribers = channels.get(args[1]) ?? new Set();
+      const message = array([bulk('message'), bulk(args[1]), bulk(args[2])]);
+      for (const subscriber of subscribers) subscriber.write(message);
+      return integer(subscribers.size);
+    }
+    case 'SUBSCRIBE':
+      return args.slice(1).map((channel, i) => {
+        if (!channels.has(channel)) channels.set(channel, new Set());
+        channels.get(channel).add(socket);
+        return array([bulk('subscribe'), bulk(channel), integer(i + 1)]);
+      }).join('');
+    default:
+      return `-ERR comando no soportado por el broker: ${name}\r\n`;
+  }
+}
+
+const server = createServer((socket) => {
+  let buffer = Buffer.alloc(0);
+  socket.setNoDelay?.(true);
+  socket.on('data', (chunk) => {
+    buffer = buffer.length === 0 ? chunk : Buffer.concat([buffer, chunk]);
+    let offset = 0;
+    let out = '';
+    try {
+      for (let parsed; (parsed = parseCommand(buffer, offset)); ) {
+        out += run(socket, parsed[0]);
+        offset = parsed[1];
+      }
+    } catch (error) {
+      socket.end(`-ERR ${error.message}\r\n`);
+      return;
+    }
+    buffer = buffer.subarray(offset);
+    if (out) socket.write(out);
+  });
+  socket.on('close', () => {
+    for (const subscribers of channels.values()) subscribers.delete(socket);
+  });
+  socket.on('error', () => { /* cliente desconectado */ });
+});
+
+if (port !== null) {
+  server.listen(port, '127.0.0.1', () => console.log(`Broker en redis://127.0.0.1:${port}`));
+} else {
+  const path = resolve(target);
+  mkdirSync(dirname(path), { recursive: true });
+  rmSync(path, { force: true });
+  server.listen(path, () => console.log(`Broker en unix://${path}`));
+  const shutdown = () => {
+    rmSync(path, { force: true });
+    process.exit(0);
+  };
+  process.on('SIGINT', shutdown);
+  process.on('SIGTERM', shutdown);
+}
@@ -1,5 +1,6 @@
 import { memo, useEffect, useState } from 'react';
 import type { ChatMessage as ChatMessageType } from '../utils/types';
+import { createSeededRandom, hashString, type RandomSource } from '../lib/random';
 
 interface ChatMessageProps {
   message: ChatMessageType;
@@ -55,12 +56,12 @@ function getUsernameColor(username: string): string {
   return USERNAME_COLORS[hash % USERNAME_COLORS.length];
 }
 
-function seleccionarEmoteAleatorio(emotes: SevenTvEmote[]): SevenTvEmote | null {
+function seleccionarEmoteAleatorio(emotes: SevenTvEmote[], random: RandomSource): SevenTvEmote | null {
   if (emotes.length === 0) {
     return null;
   }
 
-  const indice = Math.floor(Math.random() * emotes.length);
+  const indice = Math.floor(random() * emotes.length);
   return emotes[indice];
 }
 
@@ -78,8 +79,8 @@ function seleccionarMejorImagen(emote: SevenTvEmote): string | null {
 
 
 //aleteoridad de emote en mensaje
-function obtenerUbicacionEmote(): 'start' | 'end' | null {
-  const aleatorio = Math.random();
+function obtenerUbicacionEmote(random: RandomSource): 'start' | 'end' | null {
+  const aleatorio = random();
 
   if (aleatorio < 0.25) {
     return 'start';
@@ -158,7 +159,9 @@ function ChatMessageComponent({ message, startTime, isAlternate }: ChatMessagePr
 
   useEffect(() => {
     let isActive = true;
-    const ubicacion = obtenerUbicacionEmote();
+    // Sorteo derivado del id: el mismo mensaje lleva siempre el mismo emote
+    const random = createSeededRandom(hashString(message.id)).next;
+    const ubicacion = obtenerUbicacionEmote(random);
 
     if (!ubicacion) {
       setUbicacionEmote(null);
@@ -175,7 +178,7 @@ function ChatMessageComponent({ message, startTime, isAlternate }: ChatMessagePr
           throw new Error('SevenTV no devolvió emotes.');
         }
 
-        const emote = seleccionarEmoteAleatorio(emotes);
+        const emote = seleccionarEmoteAleatorio(emotes, random);
         if (!emote) {
           throw new Error('SevenTV no devolvió emotes.');
         }
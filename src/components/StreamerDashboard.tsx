@@ -39,6 +39,9 @@ const MAX_MESSAGES = 200;
 const RECONNECT_BASE_DELAY = 1_000;
 const RECONNECT_MAX_DELAY = 30_000;
 const RECONNECT_MAX_ATTEMPTS = 10;
+// Ventana de agrupado SSE: las oleadas (180-350ms) llegan en lotes y se
+// aplican en un solo render
+const SSE_BATCH_MS = 300;
 
 export default function StreamerDashboard() {
   const [streamMode, setStreamMode] = useState<StreamMode>('game');
@@ -53,6 +56,8 @@ export default function StreamerDashboard() {
   const eventSourceRef = useRef<EventSource | null>(null);
   const reconnectAttemptsRef = useRef(0);
   const reconnectTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  // Último `id:` recibido: permite reanudar el mismo chat al reconectar
+  const lastEventIdRef = useRef<string | null>(null);
 
   // Cargar info del usuario al montar
   useEffect(() => {
@@ -97,22 +102,37 @@ export default function StreamerDashboard() {
   // El contexto activo depende del modo
   const activeContext = isJustChatting ? selectedTopic : selectedGame;
 
-  const buildSseUrl = (context: string, iv: MessageInterval) =>
-    `/api/chat-stream?game=${encodeURIComponent(context)}&min=${iv.min}&max=${iv.max}&mode=${streamMode}`;
+  const buildSseUrl = (context: string, iv: MessageInterval, lastEventId: string | null) => {
+    const url = `/api/chat-stream?game=${encodeURIComponent(context)}&min=${iv.min}&max=${iv.max}&mode=${streamMode}&batch=${SSE_BATCH_MS}ms`;
+    return lastEventId ? `${url}&lastEventId=${encodeURIComponent(lastEventId)}` : url;
+  };
 
   const openEventSource = (context: string, iv: MessageInterval, preserveMessages = false) => {
-    const url = buildSseUrl(context, iv);
+    // Un EventSource nuevo no manda Last-Event-ID: el token va en la URL
+    if (!preserveMessages) lastEventIdRef.current = null;
+    const url = buildSseUrl(context, iv, lastEventIdRef.current);
     const es = new EventSource(url);
 
     es.onmessage = (event) => {
-      const newMessage: ChatMessage = JSON.parse(event.data);
+      if (event.lastEventId) lastEventIdRef.current = event.lastEventId;
+      // Con ?batch el servidor puede enviar un array de mensajes en un solo evento
+      const data: ChatMessage | ChatMessage[] = JSON.parse(event.data);
+      const incoming = Array.isArray(data) ? data : [data];
       setMessages((prev) => {
-        const next = [...prev, newMessage];
+        const next = [...prev, ...incoming];
         return next.length > MAX_MESSAGES ? next.slice(-MAX_MESSAGES) : next;
       });
     };
 
     es.onerror = () => {
+      // El servidor corta cada conexión antes del límite de la función: el
+      // navegador ya está reconectando solo (tras `retry:`) con Last-Event-ID
+      // y el chat sigue donde iba. Si ese reintento falla, backoff manual.
+      if (es.readyState === EventSource.CONNECTING && reconnectAttemptsRef.current === 0) {
+        reconnectAttemptsRef.current = 1;
+        return;
+      }
+
       es.close();
       eventSourceRef.current = null;
 
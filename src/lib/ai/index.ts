@@ -1,2 +1,2 @@
-export { chatWithAI, generateGamePhrases, generateChatTopicPhrases } from './serviceManager';
+export { chatWithAI, generateGamePhrases, generateChatTopicPhrases, getAIProviderStats, isPartialPhrases } from './serviceManager';
 export type { AIService, AIServiceMessage } from './types';
@@ -0,0 +1,179 @@
+// ============================================
+// PARSER JSON INCREMENTAL DE RESPUESTAS DE IA
+// ============================================
+//
+// Las respuestas de generateGamePhrases/generateChatTopicPhrases son un
+// objeto plano cuyos valores son arrays de strings (o strings sueltos en el
+// JSON de rechazo {"error": …, "reason": …}). Este parser consume los chunks
+// tal como llegan del proveedor y avisa de cada frase en cuanto se cierra su
+// comilla, sin esperar al final de la respuesta ni concatenarla entera.
+//
+// Ignora lo que haya antes de la primera `{` y después de la `}` final
+// (fences de markdown) y tolera comas finales. Cualquier otra forma
+// (objetos anidados, arrays de números…) lanza error y el llamador puede
+// recurrir al JSON.parse de la respuesta completa.
+
+export interface PhraseStreamHandlers {
+  /** Se abre el array de una categoría (también si llega vacío) */
+  onCategory?: (category: string) => void;
+  /** Frase completa dentro del array de `category` */
+  onPhrase?: (category: string, phrase: string) => void;
+  /** Valor escalar de nivel superior, p. ej. "error" o "reason" */
+  onField?: (key: string, value: string) => void;
+}
+
+export interface PhraseStreamParser {
+  push: (chunk: string) => void;
+  /** La `}` de cierre ya llegó */
+  isDone: () => boolean;
+}
+
+type State =
+  | 'beforeObject'
+  | 'keyOrEnd'
+  | 'colon'
+  | 'value'
+  | 'item'
+  | 'afterItem'
+  | 'literal'
+  | 'afterValue'
+  | 'string'
+  | 'done';
+
+/** A qué pertenece el string que se está leyendo */
+type StringTarget = 'key' | 'item' | 'field';
+
+function isWhitespace(char: string): boolean {
+  return char === ' ' || char === '\n' || char === '\r' || char === '\t';
+}
+
+export function createPhraseStreamParser(handlers: PhraseStreamHandlers): PhraseStreamParser {
+  let state: State = 'beforeObject';
+  let target: StringTarget = 'key';
+  let key = '';
+  let raw = '';
+  let escaped = false;
+  let position = 0;
+
+  const fail = (char: string): never => {
+    throw new Error(`JSON de IA inesperado en la posición ${position}: '${char}'`);
+  };
+
+  // Los escapes se resuelven con JSON.parse solo si aparecen
+  const decode = (value: string): string => (value.includes('\\') ? JSON.parse(`"${value}"`) : value);
+
+  const openString = (next: StringTarget) => {
+    target = next;
+    raw = '';
+    escaped = false;
+    state = 'string';
+  };
+
+  const closeString = () => {
+    const value = decode(raw);
+    if (target === 'key') {
+      key = value;
+      state = 'colon';
+    } else if (target === 'item') {
+      handlers.onPhrase?.(key, value);
+      state = 'afterItem';
+    } else {
+      handlers.onField?.(key, value);
+      state = 'afterValue';
+    }
+  };
+
+  const push = (chunk: string) => {
+    for (let i = 0; i < chunk.length; i++, position++) {
+      const char = chunk[i];
+
+      switch (state) {
+        case 'string': {
+          if (escaped) {
+            raw += char;
+            escaped = false;
+          } else if (char === '\\') {
+            raw += char;
+            escaped = true;
+          } else if (char === '"') {
+            closeString();
+          } else {
+            // Copiar de golpe hasta la siguiente comilla o barra
+            let end = i + 1;
+            while (end < chunk.length && chunk[end] !== '"' && chunk[end] !== '\\') end++;
+            raw += chunk.slice(i, end);
+            position += end - i - 1;
+            i = end - 1;
+          }
+          break;
+        }
+
+        case 'beforeObject':
+          if (char === '{') state = 'keyOrEnd';
+          break;
+
+        case 'keyOrEnd':
+          if (isWhitespace(char)) break;
+          if (char === '"') openString('key');
+          else if (char === '}') state = 'done';
+          else fail(char);
+          break;
+
+        case 'colon':
+          if (isWhitespace(char)) break;
+          if (char === ':') state = 'value';
+          else fail(char);
+          break;
+
+        case 'value':
+          if (isWhitespace(char)) break;
+          if (char === '[') {
+            handlers.onCategory?.(key);
+            state = 'item';
+          } else if (char === '"') {
+            openString('field');
+          } else if (char === '{') {
+            fail(char);
+          } else {
+            // number / true / false / null: se ignoran
+            state = 'literal';
+          }
+          break;
+
+        case 'literal':
+          if (char === ',') state = 'keyOrEnd';
+          else if (char === '}') state = 'done';
+          break;
+
+        case 'item':
+          if (isWhitespace(char)) break;
+          if (char === '"') openString('item');
+          else if (char === ']') state = 'afterValue';
+          else fail(char);
+          break;
+
+        case 'afterItem':
+          if (isWhitespace(char)) break;
+          if (char === ',') state = 'item';
+          else if (char === ']') state = 'afterValue';
+          else fail(char);
+          break;
+
+        case 'afterValue':
+          if (isWhitespace(char)) break;
+          if (char === ',') state = 'keyOrEnd';
+          else if (char === '}') state = 'done';
+          else fail(char);
+          break;
+
+        case 'done':
+          return;
+      }
+    }
+  };
+
+  return {
+    push,
+    isDone: () => state === 'done',
+  };
+}
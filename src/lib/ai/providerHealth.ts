@@ -0,0 +1,325 @@
+import type { AIService } from './types';
+
+// ============================================
+// SALUD Y LATENCIA DE LOS PROVEEDORES DE IA
+// ============================================
+//
+// Cada proveedor acumula estadísticas móviles (por instancia):
+// - TTFT (tiempo hasta el primer token con contenido), como EWMA y en una
+//   ventana circular de la que sale el p95 que decide cuándo lanzar el hedge.
+// - Tokens/s (EWMA), medidos desde el primer token hasta el final del stream.
+// - Tasa de error sobre los últimos ERROR_WINDOW intentos.
+//
+// rankProviders ordena los servicios por tiempo esperado de respuesta y un
+// circuit breaker por proveedor los saca de la rotación:
+//
+//   closed ──(fallos seguidos o tasa alta)──▶ open ──(enfriamiento)──▶ half-open
+//      ▲                                       ▲                          │
+//      └──────────── prueba OK ────────────────┴──────── prueba KO ───────┘
+//
+// En half-open pasa una sola petición real de prueba; si vuelve a fallar el
+// enfriamiento se duplica (hasta MAX_COOLDOWN_MS).
+
+/** Peso de la muestra nueva en las medias móviles */
+const EWMA_ALPHA = 0.2;
+
+/** Muestras de TTFT para el p95 del hedge */
+const TTFT_WINDOW = 32;
+
+/** Muestras mínimas antes de fiarse del p95 */
+const MIN_TTFT_SAMPLES = 8;
+
+/** Intentos recordados para la tasa de error */
+const ERROR_WINDOW = 20;
+
+/** Caracteres por token aproximados, para convertir la salida en tokens/s */
+const CHARS_PER_TOKEN = 4;
+
+/** Tokens de una respuesta de frases típica, para pasar tokens/s a tiempo */
+const TYPICAL_RESPONSE_TOKENS = 3000;
+
+const FAILURES_TO_OPEN = 3;
+const ERROR_RATE_TO_OPEN = 0.5;
+const MIN_SAMPLES_FOR_RATE = 10;
+
+const BASE_COOLDOWN_MS = 30_000;
+const MAX_COOLDOWN_MS = 5 * 60_000;
+
+/** Sin muestras recientes las medias ya no valen: se vuelve a medir el proveedor */
+const STALE_AFTER_MS = 5 * 60_000;
+
+// Plazo del hedge cuando aún no hay p95 y límites del calculado
+const DEFAULT_HEDGE_MS = 2_000;
+const MIN_HEDGE_MS = 250;
+const MAX_HEDGE_MS = 8_000;
+
+/**
+ * AI_HEDGE: vacío/off (default) = sin hedge; auto = p95 del TTFT del
+ * proveedor en curso; un número = plazo fijo en ms.
+ */
+function readHedgeConfig(value: unknown): number | 'auto' | null {
+  const raw = String(value ?? '').trim().toLowerCase();
+  if (raw === 'auto') return 'auto';
+  const parsed = Number(raw);
+  return raw !== '' && Number.isFinite(parsed) && parsed > 0 ? parsed : null;
+}
+
+const hedgeConfig = readHedgeConfig(import.meta.env.AI_HEDGE);
+
+type CircuitState = 'closed' | 'open' | 'half-open';
+
+interface ProviderHealth {
+  state: CircuitState;
+  openUntil: number;
+  cooldownMs: number;
+  /** Hay una petición de prueba en vuelo (half-open) */
+  probing: boolean;
+  consecutiveFailures: number;
+  ttftEwma: number;
+  tokensPerSecEwma: number;
+  ttftSamples: Float64Array;
+  ttftCount: number;
+  outcomes: Uint8Array; // 1 = fallo
+  outcomeCount: number;
+  failuresInWindow: number;
+  lastSampleAt: number;
+  counters: {
+    attempts: number;
+    successes: number;
+    failures: number;
+    cancelled: number;
+    hedges: number;
+    hedgeWins: number;
+  };
+}
+
+const health = new Map<string, ProviderHealth>();
+
+function getHealth(service: AIService): ProviderHealth {
+  let entry = health.get(service.name);
+  if (!entry) {
+    entry = {
+      state: 'closed',
+      openUntil: 0,
+      cooldownMs: BASE_COOLDOWN_MS,
+      probing: false,
+      consecutiveFailures: 0,
+      ttftEwma: 0,
+      tokensPerSecEwma: 0,
+      ttftSamples: new Float64Array(TTFT_WINDOW),
+      ttftCount: 0,
+      outcomes: new Uint8Array(ERROR_WINDOW),
+      outcomeCount: 0,
+      failuresInWindow: 0,
+      lastSampleAt: 0,
+      counters: { attempts: 0, successes: 0, failures: 0, cancelled: 0, hedges: 0, hedgeWins: 0 },
+    };
+    health.set(service.name, entry);
+  }
+  return entry;
+}
+
+function ewma(current: number, sample: number): number {
+  return current === 0 ? sample : current + EWMA_ALPHA * (sample - current);
+}
+
+/** Estado del breaker, pasando a half-open si el enfriamiento ya venció */
+function currentState(entry: ProviderHealth, now: number): CircuitState {
+  if (entry.state === 'open' && now >= entry.openUntil) {
+    entry.state = 'half-open';
+    entry.probing = false;
+  }
+  return entry.state;
+}
+
+function errorRate(entry: ProviderHealth): number {
+  const samples = Math.min(entry.outcomeCount, ERROR_WINDOW);
+  return samples === 0 ? 0 : entry.failuresInWindow / samples;
+}
+
+function recordOutcome(entry: ProviderHealth, failed: boolean): void {
+  const slot = entry.outcomeCount % ERROR_WINDOW;
+  if (entry.outcomeCount >= ERROR_WINDOW) entry.failuresInWindow -= entry.outcomes[slot];
+  entry.outcomes[slot] = failed ? 1 : 0;
+  entry.failuresInWindow += entry.outcomes[slot];
+  entry.outcomeCount++;
+}
+
+function openCircuit(entry: ProviderHealth, cooldownMs: number, now: number): void {
+  entry.state = 'open';
+  entry.probing = false;
+  entry.cooldownMs = Math.min(MAX_COOLDOWN_MS, cooldownMs);
+  entry.openUntil = now + entry.cooldownMs;
+}
+
+function percentile(samples: Float64Array, count: number, pct: number): number {
+  const sorted = Array.from(samples.subarray(0, Math.min(count, samples.length))).sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * pct))];
+}
+
+/**
+ * Tiempo esperado (ms) de una respuesta completa, penalizado por la tasa de
+ * error (reintentos esperados). 0 = sin datos recientes: se prueba primero.
+ */
+function expectedLatency(entry: ProviderHealth, now: number): number {
+  if (entry.ttftEwma === 0 || now - entry.lastSampleAt > STALE_AFTER_MS) return 0;
+  const generation = entry.tokensPerSecEwma > 0 ? (TYPICAL_RESPONSE_TOKENS / entry.tokensPerSecEwma) * 1000 : 0;
+  return (entry.ttftEwma + generation) / (1 - Math.min(errorRate(entry), 0.9));
+}
+
+// ─── API pública ──────────────────────────────────────────────────────────────
+
+/**
+ * Orden en que probar los servicios:
+ * 1. Proveedores en half-open sin prueba en vuelo (la petición hace de prueba).
+ * 2. Proveedores sanos, del más rápido al más lento. Empates (p.ej. sin datos)
+ *    respetan el orden de AI_PROVIDERS.
+ * 3. Proveedores con el circuito abierto, solo como último recurso.
+ */
+export function rankProviders(services: AIService[]): AIService[] {
+  const now = Date.now();
+  const probes: AIService[] = [];
+  const healthy: Array<{ service: AIService; latency: number }> = [];
+  const open: AIService[] = [];
+
+  for (const service of services) {
+    const entry = getHealth(service);
+    const state = currentState(entry, now);
+    if (state === 'closed') healthy.push({ service, latency: expectedLatency(entry, now) });
+    else if (state === 'half-open' && !entry.probing) probes.push(service);
+    else open.push(service);
+  }
+
+  healthy.sort((a, b) => a.latency - b.latency);
+  return [...probes, ...healthy.map((item) => item.service), ...open];
+}
+
+/**
+ * Plazo (ms) sin tokens tras el cual lanzar el siguiente proveedor en
+ * paralelo, o null si el hedge está desactivado.
+ */
+export function getHedgeDelay(service: AIService): number | null {
+  if (hedgeConfig === null) return null;
+  if (hedgeConfig !== 'auto') return hedgeConfig;
+
+  const entry = getHealth(service);
+  if (entry.ttftCount < MIN_TTFT_SAMPLES) return DEFAULT_HEDGE_MS;
+  const p95 = percentile(entry.ttftSamples, entry.ttftCount, 0.95);
+  return Math.round(Math.min(MAX_HEDGE_MS, Math.max(MIN_HEDGE_MS, p95)));
+}
+
+export interface ProviderAttempt {
+  /** Llegó el primer chunk con contenido */
+  firstToken: () => void;
+  /** Este intento es el que se usa (gana la carrera del hedge) */
+  win: () => void;
+  /** Stream completo: `chars` caracteres recibidos en total */
+  succeed: (chars: number) => void;
+  fail: () => void;
+  /** Descartado sin juzgar al proveedor (perdió el hedge) */
+  cancel: () => void;
+}
+
+/**
+ * Registra un intento contra `service`. Cada intento termina en exactamente
+ * uno de succeed/fail/cancel; las llamadas posteriores se ignoran.
+ */
+export function startAttempt(service: AIService, hedge = false): ProviderAttempt {
+  const entry = getHealth(service);
+  const startedAt = Date.now();
+  let firstTokenAt = 0;
+  let settled = false;
+
+  const probe = currentState(entry, startedAt) === 'half-open' && !entry.probing;
+  if (probe) entry.probing = true;
+  entry.counters.attempts++;
+  if (hedge) entry.counters.hedges++;
+
+  const release = () => {
+    settled = true;
+    if (probe) entry.probing = false;
+  };
+
+  return {
+    firstToken() {
+      if (firstTokenAt) return;
+      firstTokenAt = Date.now();
+      const ttft = firstTokenAt - startedAt;
+      entry.ttftEwma = ewma(entry.ttftEwma, ttft);
+      entry.ttftSamples[entry.ttftCount % TTFT_WINDOW] = ttft;
+      entry.ttftCount++;
+      entry.lastSampleAt = firstTokenAt;
+    },
+    win() {
+      if (hedge) entry.counters.hedgeWins++;
+    },
+    succeed(chars) {
+      if (settled) return;
+      release();
+      const now = Date.now();
+      const seconds = firstTokenAt ? (now - firstTokenAt) / 1000 : 0;
+      // Respuestas casi instantáneas (un solo chunk) no dicen nada del ritmo
+      if (seconds >= 0.05 && chars > 0) {
+        entry.tokensPerSecEwma = ewma(entry.tokensPerSecEwma, chars / CHARS_PER_TOKEN / seconds);
+      }
+      entry.counters.successes++;
+      entry.consecutiveFailures = 0;
+      recordOutcome(entry, false);
+      if (entry.state !== 'closed') {
+        entry.state = 'closed';
+        entry.cooldownMs = BASE_COOLDOWN_MS;
+        console.log(`[AI] ${service.name} recuperado, circuito cerrado`);
+      }
+    },
+    fail() {
+      if (settled) return;
+      release();
+      const now = Date.now();
+      entry.counters.failures++;
+      entry.consecutiveFailures++;
+      recordOutcome(entry, true);
+
+      const state = currentState(entry, now);
+      if (state === 'half-open' || state === 'open') {
+        // Falló la prueba (o el uso como último recurso): más enfriamiento
+        openCircuit(entry, probe ? entry.cooldownMs * 2 : entry.cooldownMs, now);
+        console.warn(`[AI] ${service.name} sigue fallando, circuito abierto ${entry.cooldownMs}ms`);
+      } else if (
+        entry.consecutiveFailures >= FAILURES_TO_OPEN ||
+        (entry.outcomeCount >= MIN_SAMPLES_FOR_RATE && errorRate(entry) >= ERROR_RATE_TO_OPEN)
+      ) {
+        openCircuit(entry, BASE_COOLDOWN_MS, now);
+        console.warn(`[AI] ${service.name} abre el circuito durante ${entry.cooldownMs}ms`);
+      }
+    },
+    cancel() {
+      if (settled) return;
+      release();
+      entry.counters.cancelled++;
+    },
+  };
+}
+
+/**
+ * Estadísticas por proveedor, en el orden recibido
+ */
+export function getProviderStats(services: AIService[]) {
+  const now = Date.now();
+  return services.map((service) => {
+    const entry = getHealth(service);
+    const state = currentState(entry, now);
+    return {
+      name: service.name,
+      state,
+      openForMs: state === 'open' ? entry.openUntil - now : 0,
+      consecutiveFailures: entry.consecutiveFailures,
+      ttftMs: Math.round(entry.ttftEwma),
+      ttftP95Ms: entry.ttftCount > 0 ? Math.round(percentile(entry.ttftSamples, entry.ttftCount, 0.95)) : null,
+      tokensPerSec: Math.round(entry.tokensPerSecEwma),
+      errorRate: Number(errorRate(entry).toFixed(3)),
+      expectedLatencyMs: Math.round(expectedLatency(entry, now)),
+      hedgeDelayMs: getHedgeDelay(service),
+      ...entry.counters,
+    };
+  });
+}
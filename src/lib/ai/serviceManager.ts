@@ -1,65 +1,390 @@
 import { groqService } from './services/groq';
 import { cerebrasService } from './services/cerebras';
+import { localService } from './services/local';
+import { createPhraseStreamParser } from './phraseStreamParser';
+import { getHedgeDelay, getProviderStats, rankProviders, startAttempt, type ProviderAttempt } from './providerHealth';
 import type { AIService, AIServiceMessage } from './types';
 
+// Proveedores registrados, seleccionables por nombre
+const availableServices: Record<string, AIService> = {
+  groq: groqService,
+  cerebras: cerebrasService,
+  local: localService,
+};
+
+const DEFAULT_PROVIDERS = ['groq', 'cerebras'];
+
+/**
+ * Resuelve los servicios activos desde AI_PROVIDERS (lista separada por comas,
+ * en orden de preferencia). Ej: AI_PROVIDERS=local para benchmarks offline.
+ */
+function resolveServices(): AIService[] {
+  const configured = String(import.meta.env.AI_PROVIDERS ?? '')
+    .split(',')
+    .map((name) => name.trim().toLowerCase())
+    .filter((name) => name in availableServices);
+
+  const names = configured.length > 0 ? configured : DEFAULT_PROVIDERS;
+  return names.map((name) => availableServices[name]);
+}
+
 // Lista de servicios disponibles con failover
-const services: AIService[] = [
-  groqService,
-  cerebrasService,
-];
+const services: AIService[] = resolveServices();
+
+interface OpenedStream {
+  service: AIService;
+  attempt: ProviderAttempt;
+  stream: AsyncGenerator<string>;
+  /** Primer chunk con contenido ('' si el stream terminó sin contenido) */
+  first: string;
+  done: boolean;
+}
+
+/**
+ * Espera al primer chunk con contenido (los SDKs abren con deltas vacíos)
+ */
+async function readFirstChunk(service: AIService, messages: AIServiceMessage[]) {
+  const stream = await service.chat(messages);
+  for (;;) {
+    const next = await stream.next();
+    if (next.done) return { stream, first: '', done: true };
+    if (next.value) return { stream, first: next.value, done: false };
+  }
+}
+
+function closeStream(stream: AsyncGenerator<string>): void {
+  stream.return(undefined).catch(() => {});
+}
+
+/**
+ * Arranca el primer servicio de `queue` y resuelve con el primero que entregue
+ * un token. Los que fallan antes del primer token se descartan y se pasa al
+ * siguiente. Con hedge (AI_HEDGE), si el proveedor en curso no produce nada
+ * en el plazo se lanza el siguiente en paralelo: gana el primero que responda
+ * y el otro se cierra en cuanto llega su primer chunk.
+ * Saca de `queue` los servicios que arranca.
+ */
+function openFirstStream(queue: AIService[], messages: AIServiceMessage[]): Promise<OpenedStream> {
+  return new Promise((resolve, reject) => {
+    let settled = false;
+    let running = 0;
+    let lastError: Error | null = null;
+    let hedgeTimer: ReturnType<typeof setTimeout> | null = null;
+
+    const clearHedge = () => {
+      if (hedgeTimer) clearTimeout(hedgeTimer);
+      hedgeTimer = null;
+    };
+
+    const armHedge = (service: AIService) => {
+      clearHedge();
+      const delay = getHedgeDelay(service);
+      if (delay === null || queue.length === 0) return;
+      hedgeTimer = setTimeout(() => {
+        hedgeTimer = null;
+        if (settled) return;
+        console.warn(`[AI] ${service.name} sin tokens tras ${delay}ms, lanzando hedge`);
+        launch(true);
+      }, delay);
+    };
 
-let currentServiceIndex = 0;
+    const launch = (hedge: boolean): boolean => {
+      const service = queue.shift();
+      if (!service) return false;
+
+      running++;
+      const attempt = startAttempt(service, hedge);
+      console.log(`[AI] Usando servicio: ${service.name}${hedge ? ' (hedge)' : ''}`);
+      armHedge(service);
+
+      readFirstChunk(service, messages).then(
+        ({ stream, first, done }) => {
+          running--;
+          if (!done) attempt.firstToken();
+          if (settled) {
+            attempt.cancel();
+            closeStream(stream);
+            return;
+          }
+          settled = true;
+          clearHedge();
+          attempt.win();
+          resolve({ service, attempt, stream, first, done });
+        },
+        (error) => {
+          running--;
+          attempt.fail();
+          console.error(`[AI] Error con ${service.name}:`, error);
+          if (settled) return;
+          lastError = error as Error;
+          // Si hay un hedge en vuelo, él es el siguiente intento
+          if (running > 0 || launch(false)) return;
+          settled = true;
+          clearHedge();
+          reject(lastError);
+        }
+      );
+      return true;
+    };
+
+    if (!launch(false)) reject(new Error('Todos los servicios de IA fallaron'));
+  });
+}
 
 /**
- * Obtiene el siguiente servicio usando round-robin
+ * Pasa el primer chunk y el resto del stream a `onChunk` hasta que devuelva false
  */
-function getNextService(): AIService {
-  const service = services[currentServiceIndex];
-  currentServiceIndex = (currentServiceIndex + 1) % services.length;
-  return service;
+async function readStream(opened: OpenedStream, onChunk: (chunk: string) => boolean): Promise<void> {
+  if (!onChunk(opened.first) || opened.done) {
+    if (!opened.done) closeStream(opened.stream);
+    return;
+  }
+  for await (const chunk of opened.stream) {
+    if (!onChunk(chunk)) break;
+  }
 }
 
 /**
- * Intenta usar un servicio de IA con failover automático
+ * Intenta usar un servicio de IA con failover automático, empezando por el
+ * proveedor sano más rápido
  */
 export async function chatWithAI(messages: AIServiceMessage[]): Promise<string> {
+  const queue = rankProviders(services);
   let lastError: Error | null = null;
-  
+
   // Intentar con cada servicio hasta que uno funcione
-  for (let i = 0; i < services.length; i++) {
-    const service = getNextService();
-    
+  while (queue.length > 0) {
+    const opened = await openFirstStream(queue, messages);
+
     try {
-      console.log(`[AI] Usando servicio: ${service.name}`);
-      const stream = await service.chat(messages);
-      
-      // Consumir el stream y concatenar la respuesta
-      let fullResponse = '';
-      for await (const chunk of stream) {
-        fullResponse += chunk;
-      }
-      
-      return fullResponse;
+      // Consumir el stream y unir la respuesta al final
+      const chunks: string[] = [];
+      await readStream(opened, (chunk) => {
+        chunks.push(chunk);
+        return true;
+      });
+
+      const response = chunks.join('');
+      opened.attempt.succeed(response.length);
+      return response;
     } catch (error) {
-      console.error(`[AI] Error con ${service.name}:`, error);
+      opened.attempt.fail();
+      console.error(`[AI] Error con ${opened.service.name}:`, error);
       lastError = error as Error;
       // Continuar con el siguiente servicio
     }
   }
-  
+
   throw lastError || new Error('Todos los servicios de IA fallaron');
 }
 
 /**
- * Genera frases de chat para un tema de Just Chatting usando IA
+ * Latencia, tasa de error y estado del circuit breaker de cada proveedor
+ */
+export function getAIProviderStats() {
+  return getProviderStats(services);
+}
+
+// ============================================
+// GENERACIÓN DE FRASES EN STREAMING
+// ============================================
+
+/** Frases por categoría requerida a partir de las cuales la respuesta ya es utilizable */
+const MIN_PHRASES_PER_CATEGORY = 20;
+
+export interface PhraseGenerationOptions<T> {
+  /** Mínimo por categoría para `onReady` (default MIN_PHRASES_PER_CATEGORY) */
+  minPerCategory?: number;
+  /**
+   * Se llama una sola vez, en cuanto todas las categorías requeridas llegan al
+   * mínimo, con una copia de lo recibido hasta ese momento. La promesa del
+   * generate* sigue resolviendo con la respuesta completa.
+   */
+  onReady?: (partial: T) => void;
+  /** Cada frase según llega del proveedor */
+  onPhrase?: (category: string, phrase: string) => void;
+  /** Un proveedor falló a mitad y se reintenta con otro: descartar lo recibido por onPhrase */
+  onRestart?: () => void;
+}
+
+interface StreamedPhrases {
+  phrases: Record<string, string[]>;
+  fields: Record<string, string>;
+  /** El proveedor se cortó tras onReady: solo las categorías requeridas están garantizadas */
+  partial?: boolean;
+}
+
+/**
+ * Resultados de generate* cuyo proveedor se cortó tras onReady: no traen
+ * todas las categorías y no deben persistirse (ver isPartialPhrases)
+ */
+const partialResults = new WeakSet<object>();
+
+/**
+ * true si `phrases` es una respuesta parcial de generateGamePhrases o
+ * generateChatTopicPhrases (el proveedor se cortó a mitad)
+ */
+export function isPartialPhrases(phrases: object): boolean {
+  return partialResults.has(phrases);
+}
+
+function invalidInputError(code: string, reason: string | undefined, fallbackMessage: string): Error {
+  const invalidError = new Error(reason || fallbackMessage);
+  (invalidError as Error & { code: string }).code = code;
+  return invalidError;
+}
+
+/**
+ * Parsea la respuesta completa a la antigua (fences + JSON.parse). Solo se usa
+ * si el parser incremental no reconoce la forma de la respuesta.
+ */
+function parseFullResponse(response: string): StreamedPhrases {
+  const cleanResponse = response
+    .replace(/```json\n?/g, '')
+    .replace(/```\n?/g, '')
+    .trim();
+  const parsed = JSON.parse(cleanResponse) as Record<string, unknown>;
+
+  const result: StreamedPhrases = { phrases: {}, fields: {} };
+  for (const [key, value] of Object.entries(parsed)) {
+    if (Array.isArray(value)) result.phrases[key] = value.filter((item) => typeof item === 'string');
+    else if (typeof value === 'string') result.fields[key] = value;
+  }
+  return result;
+}
+
+function snapshot(phrases: Record<string, string[]>): Record<string, string[]> {
+  const copy: Record<string, string[]> = {};
+  for (const [category, list] of Object.entries(phrases)) copy[category] = list.slice();
+  return copy;
+}
+
+/**
+ * Pide frases a la IA (con failover) y las parsea mientras llegan.
+ *
+ * - Un JSON de rechazo ({"error": …}) corta la lectura en cuanto se recibe.
+ * - `onPhrase` recibe cada frase; `onReady` se dispara cuando cada categoría
+ *   de `required` alcanza el mínimo.
+ * - Si el proveedor se corta después de `onReady`, se devuelve lo recibido en
+ *   lugar de repetir la generación con el siguiente servicio.
  */
-export async function generateChatTopicPhrases(topic: string): Promise<{
+async function streamPhrasesWithAI(
+  messages: AIServiceMessage[],
+  required: string[],
+  options: PhraseGenerationOptions<Record<string, string[]>>
+): Promise<StreamedPhrases> {
+  const { onReady, onPhrase, onRestart, minPerCategory = MIN_PHRASES_PER_CATEGORY } = options;
+  const queue = rankProviders(services);
+  let lastError: Error | null = null;
+  let emitted = false;
+
+  while (queue.length > 0) {
+    const result: StreamedPhrases = { phrases: {}, fields: {} };
+    const chunks: string[] = [];
+    let ready = false;
+    let parseError: Error | null = null;
+
+    if (emitted) {
+      onRestart?.();
+      emitted = false;
+    }
+
+    const parser = createPhraseStreamParser({
+      onCategory: (category) => {
+        result.phrases[category] ??= [];
+      },
+      onPhrase: (category, phrase) => {
+        (result.phrases[category] ??= []).push(phrase);
+        if (onPhrase) {
+          emitted = true;
+          onPhrase(category, phrase);
+        }
+        if (!ready && onReady && required.every((name) => (result.phrases[name]?.length ?? 0) >= minPerCategory)) {
+          ready = true;
+          onReady(snapshot(result.phrases));
+        }
+      },
+      onField: (key, value) => {
+        result.fields[key] = value;
+      },
+    });
+
+    const opened = await openFirstStream(queue, messages);
+    const { service, attempt } = opened;
+
+    try {
+      await readStream(opened, (chunk) => {
+        chunks.push(chunk);
+        if (parseError) return true;
+        try {
+          parser.push(chunk);
+        } catch (error) {
+          parseError = error as Error;
+        }
+        // Rechazo detectado: no hace falta esperar a nada más
+        return !(result.fields.error && (result.fields.reason !== undefined || parser.isDone()));
+      });
+    } catch (error) {
+      attempt.fail();
+      console.error(`[AI] Error con ${service.name}:`, error);
+      // El rechazo ya llegó: el corte no cambia la respuesta
+      if (result.fields.error) return result;
+      if (ready) {
+        console.warn(`[AI] ${service.name} cortó tras recibir el mínimo de frases, se usa la respuesta parcial`);
+        result.partial = true;
+        return result;
+      }
+      lastError = error as Error;
+      continue;
+    }
+
+    const response = chunks.join('');
+    if (!parseError && (parser.isDone() || result.fields.error)) {
+      attempt.succeed(response.length);
+      return result;
+    }
+
+    // Forma inesperada: último intento con la respuesta completa
+    try {
+      const parsed = parseFullResponse(response);
+      attempt.succeed(response.length);
+      return parsed;
+    } catch (fullParseError) {
+      attempt.fail();
+      console.error('[AI] Error parseando respuesta:', parseError ?? fullParseError);
+      console.error('[AI] Respuesta raw:', response);
+      throw new Error('No se pudo parsear la respuesta de la IA');
+    }
+  }
+
+  throw lastError || new Error('Todos los servicios de IA fallaron');
+}
+
+export interface ChatTopicPhrases {
   gameplay: string[];
   reactions: string[];
   questions: string[];
   comments: string[];
   usernames: string[];
-}> {
+}
+
+function toChatTopicPhrases(phrases: Record<string, string[]>): ChatTopicPhrases {
+  return {
+    gameplay: [],
+    reactions: phrases.reactions ?? [],
+    questions: phrases.questions ?? [],
+    comments: phrases.comments ?? [],
+    usernames: phrases.usernames ?? [],
+  };
+}
+
+/**
+ * Genera frases de chat para un tema de Just Chatting usando IA
+ */
+export async function generateChatTopicPhrases(
+  topic: string,
+  options: PhraseGenerationOptions<ChatTopicPhrases> = {}
+): Promise<ChatTopicPhrases> {
   const systemPrompt = `Eres un generador de comentarios de chat de Twitch/YouTube para streams de tipo "Just Chatting" (charla libre con la audiencia).
 Genera comentarios auténticos, variados y entretenidos.
 
@@ -83,60 +408,62 @@ REGLAS para generar frases (solo si el tema es válido):
 
 Devuelve EXACTAMENTE este formato JSON (sin markdown, solo el JSON):
 {
-  "comments": ["frase1", "frase2", ... hasta 200 comentarios y opiniones sobre el tema],
   "reactions": ["frase1", "frase2", ... hasta 60 reacciones cortas emocionales],
   "questions": ["frase1", "frase2", ... hasta 120 preguntas que haría el chat al streamer],
+  "comments": ["frase1", "frase2", ... hasta 200 comentarios y opiniones sobre el tema],
   "gameplay": [],
   "usernames": ["username1", "username2", ... hasta 180 nombres de usuario estilo Twitch, creativos y variados, usa nombre de personas normales , modera el uso del guion bajo usalo muy poco , o números, sin espacios]
 }`;
 
-  const response = await chatWithAI([
-    { role: 'system', content: systemPrompt },
-    { role: 'user', content: userPrompt }
-  ]);
-
-  try {
-    const cleanResponse = response
-      .replace(/```json\n?/g, '')
-      .replace(/```\n?/g, '')
-      .trim();
-
-    const parsed = JSON.parse(cleanResponse);
+  // Las categorías cortas van primero en el JSON pedido para que onReady
+  // llegue tras ~200 frases en lugar de tras la lista larga completa
+  const { onReady } = options;
+  const { phrases, fields, partial } = await streamPhrasesWithAI(
+    [
+      { role: 'system', content: systemPrompt },
+      { role: 'user', content: userPrompt }
+    ],
+    ['comments', 'reactions', 'questions'],
+    { ...options, onReady: onReady && ((partial) => onReady(toChatTopicPhrases(partial))) }
+  );
 
-    // Detectar rechazo por tema inválido
-    if (parsed.error === 'INVALID_TOPIC') {
-      const invalidError = new Error(parsed.reason || 'Tema no válido');
-      (invalidError as Error & { code: string }).code = 'INVALID_TOPIC';
-      throw invalidError;
-    }
-
-    if (!parsed.comments || !parsed.reactions || !parsed.questions) {
-      throw new Error('Estructura JSON inválida');
-    }
+  // Detectar rechazo por tema inválido
+  if (fields.error === 'INVALID_TOPIC') {
+    throw invalidInputError('INVALID_TOPIC', fields.reason, 'Tema no válido');
+  }
 
-    return {
-      gameplay: [],
-      reactions: Array.isArray(parsed.reactions) ? parsed.reactions : [],
-      questions: Array.isArray(parsed.questions) ? parsed.questions : [],
-      comments: Array.isArray(parsed.comments) ? parsed.comments : [],
-      usernames: Array.isArray(parsed.usernames) ? parsed.usernames : [],
-    };
-  } catch (parseError) {
-    if ((parseError as Error & { code?: string }).code === 'INVALID_TOPIC') {
-      throw parseError;
-    }
-    console.error('[AI] Error parseando respuesta JC:', parseError);
-    console.error('[AI] Respuesta raw:', response);
+  if (!phrases.comments || !phrases.reactions || !phrases.questions) {
+    console.error('[AI] Estructura JSON inválida en respuesta JC:', Object.keys(phrases), fields);
     throw new Error('No se pudo parsear la respuesta de la IA');
   }
+
+  const result = toChatTopicPhrases(phrases);
+  if (partial) partialResults.add(result);
+  return result;
 }
-export async function generateGamePhrases(gameName: string): Promise<{
+
+export interface GamePhrases {
   gameplay: string[];
   reactions: string[];
   questions: string[];
   emotes: string[];
   usernames: string[];
-}> {
+}
+
+function toGamePhrases(phrases: Record<string, string[]>): GamePhrases {
+  return {
+    gameplay: phrases.gameplay ?? [],
+    reactions: phrases.reactions ?? [],
+    questions: phrases.questions ?? [],
+    emotes: phrases.emotes ?? [],
+    usernames: phrases.usernames ?? [],
+  };
+}
+
+export async function generateGamePhrases(
+  gameName: string,
+  options: PhraseGenerationOptions<GamePhrases> = {}
+): Promise<GamePhrases> {
   const systemPrompt = `Eres un generador de comentarios de chat de Twitch/YouTube para streams de videojuegos.
 Genera comentarios auténticos, variados y entretenidos que los espectadores escribirían durante un stream.
 
@@ -161,54 +488,35 @@ REGLAS para generar frases (solo si el input es un videojuego válido):
 
 Devuelve EXACTAMENTE este formato JSON (sin markdown, solo el JSON):
 {
-  "gameplay": ["frase1", "frase2", ... hasta 200 frases sobre gameplay/mecánicas],
   "reactions": ["frase1", "frase2", ... hasta 60 frases de reacciones cortas],
   "questions": ["frase1", "frase2", ... hasta 120 preguntas que haría el chat],
+  "gameplay": ["frase1", "frase2", ... hasta 200 frases sobre gameplay/mecánicas],
   "emotes": ["emote1", "emote2", ... hasta 40 emotes populares usados en Twitch/YouTube],
   "usernames": ["username1", "username2", ... hasta 180 nombres de usuario estilo Twitch, creativos y variados, usa nombre de personas normales , modera el uso del guion bajo usalo muy poco , o números, sin espacios]
 }`;
 
-  const response = await chatWithAI([
-    { role: 'system', content: systemPrompt },
-    { role: 'user', content: userPrompt }
-  ]);
-
-  // Parsear la respuesta JSON
-  try {
-    // Limpiar posibles caracteres extra
-    const cleanResponse = response
-      .replace(/```json\n?/g, '')
-      .replace(/```\n?/g, '')
-      .trim();
-    
-    const parsed = JSON.parse(cleanResponse);
-
-    // Detectar rechazo por input inválido
-    if (parsed.error === 'INVALID_GAME') {
-      const invalidError = new Error(parsed.reason || 'Input no válido');
-      (invalidError as Error & { code: string }).code = 'INVALID_GAME';
-      throw invalidError;
-    }
-    
-    // Validar estructura
-    if (!parsed.gameplay || !parsed.reactions || !parsed.questions || !parsed.emotes) {
-      throw new Error('Estructura JSON inválida');
-    }
-    
-    return {
-      gameplay: Array.isArray(parsed.gameplay) ? parsed.gameplay : [],
-      reactions: Array.isArray(parsed.reactions) ? parsed.reactions : [],
-      questions: Array.isArray(parsed.questions) ? parsed.questions : [],
-      emotes: Array.isArray(parsed.emotes) ? parsed.emotes : [],
-      usernames: Array.isArray(parsed.usernames) ? parsed.usernames : [],
-    };
-  } catch (parseError) {
-    // Re-lanzar errores de validación sin envolverlos
-    if ((parseError as Error & { code?: string }).code === 'INVALID_GAME') {
-      throw parseError;
-    }
-    console.error('[AI] Error parseando respuesta:', parseError);
-    console.error('[AI] Respuesta raw:', response);
+  const { onReady } = options;
+  const { phrases, fields, partial } = await streamPhrasesWithAI(
+    [
+      { role: 'system', content: systemPrompt },
+      { role: 'user', content: userPrompt }
+    ],
+    ['gameplay', 'reactions', 'questions'],
+    { ...options, onReady: onReady && ((partial) => onReady(toGamePhrases(partial))) }
+  );
+
+  // Detectar rechazo por input inválido
+  if (fields.error === 'INVALID_GAME') {
+    throw invalidInputError('INVALID_GAME', fields.reason, 'Input no válido');
+  }
+
+  // Validar estructura
+  if (!phrases.gameplay || !phrases.reactions || !phrases.questions || (!phrases.emotes && !partial)) {
+    console.error('[AI] Estructura JSON inválida:', Object.keys(phrases), fields);
     throw new Error('No se pudo parsear la respuesta de la IA');
   }
+
+  const result = toGamePhrases(phrases);
+  if (partial) partialResults.add(result);
+  return result;
 }
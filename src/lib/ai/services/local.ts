@@ -0,0 +1,130 @@
+import type { AIService, AIServiceMessage } from '../types';
+
+// ============================================
+// PROVEEDOR LOCAL (stub) PARA BENCHMARKS OFFLINE
+// ============================================
+//
+// Implementa el mismo contrato que Groq/Cerebras pero sin red: devuelve un JSON
+// determinista con la forma que esperan generateGamePhrases/generateChatTopicPhrases,
+// troceado en chunks a un ritmo configurable. Se activa con AI_PROVIDERS=local.
+//
+// Variables de entorno (todas opcionales):
+// - LOCAL_AI_LATENCY_MS       tiempo hasta el primer token (default 300)
+// - LOCAL_AI_TOKENS_PER_SEC   velocidad de salida (default 500, ~Groq)
+// - LOCAL_AI_FAILURE_RATE     fracción de llamadas que fallan, 0..1 (default 0)
+// - LOCAL_AI_FAILURE_MODE     'connect' (falla antes del stream) o 'midstream'
+// - LOCAL_AI_SCALE            multiplicador del número de frases (default 1)
+//
+// Un nombre que empiece por "invalid" devuelve el JSON de rechazo
+// (INVALID_GAME / INVALID_TOPIC) para ejercitar ese camino.
+
+/** Caracteres por token aproximados, para convertir tokens/s en bytes */
+const CHARS_PER_TOKEN = 4;
+
+/** Tokens por chunk emitido (los SDKs reales agrupan varios por evento) */
+const TOKENS_PER_CHUNK = 8;
+
+function readNumber(value: unknown, fallback: number): number {
+  const parsed = Number(value);
+  return Number.isFinite(parsed) && parsed >= 0 ? parsed : fallback;
+}
+
+const config = {
+  latencyMs: readNumber(import.meta.env.LOCAL_AI_LATENCY_MS, 300),
+  tokensPerSec: readNumber(import.meta.env.LOCAL_AI_TOKENS_PER_SEC, 500),
+  failureRate: Math.min(1, readNumber(import.meta.env.LOCAL_AI_FAILURE_RATE, 0)),
+  failureMode: import.meta.env.LOCAL_AI_FAILURE_MODE === 'midstream' ? 'midstream' : 'connect',
+  scale: readNumber(import.meta.env.LOCAL_AI_SCALE, 1),
+};
+
+let callCount = 0;
+
+/**
+ * Decide si la llamada n debe fallar. Usa la secuencia de Weyl (n·φ mod 1)
+ * en vez de Math.random para que el patrón de fallos sea reproducible.
+ */
+function shouldFail(n: number): boolean {
+  if (config.failureRate <= 0) return false;
+  return (n * 0.6180339887498949) % 1 < config.failureRate;
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+function extractSubject(prompt: string): string {
+  const match = prompt.match(/(?:videojuego|tema):\s*"([^"]*)"/);
+  return match?.[1]?.trim() || 'stream';
+}
+
+function buildList(count: number, build: (i: number) => string): string[] {
+  return Array.from({ length: Math.round(count * config.scale) }, (_, i) => build(i));
+}
+
+/**
+ * Construye la respuesta determinista según el prompt recibido
+ */
+function buildResponse(messages: AIServiceMessage[]): string {
+  const userPrompt = messages.find((m) => m.role === 'user')?.content ?? '';
+  const isJustChatting = userPrompt.includes('Just Chatting');
+  const subject = extractSubject(userPrompt);
+
+  if (subject.toLowerCase().startsWith('invalid')) {
+    return JSON.stringify({
+      error: isJustChatting ? 'INVALID_TOPIC' : 'INVALID_GAME',
+      reason: 'Rechazo simulado por el proveedor local',
+    });
+  }
+
+  const usernames = buildList(180, (i) => `viewer${subject.replace(/\W+/g, '')}${i}`);
+  const reactions = buildList(60, (i) => `JAJAJA ${subject} ${i}`);
+  const questions = buildList(120, (i) => `Que opinas de ${subject}? (${i})`);
+
+  if (isJustChatting) {
+    return JSON.stringify({
+      reactions,
+      questions,
+      comments: buildList(200, (i) => `Comentario ${i} sobre ${subject}, me encanta este tema`),
+      gameplay: [],
+      usernames,
+    });
+  }
+
+  // Categorías cortas primero: reactions, questions, gameplay, emotes, usernames
+  return JSON.stringify({
+    reactions,
+    questions,
+    gameplay: buildList(200, (i) => `Jugada ${i} en ${subject}, que nivel tiene el stream`),
+    emotes: buildList(40, (i) => `PogChamp${i}`),
+    usernames,
+  });
+}
+
+export const localService: AIService = {
+  name: 'Local',
+  async chat(messages: AIServiceMessage[]) {
+    const call = ++callCount;
+    const fail = shouldFail(call);
+
+    await sleep(config.latencyMs);
+    if (fail && config.failureMode === 'connect') {
+      throw new Error(`Fallo simulado del proveedor local (llamada ${call})`);
+    }
+
+    const response = buildResponse(messages);
+    const chunkSize = TOKENS_PER_CHUNK * CHARS_PER_TOKEN;
+    const chunkDelay = config.tokensPerSec > 0 ? (TOKENS_PER_CHUNK / config.tokensPerSec) * 1000 : 0;
+
+    async function* generateStream() {
+      for (let offset = 0; offset < response.length; offset += chunkSize) {
+        if (fail && offset >= response.length / 2) {
+          throw new Error(`Corte simulado del stream local (llamada ${call})`);
+        }
+        if (offset > 0 && chunkDelay > 0) await sleep(chunkDelay);
+        yield response.slice(offset, offset + chunkSize);
+      }
+    }
+
+    return generateStream();
+  }
+};
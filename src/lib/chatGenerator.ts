@@ -1,9 +1,7 @@
 import type { MessageCategory, ChatMessage, MessagePattern, StreamMode } from '../utils/types';
-import { getPhrasesForGame } from './phraseCache';
-
-function getRandomElement<T>(array: T[]): T {
-  return array[Math.floor(Math.random() * array.length)];
-}
+import { getPhrasesForGame, getPhrasesVersion, isFillingPhrases } from './phraseCache';
+import { createSeededRandom, deriveSeed, randomSeed, shuffleInPlace, type RandomSource } from './random';
+import type { StreamSession } from './streamSession';
 
 // ============================================
 // SHUFFLE POOL DE USERNAMES POR JUEGO
@@ -12,64 +10,111 @@ function getRandomElement<T>(array: T[]): T {
 // ============================================
 
 interface UsernamePool {
-  queue: string[];
+  order: string[];
+  cursor: number;
   source: string[];
 }
 
 const usernamePools = new Map<string, UsernamePool>();
 
-function shuffled<T>(array: T[]): T[] {
-  const arr = [...array];
-  for (let i = arr.length - 1; i > 0; i--) {
-    const j = Math.floor(Math.random() * (i + 1));
-    [arr[i], arr[j]] = [arr[j], arr[i]];
-  }
-  return arr;
-}
-
-function getNextUsername(gameName: string, usernames: string[]): string {
+function getUsernamePool(gameName: string, usernames: string[]): UsernamePool {
   let pool = usernamePools.get(gameName);
 
-  // Si no existe pool o la fuente cambió de tamaño (juego recargado), reiniciar
-  if (!pool || pool.source.length !== usernames.length) {
-    pool = { queue: shuffled(usernames), source: usernames };
+  // Si no existe pool o la fuente cambió (juego recargado), reiniciar
+  if (!pool || pool.source !== usernames) {
+    const order = [...usernames];
+    shuffleInPlace(order);
+    pool = { order, cursor: 0, source: usernames };
     usernamePools.set(gameName, pool);
   }
+  return pool;
+}
 
+function nextUsername(pool: UsernamePool): string {
   // Si se agotó el pool, rebarajar para la siguiente ronda
-  if (pool.queue.length === 0) {
-    pool.queue = shuffled(pool.source);
+  if (pool.cursor === pool.order.length) {
+    shuffleInPlace(pool.order);
+    pool.cursor = 0;
   }
+  return pool.order[pool.cursor++];
+}
 
-  return pool.queue.pop()!;
+/** Orden de una ronda de usernames de una sesión: depende solo de semilla y ronda */
+function sessionRoundOrder(session: StreamSession, usernames: string[]): string[] {
+  const order = usernames.slice();
+  shuffleInPlace(order, createSeededRandom(deriveSeed(session.seed, session.usernames.round)).next);
+  return order;
 }
 
-function getRandomCategory(mode: StreamMode): MessageCategory {
-  if (mode === 'justchatting') {
-    // JC: más comentarios y reacciones, menos preguntas
-    const categories: MessageCategory[] = ['comments', 'reactions', 'questions'];
-    const weights = [0.50, 0.15, 0.25];
-    const random = Math.random();
-    let sum = 0;
-    for (let i = 0; i < categories.length; i++) {
-      sum += weights[i];
-      if (random < sum) return categories[i];
-    }
-    return 'comments';
+/**
+ * Siguiente username de una sesión reanudable. Cada sesión tiene su propio
+ * pool: la posición se reconstruye con (ronda, cursor) sin guardar el orden.
+ */
+function nextSessionUsername(session: StreamSession, usernames: string[]): string {
+  const pool = session.usernames;
+  if (pool.source !== usernames) {
+    pool.source = usernames;
+    pool.order = sessionRoundOrder(session, usernames);
+  }
+  if (pool.cursor >= pool.order.length) {
+    pool.round++;
+    pool.cursor = 0;
+    pool.order = sessionRoundOrder(session, usernames);
   }
+  return pool.order[pool.cursor++];
+}
+
+// ============================================
+// PESOS DE CATEGORÍA POR MODO
+// ============================================
 
+const CATEGORY_WEIGHTS: Record<StreamMode, [MessageCategory, number][]> = {
+  // JC: más comentarios y reacciones, menos preguntas
+  // (comments 0.60 = 0.50 + el 0.10 sobrante que el antiguo escaneo lineal devolvía como 'comments')
+  justchatting: [['comments', 0.60], ['reactions', 0.15], ['questions', 0.25]],
   // Modo juego: gameplay y preguntas con peso mayor
-  const categories: MessageCategory[] = ['gameplay', 'reactions', 'questions'];
-  const weights = [0.5, 0.3, 0.2];
-  const random = Math.random();
-  let sum = 0;
-  for (let i = 0; i < categories.length; i++) {
-    sum += weights[i];
-    if (random < sum) return categories[i];
+  game: [['gameplay', 0.5], ['reactions', 0.3], ['questions', 0.2]],
+};
+
+interface AliasTable {
+  prob: Float64Array;
+  alias: Uint8Array;
+}
+
+/**
+ * Tabla de alias de Walker/Vose: muestrea una distribución discreta con un
+ * solo Math.random() y sin recorrer los pesos.
+ */
+function buildAliasTable(weights: number[]): AliasTable {
+  const n = weights.length;
+  const total = weights.reduce((sum, w) => sum + w, 0);
+  const scaled = weights.map((w) => (w / total) * n);
+  const prob = new Float64Array(n);
+  const alias = new Uint8Array(n);
+  const small: number[] = [];
+  const large: number[] = [];
+
+  scaled.forEach((p, i) => (p < 1 ? small : large).push(i));
+  while (small.length > 0 && large.length > 0) {
+    const s = small.pop()!;
+    const l = large.pop()!;
+    prob[s] = scaled[s];
+    alias[s] = l;
+    scaled[l] = scaled[l] + scaled[s] - 1;
+    (scaled[l] < 1 ? small : large).push(l);
   }
-  return 'gameplay';
+  // Restos por redondeo: probabilidad 1
+  for (const i of large) prob[i] = 1;
+  for (const i of small) prob[i] = 1;
+
+  return { prob, alias };
 }
 
+const CATEGORY_TABLES: Record<StreamMode, AliasTable> = {
+  justchatting: buildAliasTable(CATEGORY_WEIGHTS.justchatting.map(([, w]) => w)),
+  game: buildAliasTable(CATEGORY_WEIGHTS.game.map(([, w]) => w)),
+};
+
 // Frases genéricas de fallback
 const FALLBACK_PHRASES: MessagePattern = {
   gameplay: [
@@ -154,35 +199,180 @@ const FALLBACK_PHRASES: MessagePattern = {
   ],
 };
 
+// ============================================
+// GENERADOR COMPILADO POR JUEGO Y MODO
+// ============================================
+//
+// Resolver las frases del juego, elegir categoría y aplicar los fallbacks
+// se hace una sola vez al compilar; generar un mensaje es O(1): un sorteo en
+// la tabla de alias, un índice en el array plano de frases y el siguiente
+// username del pool. Se recompila cuando cambia el cache de frases.
+//
+// Si la entrada del juego aún se está llenando (la IA sigue generando), las
+// categorías con menos de FILLING_TOP_UP_MIN frases se completan con
+// FALLBACK_PHRASES y el generador se recompila cada vez que llegan frases.
+
+/** Por debajo de esto, una categoría en llenado se mezcla con el fallback */
+const FILLING_TOP_UP_MIN = 20;
+
+interface CompiledGenerator {
+  /** Versión del cache de frases con la que se compiló */
+  version: number;
+  source: MessagePattern | null;
+  categories: MessageCategory[];
+  table: AliasTable;
+  /** Frases de todas las categorías en un solo array; slot i = [start[i], start[i] + count[i]) */
+  phrases: string[];
+  start: Uint32Array;
+  count: Uint32Array;
+  usernames: UsernamePool;
+  /** Solo en entradas en llenado: tamaños de las listas fuente al compilar */
+  fillingLengths: number[] | null;
+}
+
+/** Límite de generadores compilados (los nombres llegan de la query string) */
+const MAX_COMPILED_GENERATORS = 1_000;
+
+const compiledGenerators: Record<StreamMode, Map<string, CompiledGenerator>> = {
+  game: new Map(),
+  justchatting: new Map(),
+};
+
+/** Tamaños de las listas de una entrada en llenado: categorías del modo + usernames */
+function fillingLengthsOf(patterns: MessagePattern, categories: MessageCategory[]): number[] {
+  return [...categories.map((category) => patterns[category]?.length ?? 0), patterns.usernames?.length ?? 0];
+}
+
+function compileGenerator(gameName: string, mode: StreamMode, patterns: MessagePattern | null): CompiledGenerator {
+  const source = patterns || FALLBACK_PHRASES;
+  const filling = !!patterns && isFillingPhrases(patterns);
+  const weights = CATEGORY_WEIGHTS[mode];
+  const categories = weights.map(([category]) => category);
+  const phrases: string[] = [];
+  const start = new Uint32Array(categories.length);
+  const count = new Uint32Array(categories.length);
+
+  const modeFallback = FALLBACK_PHRASES[mode === 'justchatting' ? 'comments' : 'gameplay'] ?? FALLBACK_PHRASES.gameplay;
+
+  categories.forEach((category, i) => {
+    const messageArray = source[category as keyof MessagePattern] ?? [];
+    start[i] = phrases.length;
+    if (filling && messageArray.length < FILLING_TOP_UP_MIN) {
+      // Entrada en llenado con pocas frases: completar con las genéricas de la misma categoría
+      const topUp = FALLBACK_PHRASES[category]?.length ? FALLBACK_PHRASES[category]! : modeFallback;
+      phrases.push(...messageArray, ...topUp);
+    } else if (messageArray.length === 0) {
+      // Para JC, si la categoria es 'comments' pero no hay frases (juego en cache sin comments), usar gameplay como fallback
+      phrases.push(...modeFallback);
+    } else {
+      phrases.push(...messageArray);
+    }
+    count[i] = phrases.length - start[i];
+  });
+
+  // En llenado, la lista de usernames crece en sitio: copiarla para que el pool se reinicie
+  const usernameSource = source.usernames?.length
+    ? (filling ? source.usernames.slice() : source.usernames)
+    : FALLBACK_PHRASES.usernames!;
+
+  return {
+    version: getPhrasesVersion(),
+    source: patterns,
+    categories,
+    table: CATEGORY_TABLES[mode],
+    phrases,
+    start,
+    count,
+    usernames: getUsernamePool(gameName, usernameSource),
+    fillingLengths: filling ? fillingLengthsOf(source, categories) : null,
+  };
+}
+
+function hasNewFillingPhrases(generator: CompiledGenerator): boolean {
+  const source = generator.source!;
+  const lengths = generator.fillingLengths!;
+  const { categories } = generator;
+  for (let i = 0; i < categories.length; i++) {
+    if ((source[categories[i]]?.length ?? 0) !== lengths[i]) return true;
+  }
+  return (source.usernames?.length ?? 0) !== lengths[categories.length];
+}
+
+function getCompiledGenerator(gameName: string, mode: StreamMode): CompiledGenerator {
+  const generators = compiledGenerators[mode];
+  let generator = generators.get(gameName);
+
+  if (generator && generator.version !== getPhrasesVersion()) {
+    // El cache cambió: solo recompilar si cambian las frases de este juego
+    const patterns = getPhrasesForGame(gameName);
+    if (patterns === generator.source) {
+      generator.version = getPhrasesVersion();
+    } else {
+      generator = undefined;
+    }
+  }
+
+  // La IA añadió frases desde la última compilación
+  if (generator?.fillingLengths && hasNewFillingPhrases(generator)) {
+    generator = undefined;
+  }
+
+  if (!generator) {
+    if (generators.size >= MAX_COMPILED_GENERATORS) generators.clear();
+    generator = compileGenerator(gameName, mode, getPhrasesForGame(gameName));
+    generators.set(gameName, generator);
+  }
+  return generator;
+}
+
+// ============================================
+// IDS DE MENSAJE
+// ============================================
+//
+// Ids monótonos `<prefijo>-<n en base 36>` en vez de crypto.randomUUID: más
+// baratos, ASCII (vía rápida de sseFrames) y reproducibles. En una sesión el
+// prefijo es su semilla; sin sesión, uno aleatorio por proceso.
+
+const PROCESS_ID_PREFIX = `${randomSeed().toString(36)}-`;
+let processMessageCount = 0;
+
 /**
- * Genera un mensaje de chat para un juego/tema específico
+ * Genera un mensaje de chat para un juego/tema específico.
+ * Con `session`, todo lo aleatorio sale de su PRNG y de su pool de usernames
+ * y el id de su contador: la misma semilla da la misma secuencia y se puede
+ * reanudar (ver streamSession.ts).
  */
-export function generateMessage(gameName: string, mode: StreamMode = 'game'): ChatMessage {
-  const patterns = getPhrasesForGame(gameName) || FALLBACK_PHRASES;
-  const category = getRandomCategory(mode);
-
-  // Para JC, si la categoria es 'comments' pero no hay frases (juego en cache sin comments), usar gameplay como fallback
-  let messageArray = patterns[category as keyof MessagePattern] ?? [];
-  if (!messageArray || messageArray.length === 0) {
-    const fallbackCat: keyof MessagePattern = mode === 'justchatting' ? 'comments' : 'gameplay';
-    messageArray = FALLBACK_PHRASES[fallbackCat] ?? FALLBACK_PHRASES.gameplay;
-  }
+export function generateMessage(gameName: string, mode: StreamMode = 'game', session?: StreamSession): ChatMessage {
+  const generator = getCompiledGenerator(gameName, mode);
+  const random = session ? session.random.next : Math.random;
 
-  const content = messageArray.length > 0
-    ? getRandomElement(messageArray as string[])
-    : getRandomElement(FALLBACK_PHRASES.gameplay);
+  // Muestreo de alias: la parte entera elige columna, la fracción decide alias
+  const { prob, alias } = generator.table;
+  const r = random() * prob.length;
+  const column = r | 0;
+  const slot = r - column < prob[column] ? column : alias[column];
 
-  const usernameSource = patterns.usernames?.length ? patterns.usernames : FALLBACK_PHRASES.usernames!;
+  const content = generator.phrases[generator.start[slot] + Math.floor(random() * generator.count[slot])];
+
+  let id: string;
+  let username: string;
+  if (session) {
+    username = nextSessionUsername(session, generator.usernames.source);
+    id = session.idPrefix + (++session.count).toString(36);
+  } else {
+    username = nextUsername(generator.usernames);
+    id = PROCESS_ID_PREFIX + (++processMessageCount).toString(36);
+  }
 
   return {
-    id: crypto.randomUUID(),
-    username: getNextUsername(gameName, usernameSource),
+    id,
+    username,
     content,
     timestamp: Date.now(),
-    category
+    category: generator.categories[slot]
   };
 }
 
-export function getRandomInterval(min: number, max: number): number {
-  return Math.floor(Math.random() * (max - min + 1)) + min;
+export function getRandomInterval(min: number, max: number, random: RandomSource = Math.random): number {
+  return Math.floor(random() * (max - min + 1)) + min;
 }
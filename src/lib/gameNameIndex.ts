@@ -0,0 +1,273 @@
+// ============================================
+// ÍNDICE DIFUSO DE NOMBRES DE JUEGO
+// ============================================
+//
+// Resuelve variantes escritas por el usuario ("Red Dead 2", "rdr 2",
+// "Pokémon", "GTA 5", "Counter Strike 2") a una key que ya existe en el caché,
+// en vez de lanzar otra generación con IA. Cada nombre indexado se pliega a
+// una forma canónica (sin acentos ni puntuación, números romanos a dígitos,
+// sin "the" inicial) y se busca, en orden:
+//
+// 1. Forma compacta exacta (sin espacios):   "rdr 2" == "rdr2"
+// 2. Siglas de un nombre de varias palabras:  "rdr2" -> "red dead redemption 2"
+// 3. Distancia de edición sobre la forma compacta, con candidatos sacados de
+//    un índice invertido de trigramas (ningún error por debajo de 7 letras,
+//    1 hasta 8, 2 a partir de ahí). Solo cuentan letras que sobran o faltan y
+//    cambiar una letra por otra cuesta 2: en nombres cortos es justo lo que
+//    distingue dos juegos ("postal 2" / "portal 2", "sable" / "fable"). Además
+//    las palabras deben tener el mismo número y cada palabra retocada debe
+//    conservar su primera letra, y también la última si cambia de longitud:
+//    una letra de más o de menos en el borde suele ser otra palabra
+//    ("crust" / "rust", "dooms" / "doom"), no una errata
+// 4. Contención de palabras (en orden) con número: "red dead 2" ⊂ "red dead redemption 2"
+//
+// Los números deben coincidir siempre ("fifa 23" nunca resuelve a "fifa 24")
+// y un empate entre varios candidatos no resuelve nada: mejor una generación
+// de más que mezclar dos juegos.
+
+const ROMAN_NUMERALS: Record<string, string> = {
+  ii: '2', iii: '3', iv: '4', v: '5', vi: '6', vii: '7', viii: '8', ix: '9', x: '10',
+};
+
+/** Proporción mínima de trigramas compartidos para calcular la distancia */
+const MIN_TRIGRAM_OVERLAP = 0.3;
+
+interface FoldedName {
+  /** Palabras y números plegados, en orden */
+  tokens: string[];
+  /** Tokens unidos sin espacios: la forma canónica */
+  compact: string;
+  /** Números del nombre, unidos (deben coincidir para resolver) */
+  numbers: string;
+  /** Iniciales de las palabras + números enteros ("rdr2"), o '' si una sola palabra */
+  acronym: string;
+}
+
+interface IndexedName extends FoldedName {
+  key: string;
+  trigrams: string[];
+  /** Fuentes que registraron la key (caché, hardcodeados, paquetes) */
+  refs: number;
+}
+
+const byKey = new Map<string, IndexedName>();
+const byCompact = new Map<string, Set<string>>();
+const byAcronym = new Map<string, Set<string>>();
+const byTrigram = new Map<string, Set<string>>();
+
+function isNumber(token: string): boolean {
+  return token.charCodeAt(0) >= 48 && token.charCodeAt(0) <= 57;
+}
+
+/**
+ * Pliega un nombre a su forma canónica
+ */
+export function foldGameName(name: string): FoldedName {
+  const raw = name
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .replace(/['’`]/g, '')
+    .replace(/[^a-z0-9]+/g, ' ')
+    // "cs2" -> "cs 2", "2k25" -> "2 k 25": letras y números como tokens aparte
+    .replace(/([a-z])(?=\d)|(\d)(?=[a-z])/g, '$1$2 ')
+    .trim();
+
+  const words = raw ? raw.split(/\s+/) : [];
+  const tokens = words.map((token, i) => (i > 0 && ROMAN_NUMERALS[token]) || token);
+
+  const acronym = tokens.length > 1
+    ? tokens.map((token) => (isNumber(token) ? token : token[0])).join('')
+    : '';
+
+  if (tokens.length > 1 && tokens[0] === 'the') tokens.shift();
+
+  return {
+    tokens,
+    compact: tokens.join(''),
+    numbers: tokens.filter(isNumber).join(' '),
+    acronym,
+  };
+}
+
+function trigramsOf(compact: string): string[] {
+  const padded = `  ${compact} `;
+  const grams = new Set<string>();
+  for (let i = 0; i + 3 <= padded.length; i++) grams.add(padded.slice(i, i + 3));
+  return Array.from(grams);
+}
+
+function addTo(map: Map<string, Set<string>>, bucket: string, key: string): void {
+  let keys = map.get(bucket);
+  if (!keys) map.set(bucket, (keys = new Set()));
+  keys.add(key);
+}
+
+function removeFrom(map: Map<string, Set<string>>, bucket: string, key: string): void {
+  const keys = map.get(bucket);
+  if (!keys) return;
+  keys.delete(key);
+  if (keys.size === 0) map.delete(bucket);
+}
+
+/**
+ * Distancia de edición con solo inserciones y borrados (una sustitución
+ * cuesta 2), acotada: devuelve max + 1 en cuanto la supera
+ */
+function boundedDistance(a: string, b: string, max: number): number {
+  if (Math.abs(a.length - b.length) > max) return max + 1;
+  let previous = new Array<number>(b.length + 1);
+  let current = new Array<number>(b.length + 1);
+  for (let j = 0; j <= b.length; j++) previous[j] = j;
+
+  for (let i = 1; i <= a.length; i++) {
+    current[0] = i;
+    let rowMin = current[0];
+    for (let j = 1; j <= b.length; j++) {
+      current[j] = a.charCodeAt(i - 1) === b.charCodeAt(j - 1)
+        ? previous[j - 1]
+        : Math.min(previous[j], current[j - 1]) + 1;
+      if (current[j] < rowMin) rowMin = current[j];
+    }
+    if (rowMin > max) return max + 1;
+    [previous, current] = [current, previous];
+  }
+  return previous[b.length];
+}
+
+/** Todas las palabras de `words` aparecen en `tokens`, en el mismo orden */
+function isSubsequence(words: string[], tokens: string[]): boolean {
+  let i = 0;
+  for (const token of tokens) {
+    if (token === words[i] && ++i === words.length) return true;
+  }
+  return false;
+}
+
+function maxDistanceFor(compact: string): number {
+  if (compact.length < 7) return 0;
+  return compact.length <= 8 ? 1 : 2;
+}
+
+/**
+ * Las diferencias entre las palabras de `a` y `b` (emparejadas en orden)
+ * quedan en el interior de cada palabra
+ */
+function editsInsideWords(a: string[], b: string[]): boolean {
+  if (a.length !== b.length) return false;
+  for (let i = 0; i < a.length; i++) {
+    const x = a[i];
+    const y = b[i];
+    if (x === y) continue;
+    if (x[0] !== y[0]) return false;
+    if (x.length !== y.length && x[x.length - 1] !== y[y.length - 1]) return false;
+  }
+  return true;
+}
+
+/** La única key del bucket, o null si no hay o hay varias */
+function single(keys: Set<string> | undefined): string | null {
+  if (!keys || keys.size !== 1) return null;
+  return keys.values().next().value ?? null;
+}
+
+// ─── API pública ──────────────────────────────────────────────────────────────
+
+/**
+ * Registra una key (nombre normalizado). Se cuenta por fuente: una key
+ * añadida dos veces necesita dos removeGameName para salir del índice.
+ */
+export function addGameName(key: string): void {
+  const existing = byKey.get(key);
+  if (existing) {
+    existing.refs++;
+    return;
+  }
+
+  const folded = foldGameName(key);
+  if (!folded.compact) return;
+
+  const entry: IndexedName = { ...folded, key, trigrams: trigramsOf(folded.compact), refs: 1 };
+  byKey.set(key, entry);
+  addTo(byCompact, entry.compact, key);
+  if (entry.acronym) addTo(byAcronym, entry.acronym, key);
+  for (const gram of entry.trigrams) addTo(byTrigram, gram, key);
+}
+
+export function removeGameName(key: string): void {
+  const entry = byKey.get(key);
+  if (!entry || --entry.refs > 0) return;
+
+  byKey.delete(key);
+  removeFrom(byCompact, entry.compact, key);
+  if (entry.acronym) removeFrom(byAcronym, entry.acronym, key);
+  for (const gram of entry.trigrams) removeFrom(byTrigram, gram, key);
+}
+
+/**
+ * Busca la key indexada que corresponde a `name`, o null si no hay una
+ * coincidencia clara
+ */
+export function findGameName(name: string): string | null {
+  const query = foldGameName(name);
+  if (!query.compact) return null;
+
+  // Varias keys con la misma forma compacta son el mismo juego escrito distinto
+  const sameCompact = byCompact.get(query.compact);
+  if (sameCompact) return sameCompact.values().next().value!;
+  const acronym = single(byAcronym.get(query.compact));
+  if (acronym) return acronym;
+
+  // Candidatos que comparten suficientes trigramas
+  const grams = trigramsOf(query.compact);
+  const shared = new Map<string, number>();
+  for (const gram of grams) {
+    const keys = byTrigram.get(gram);
+    if (!keys) continue;
+    for (const key of keys) shared.set(key, (shared.get(key) ?? 0) + 1);
+  }
+
+  const maxDistance = maxDistanceFor(query.compact);
+  let best: string | null = null;
+  let bestDistance = maxDistance + 1;
+  let tied = false;
+
+  for (const [key, count] of shared) {
+    const candidate = byKey.get(key)!;
+    if (candidate.numbers !== query.numbers) continue;
+    if (count / Math.max(grams.length, candidate.trigrams.length) < MIN_TRIGRAM_OVERLAP) continue;
+    if (!editsInsideWords(query.tokens, candidate.tokens)) continue;
+
+    const distance = boundedDistance(query.compact, candidate.compact, Math.min(bestDistance, maxDistance));
+    if (distance < bestDistance) {
+      best = key;
+      bestDistance = distance;
+      tied = false;
+    } else if (distance === bestDistance && distance <= maxDistance) {
+      tied = true;
+    }
+  }
+  if (best && !tied) return best;
+
+  // Contención: solo con número y al menos dos palabras, para no confundir
+  // "hollow knight" con "hollow knight silksong"
+  const words = query.tokens.filter((token) => !isNumber(token));
+  if (!query.numbers || words.length < 2) return null;
+
+  let contained: string | null = null;
+  for (const key of shared.keys()) {
+    const candidate = byKey.get(key)!;
+    if (candidate.numbers !== query.numbers) continue;
+    if (!isSubsequence(words, candidate.tokens)) continue;
+    if (contained) return null; // ambiguo
+    contained = key;
+  }
+  return contained;
+}
+
+export function getGameNameIndexStats() {
+  return {
+    names: byKey.size,
+    trigrams: byTrigram.size,
+  };
+}
@@ -1,18 +1,116 @@
-import type { MessagePattern } from '../utils/types';
-import { MESSAGE_PATTERNS } from './messagePatterns';
+import type { MessagePattern, StreamMode } from '../utils/types';
+import { MESSAGE_PATTERNS, type HardcodedGameId } from './messagePatterns';
+import { resolvePhraseStore, type PhraseStore, type StoredPhrases } from './phraseStore';
+import { decodePhrasePack, getPhrasePackNames, hasPhrasePack, loadPhrasePack } from './phrasePacks';
+import { addGameName, findGameName, removeGameName } from './gameNameIndex';
+import { waitUntil } from './waitUntil';
 
 // ============================================
 // CACHE DE FRASES POR JUEGO
 // ============================================
+//
+// LRU acotado por bytes estimados y número de juegos, con TTL opcional.
+// El Map conserva el orden de inserción: cada acierto reinserta la entrada
+// al final, así que la primera key es siempre la menos usada.
+// Los juegos hardcodeados (MESSAGE_PATTERNS) no viven aquí: getPhrasesForGame
+// los sirve como fallback fijo, así que nunca se desalojan.
+// Este Map es el L1; el L2 persistente está más abajo (loadCachedPhrases).
 
-interface CachedGame {
-  phrases: MessagePattern;
-  generatedAt: number;
-  generatedBy: string;
+interface CachedGame extends StoredPhrases {
+  /** Estimación de memoria de la entrada (ver estimatePhrasesBytes) */
+  bytes: number;
+  /** La IA sigue añadiendo frases a `phrases` (ver startFillingPhrases) */
+  filling?: boolean;
+}
+
+function readNumber(value: unknown, fallback: number): number {
+  const parsed = Number(value);
+  return Number.isFinite(parsed) && parsed >= 0 ? parsed : fallback;
 }
 
+/** Memoria máxima estimada del cache (default 64 MB, ~150 juegos generados por IA) */
+const MAX_CACHE_BYTES = readNumber(import.meta.env.PHRASE_CACHE_MAX_BYTES, 64 * 1024 * 1024);
+
+/** Tope de juegos independiente del tamaño */
+const MAX_CACHED_GAMES = 1_000;
+
+/** Vida máxima de una entrada (ms). 0 = sin caducidad */
+const CACHE_TTL_MS = readNumber(import.meta.env.PHRASE_CACHE_TTL_MS, 0);
+
+/**
+ * Vida de una respuesta parcial (instantánea o proveedor cortado a mitad), en
+ * L1 y en L2: se sirve mientras tanto y la siguiente petición tras caducar la
+ * vuelve a generar
+ */
+const PARTIAL_TTL_MS = 10 * 60 * 1000;
+
+// Cabecera aproximada de un string en V8 y de cada slot de array
+const STRING_OVERHEAD_BYTES = 24;
+const ARRAY_SLOT_BYTES = 8;
+const ENTRY_OVERHEAD_BYTES = 256;
+
 // Cache global de frases por juego (normalizado a minúsculas)
 const phrasesCache = new Map<string, CachedGame>();
+let cacheBytes = 0;
+
+const cacheCounters = {
+  hits: 0,
+  misses: 0,
+  evictions: 0,
+  expirations: 0,
+  l2Hits: 0,
+  l2Misses: 0,
+  l2Writes: 0,
+  l2Errors: 0,
+  packLoads: 0,
+  fuzzyResolutions: 0,
+};
+
+// Se incrementa con cada cambio del cache; los generadores compilados de
+// chatGenerator lo comparan para saber si deben volver a resolver sus frases
+let phrasesVersion = 0;
+
+export function getPhrasesVersion(): number {
+  return phrasesVersion;
+}
+
+/**
+ * Estima los bytes que ocupa un MessagePattern en el heap.
+ * Cuenta 2 bytes por carácter (peor caso UTF-16) para no quedarse corto.
+ */
+function estimatePhrasesBytes(phrases: MessagePattern): number {
+  let bytes = ENTRY_OVERHEAD_BYTES;
+  for (const list of Object.values(phrases)) {
+    if (!Array.isArray(list)) continue;
+    for (const phrase of list) {
+      bytes += ARRAY_SLOT_BYTES + STRING_OVERHEAD_BYTES + phrase.length * 2;
+    }
+  }
+  return bytes;
+}
+
+function removeEntry(key: string, entry: CachedGame): void {
+  phrasesCache.delete(key);
+  cacheBytes -= entry.bytes;
+  removeGameName(key);
+  phrasesVersion++;
+}
+
+function isExpired(entry: CachedGame, now: number): boolean {
+  if (entry.partial && now - entry.generatedAt > PARTIAL_TTL_MS) return true;
+  return CACHE_TTL_MS > 0 && now - entry.generatedAt > CACHE_TTL_MS;
+}
+
+/**
+ * Desaloja las entradas menos usadas hasta volver a los límites
+ */
+function evictIfNeeded(): void {
+  while (phrasesCache.size > 0 && (cacheBytes > MAX_CACHE_BYTES || phrasesCache.size > MAX_CACHED_GAMES)) {
+    const [oldestKey, oldest] = phrasesCache.entries().next().value!;
+    removeEntry(oldestKey, oldest);
+    cacheCounters.evictions++;
+  }
+}
 
 /**
  * Normaliza el nombre del juego para usar como key
@@ -27,47 +125,365 @@ export function normalizeGameName(gameName: string): string {
 export function getCachedPhrases(gameName: string): MessagePattern | null {
   const key = normalizeGameName(gameName);
   const cached = phrasesCache.get(key);
-  return cached?.phrases || null;
+
+  if (!cached) {
+    cacheCounters.misses++;
+    return null;
+  }
+  if (isExpired(cached, Date.now())) {
+    removeEntry(key, cached);
+    cacheCounters.expirations++;
+    cacheCounters.misses++;
+    return null;
+  }
+
+  // Marcar como usado recientemente
+  phrasesCache.delete(key);
+  phrasesCache.set(key, cached);
+  cacheCounters.hits++;
+  return cached.phrases;
+}
+
+function insertEntry(key: string, stored: StoredPhrases): void {
+  const previous = phrasesCache.get(key);
+  if (previous) removeEntry(key, previous);
+
+  const entry: CachedGame = { ...stored, bytes: estimatePhrasesBytes(stored.phrases) };
+  phrasesCache.set(key, entry);
+  cacheBytes += entry.bytes;
+  addGameName(key);
+  phrasesVersion++;
+  evictIfNeeded();
 }
 
 /**
- * Guarda frases de un juego en el cache
+ * Guarda frases de un juego en el cache (L1 inmediato, L2 en segundo plano).
+ * Una respuesta `partial` solo va a L1 y caduca en PARTIAL_TTL_MS: en L2 ya
+ * está la instantánea de persistPhraseSnapshot, con la misma vida.
+ * Resuelve cuando la escritura en L2 termina (nunca rechaza).
  */
-export function setCachedPhrases(gameName: string, phrases: MessagePattern, userId: string): void {
+export function setCachedPhrases(gameName: string, phrases: MessagePattern, userId: string, partial = false): Promise<void> {
   const key = normalizeGameName(gameName);
-  phrasesCache.set(key, {
+  const stored: StoredPhrases = {
     phrases,
     generatedAt: Date.now(),
-    generatedBy: userId
-  });
+    generatedBy: userId,
+  };
+  if (partial) stored.partial = true;
+  insertEntry(key, stored);
+  negativeLookups.delete(key);
+  return partial ? Promise.resolve() : scheduleWrite(key, stored);
 }
 
 /**
- * Verifica si un juego existe en el cache
+ * Persiste en L2 lo generado hasta ahora, en cuanto cada categoría llega al
+ * mínimo, para que otras instancias y los cold starts no tengan que esperar
+ * al final de la generación. No toca L1 (ahí está la entrada en llenado) y
+ * caduca en PARTIAL_TTL_MS salvo que la respuesta completa la sustituya.
+ */
+export function persistPhraseSnapshot(gameName: string, phrases: MessagePattern, userId: string): Promise<void> {
+  const key = normalizeGameName(gameName);
+  return scheduleWrite(key, { phrases, generatedAt: Date.now(), generatedBy: userId, partial: true }, PARTIAL_TTL_MS);
+}
+
+/**
+ * Verifica si un juego existe en el cache (sin afectar al orden LRU)
  */
 export function hasGameInCache(gameName: string): boolean {
-  return phrasesCache.has(normalizeGameName(gameName));
+  const cached = phrasesCache.get(normalizeGameName(gameName));
+  return !!cached && !isExpired(cached, Date.now());
+}
+
+// ============================================
+// ENTRADAS EN LLENADO (entrega progresiva)
+// ============================================
+//
+// Mientras la IA genera, la entrada del juego ya existe con los arrays que se
+// van rellenando en sitio. chatGenerator detecta estos objetos con
+// isFillingPhrases, completa con FALLBACK_PHRASES las categorías que aún
+// tienen pocas frases y recompila cuando crecen. Al llegar al mínimo por
+// categoría, persistPhraseSnapshot deja una copia en L2. Al terminar,
+// complete() sustituye la entrada por la respuesta final (y la persiste en
+// L2 si no es parcial).
+
+const fillingPatterns = new WeakSet<MessagePattern>();
+
+/** Categorías que se aceptan en una entrada en llenado (emotes no se usa) */
+const FILLING_CATEGORIES = new Set(['gameplay', 'reactions', 'questions', 'comments', 'usernames']);
+
+export interface FillingPhrases {
+  phrases: MessagePattern;
+  append: (category: string, phrase: string) => void;
+  /** Vacía lo recibido (el proveedor falló y se reintenta con otro) */
+  reset: () => void;
+  /** `partial`: el proveedor se cortó. Resuelve tras la escritura en L2 (ver setCachedPhrases) */
+  complete: (phrases: MessagePattern, partial?: boolean) => Promise<void>;
+  /** La generación falló: quitar la entrada para que se pueda reintentar */
+  abort: () => void;
+}
+
+export function isFillingPhrases(phrases: MessagePattern): boolean {
+  return fillingPatterns.has(phrases);
+}
+
+/**
+ * Crea (o reemplaza) la entrada de un juego en estado "filling"
+ */
+export function startFillingPhrases(gameName: string, userId: string): FillingPhrases {
+  const key = normalizeGameName(gameName);
+  const phrases: MessagePattern = { gameplay: [], reactions: [], questions: [], comments: [], usernames: [] };
+  fillingPatterns.add(phrases);
+
+  const previous = phrasesCache.get(key);
+  if (previous) removeEntry(key, previous);
+  phrasesCache.set(key, { phrases, generatedAt: Date.now(), generatedBy: userId, bytes: 0, filling: true });
+  addGameName(key);
+  phrasesVersion++;
+
+  const finish = () => fillingPatterns.delete(phrases);
+
+  return {
+    phrases,
+    append(category, phrase) {
+      if (FILLING_CATEGORIES.has(category)) phrases[category as keyof MessagePattern]!.push(phrase);
+    },
+    reset() {
+      for (const category of FILLING_CATEGORIES) phrases[category as keyof MessagePattern]!.length = 0;
+    },
+    complete(final, partial = false) {
+      finish();
+      return setCachedPhrases(key, final, userId, partial);
+    },
+    abort() {
+      finish();
+      const entry = phrasesCache.get(key);
+      if (entry?.phrases === phrases) removeEntry(key, entry);
+    },
+  };
+}
+
+// ============================================
+// L2 PERSISTENTE (read-through / write-behind)
+// ============================================
+//
+// El L1 se pierde en cada cold start de Vercel. Con un store configurado
+// (KV en producción, disco en dev) las escrituras se replican en segundo
+// plano y loadCachedPhrases rellena el L1 desde el L2 antes de generar con IA
+// o de abrir un stream. getCachedPhrases sigue siendo síncrono y solo mira L1.
+
+const store = resolvePhraseStore();
+
+/** Una lectura L2 más lenta que esto se trata como miss (no bloquear el stream) */
+const L2_READ_TIMEOUT_MS = 1_500;
+
+/** Cache negativo: juegos que no están en L2 no se vuelven a consultar en este tiempo */
+const L2_MISS_TTL_MS = 30_000;
+const MAX_NEGATIVE_LOOKUPS = 1_000;
+
+const negativeLookups = new Map<string, number>(); // key -> expiresAt
+const pendingReads = new Map<string, Promise<MessagePattern | null>>();
+const pendingWrites = new Map<string, { stored: StoredPhrases; ttlMs: number }>();
+/** Vaciado de la cola en curso (null si no hay nada que escribir) */
+let draining: Promise<void> | null = null;
+
+function withTimeout<T>(promise: Promise<T>, ms: number): Promise<T> {
+  let timer: ReturnType<typeof setTimeout>;
+  const timeout = new Promise<never>((_, reject) => {
+    timer = setTimeout(() => reject(new Error(`timeout tras ${ms}ms`)), ms);
+  });
+  return Promise.race([promise, timeout]).finally(() => clearTimeout(timer));
+}
+
+function rememberMiss(key: string): void {
+  if (negativeLookups.size >= MAX_NEGATIVE_LOOKUPS) negativeLookups.clear();
+  negativeLookups.set(key, Date.now() + L2_MISS_TTL_MS);
+}
+
+async function readThrough(key: string): Promise<MessagePattern | null> {
+  try {
+    const stored = await withTimeout(store!.get(key), L2_READ_TIMEOUT_MS);
+    if (!stored || (CACHE_TTL_MS > 0 && Date.now() - stored.generatedAt > CACHE_TTL_MS)) {
+      cacheCounters.l2Misses++;
+      rememberMiss(key);
+      return null;
+    }
+    cacheCounters.l2Hits++;
+    // Una generación local pudo llegar mientras se leía: no pisarla
+    if (!phrasesCache.has(key)) insertEntry(key, stored);
+    return phrasesCache.get(key)!.phrases;
+  } catch (error) {
+    cacheCounters.l2Errors++;
+    console.error(`[PhraseCache] Error leyendo "${key}" de ${store!.name}:`, error);
+    // Un store caído no debe añadir el timeout a cada apertura de stream
+    rememberMiss(key);
+    return null;
+  }
+}
+
+/**
+ * Carga un paquete precompilado (src/lib/phrasePacks.ts) en L1. No se
+ * escribe en L2: el paquete ya viaja con el despliegue.
+ */
+async function loadPackThrough(key: string): Promise<MessagePattern | null> {
+  let pending = pendingReads.get(key);
+  if (!pending) {
+    pending = loadPhrasePack(key)
+      .then((pack) => {
+        if (!pack) return null;
+        cacheCounters.packLoads++;
+        // generatedAt = momento de carga: el TTL no debe caducar un paquete recién leído
+        if (!phrasesCache.has(key)) {
+          insertEntry(key, { phrases: decodePhrasePack(pack), generatedAt: Date.now(), generatedBy: pack.generatedBy });
+        }
+        return phrasesCache.get(key)!.phrases;
+      })
+      .catch((error) => {
+        console.error(`[PhraseCache] Error cargando el paquete de "${key}":`, error);
+        return null;
+      })
+      .finally(() => pendingReads.delete(key));
+    pendingReads.set(key, pending);
+  }
+  return pending;
+}
+
+/**
+ * Hay un store persistente configurado (lo generado sobrevive a cold starts)
+ */
+export function hasPhraseStore(): boolean {
+  return store !== null;
+}
+
+/**
+ * El store persistente, para quien guarda ahí algo más que frases (la
+ * demanda del pre-warming)
+ */
+export function getPhraseStore(): PhraseStore | null {
+  return store;
+}
+
+/**
+ * Obtiene las frases de un juego mirando L1 y, si falla, el store persistente.
+ * Las lecturas concurrentes del mismo juego comparten una sola consulta.
+ */
+export async function loadCachedPhrases(gameName: string): Promise<MessagePattern | null> {
+  const key = resolveGameName(gameName);
+  const cached = getCachedPhrases(key);
+  if (cached) return cached;
+
+  if (hasPhrasePack(key)) return loadPackThrough(key);
+  if (!store) return null;
+
+  const missUntil = negativeLookups.get(key);
+  if (missUntil !== undefined) {
+    if (missUntil > Date.now()) return null;
+    negativeLookups.delete(key);
+  }
+
+  let pending = pendingReads.get(key);
+  if (!pending) {
+    pending = readThrough(key).finally(() => pendingReads.delete(key));
+    pendingReads.set(key, pending);
+  }
+  return pending;
+}
+
+async function drainWrites(): Promise<void> {
+  try {
+    while (pendingWrites.size > 0) {
+      const [key, { stored, ttlMs }] = pendingWrites.entries().next().value!;
+      pendingWrites.delete(key);
+      try {
+        await store!.set(key, stored, ttlMs);
+        cacheCounters.l2Writes++;
+      } catch (error) {
+        cacheCounters.l2Errors++;
+        console.error(`[PhraseCache] Error guardando "${key}" en ${store!.name}:`, error);
+      }
+    }
+  } finally {
+    draining = null;
+  }
+}
+
+/**
+ * Encola la escritura en L2. Varias escrituras del mismo juego antes de
+ * vaciarse la cola se quedan en la última. Resuelve cuando la cola (con esta
+ * escritura) se ha vaciado; en serverless la función sigue viva hasta entonces,
+ * aunque ya haya respondido (ver waitUntil.ts).
+ */
+function scheduleWrite(key: string, stored: StoredPhrases, ttlMs = CACHE_TTL_MS): Promise<void> {
+  if (!store) return Promise.resolve();
+  pendingWrites.set(key, { stored, ttlMs });
+  draining ??= drainWrites();
+  waitUntil(draining);
+  return draining;
+}
+
+// ============================================
+// GENERACIONES EN CURSO (single-flight)
+// ============================================
+//
+// Dos usuarios que piden a la vez un juego sin cachear compartirían miss y
+// lanzarían dos generaciones de IA. Igual que `solicitudEnCurso` en
+// ChatMessage.tsx, la segunda petición espera la promesa de la primera.
+
+const inFlightGenerations = new Map<string, Promise<unknown>>();
+
+const generationCounters = {
+  generationsStarted: 0,
+  generationsCoalesced: 0,
+};
+
+/**
+ * Ejecuta `generate` una sola vez por juego y modo mientras haya una
+ * generación en curso; las peticiones concurrentes reciben el mismo
+ * resultado (o el mismo error, p. ej. INVALID_GAME).
+ */
+export function generatePhrasesOnce<T>(
+  gameName: string,
+  mode: StreamMode,
+  generate: () => Promise<T>
+): Promise<T> {
+  const key = `${mode}:${normalizeGameName(gameName)}`;
+  const inFlight = inFlightGenerations.get(key);
+  if (inFlight) {
+    generationCounters.generationsCoalesced++;
+    return inFlight as Promise<T>;
+  }
+
+  generationCounters.generationsStarted++;
+  const generation = generate().finally(() => inFlightGenerations.delete(key));
+  inFlightGenerations.set(key, generation);
+  return generation;
 }
 
 // ============================================
 // LÍMITE DE JUEGOS POR USUARIO
 // ============================================
 
-const MAX_GAMES_PER_USER = 4;
+export const MAX_GAMES_PER_USER = 4;
 
 interface UserGames {
   games: string[]; // Nombres de juegos (normalizados)
   createdAt: number;
 }
 
-// Cache de juegos por usuario
+/** Usuarios recordados; al superarlo se olvida el menos reciente */
+const MAX_TRACKED_USERS = 10_000;
+
+// Cache de juegos por usuario (LRU por orden de inserción, como phrasesCache)
 const userGamesCache = new Map<string, UserGames>();
 
 /**
  * Obtiene los juegos de un usuario
  */
 export function getUserGames(userId: string): string[] {
-  return userGamesCache.get(userId)?.games || [];
+  const userGames = userGamesCache.get(userId);
+  if (!userGames) return [];
+  userGamesCache.delete(userId);
+  userGamesCache.set(userId, userGames);
+  return userGames.games;
 }
 
 /**
@@ -111,6 +527,9 @@ export function addGameToUser(userId: string, gameName: string): boolean {
       games: [normalizedName],
       createdAt: Date.now()
     });
+    if (userGamesCache.size > MAX_TRACKED_USERS) {
+      userGamesCache.delete(userGamesCache.keys().next().value!);
+    }
   }
   
   return true;
@@ -125,31 +544,62 @@ export function userHasGame(userId: string, gameName: string): boolean {
   return userGames.includes(normalizedName);
 }
 
+// Mapeo de nombres comunes a IDs hardcodeados
+const HARDCODED_MAPPING: Record<string, HardcodedGameId> = {
+  'red dead redemption 2': 'rdr2',
+  'rdr2': 'rdr2',
+  'red dead': 'rdr2',
+  "baldur's gate 3": 'bg3',
+  'baldurs gate 3': 'bg3',
+  'bg3': 'bg3',
+  'minecraft': 'minecraft',
+};
+
+/**
+ * El juego tiene frases hardcodeadas o un paquete precompilado (nunca necesita IA)
+ */
+export function isHardcodedGame(gameName: string): boolean {
+  const normalizedName = normalizeGameName(gameName);
+  return normalizedName in HARDCODED_MAPPING || hasPhrasePack(normalizedName);
+}
+
+// Los nombres fijos (hardcodeados y paquetes) entran una vez en el índice
+// difuso; los del caché entran y salen con sus entradas
+for (const name of Object.keys(HARDCODED_MAPPING)) addGameName(name);
+for (const name of getPhrasePackNames()) addGameName(name);
+
+/**
+ * Key con la que buscar un juego: el nombre normalizado si ya se conoce tal
+ * cual y, si no, la key conocida más parecida (src/lib/gameNameIndex.ts).
+ * Un nombre nuevo de verdad se devuelve normalizado sin más.
+ */
+export function resolveGameName(gameName: string): string {
+  const normalizedName = normalizeGameName(gameName);
+  if (phrasesCache.has(normalizedName) || normalizedName in HARDCODED_MAPPING || hasPhrasePack(normalizedName)) {
+    return normalizedName;
+  }
+  const match = findGameName(normalizedName);
+  if (match === null) return normalizedName;
+  cacheCounters.fuzzyResolutions++;
+  return match;
+}
+
 /**
  * Obtiene las frases para un juego, ya sea del cache o hardcodeadas
  */
 export function getPhrasesForGame(gameName: string): MessagePattern | null {
+  // Variantes del nombre ("Red Dead 2") resuelven a la key existente
+  const normalizedName = resolveGameName(gameName);
+
   // Primero buscar en cache dinámico
-  const cached = getCachedPhrases(gameName);
+  const cached = getCachedPhrases(normalizedName);
   if (cached) {
     return cached;
   }
   
   // Buscar en los juegos hardcodeados como fallback
-  const normalizedName = normalizeGameName(gameName);
-  
-  // Mapeo de nombres comunes a IDs hardcodeados
-  const hardcodedMapping: Record<string, keyof typeof MESSAGE_PATTERNS> = {
-    'red dead redemption 2': 'rdr2',
-    'rdr2': 'rdr2',
-    'red dead': 'rdr2',
-    "baldur's gate 3": 'bg3',
-    'baldurs gate 3': 'bg3',
-    'bg3': 'bg3',
-    'minecraft': 'minecraft',
-  };
-  
-  const hardcodedId = hardcodedMapping[normalizedName];
+
+  const hardcodedId = HARDCODED_MAPPING[normalizedName];
   if (hardcodedId && MESSAGE_PATTERNS[hardcodedId]) {
     return MESSAGE_PATTERNS[hardcodedId];
   }
@@ -162,9 +612,22 @@ export function getPhrasesForGame(gameName: string): MessagePattern | null {
 // ============================================
 
 export function getCacheStats() {
+  const lookups = cacheCounters.hits + cacheCounters.misses;
   return {
     totalGames: phrasesCache.size,
     totalUsers: userGamesCache.size,
     games: Array.from(phrasesCache.keys()),
+    fillingGames: Array.from(phrasesCache).filter(([, entry]) => entry.filling).map(([key]) => key),
+    pinnedGames: Object.keys(MESSAGE_PATTERNS),
+    bytes: cacheBytes,
+    maxBytes: MAX_CACHE_BYTES,
+    maxGames: MAX_CACHED_GAMES,
+    ttlMs: CACHE_TTL_MS,
+    l2: store?.name ?? null,
+    pendingWrites: pendingWrites.size,
+    generationsInFlight: inFlightGenerations.size,
+    ...generationCounters,
+    ...cacheCounters,
+    hitRate: lookups > 0 ? cacheCounters.hits / lookups : 0,
   };
 }
@@ -0,0 +1,95 @@
+import { generateGamePhrases, generateChatTopicPhrases, isPartialPhrases } from './ai';
+import {
+  persistPhraseSnapshot,
+  setCachedPhrases,
+  generatePhrasesOnce,
+  startFillingPhrases,
+  type FillingPhrases,
+} from './phraseCache';
+import { waitUntil } from './waitUntil';
+import type { MessagePattern, StreamMode } from '../utils/types';
+
+// ============================================
+// GENERACIÓN CON IA + CACHÉ
+// ============================================
+//
+// Compartido por /api/generate-phrases y /api/generate-phrases-batch.
+
+export interface GeneratedPhrases {
+  phrases: MessagePattern;
+  /** La IA sigue generando: `phrases` es la entrada "filling" del caché */
+  filling: boolean;
+  /**
+   * Resuelve cuando la generación termina: true si quedó guardada completa,
+   * false si falló o si la respuesta es parcial (solo L1, de vida corta)
+   */
+  completion: Promise<boolean>;
+}
+
+/**
+ * Genera frases para un juego o tema y las guarda en caché. Si otro usuario
+ * ya está generando el mismo juego, se espera a su resultado.
+ *
+ * Resuelve con la primera frase (entrada "filling") o con la respuesta
+ * completa si la IA no entrega nada antes; los errores de validación
+ * (INVALID_GAME / INVALID_TOPIC) llegan como rechazo con `.code`.
+ */
+export function generateAndCachePhrases(
+  gameName: string,
+  normalizedGame: string,
+  mode: StreamMode,
+  userId: string
+): Promise<GeneratedPhrases> {
+  return generatePhrasesOnce(normalizedGame, mode, () => new Promise<GeneratedPhrases>((resolve, reject) => {
+    let entry: FillingPhrases | null = null;
+    let settle: (stored: boolean) => void = () => {};
+    const completion = new Promise<boolean>((resolveCompletion) => {
+      settle = resolveCompletion;
+    });
+    // La respuesta sale con la primera frase: en serverless la función tiene
+    // que seguir viva hasta que la IA termine y el resultado quede guardado
+    waitUntil(completion);
+
+    // Entrega progresiva: con la primera frase ya se sabe que el juego es
+    // válido, así que se crea la entrada "filling" y se responde. El
+    // stream puede arrancar mientras la IA sigue añadiendo frases.
+    const onPhrase = (category: string, phrase: string) => {
+      if (!entry) {
+        entry = startFillingPhrases(normalizedGame, userId);
+        resolve({ phrases: entry.phrases, filling: true, completion });
+      }
+      entry.append(category, phrase);
+    };
+    const onRestart = () => entry?.reset();
+    // Todas las categorías en el mínimo: la respuesta ya es utilizable desde
+    // cualquier instancia aunque esta no llegue a terminar la generación
+    const onReady = (ready: MessagePattern) => persistPhraseSnapshot(normalizedGame, ready, userId);
+
+    const generation = mode === 'justchatting'
+      ? generateChatTopicPhrases(gameName, { onPhrase, onRestart, onReady })
+      : generateGamePhrases(gameName, { onPhrase, onRestart, onReady });
+
+    generation.then(
+      (generated) => {
+        // Guardar en cache (sustituye a la entrada en llenado). Una respuesta
+        // cortada a mitad no se persiste: caduca pronto y se vuelve a generar
+        const partial = isPartialPhrases(generated);
+        const stored = entry
+          ? entry.complete(generated, partial)
+          : setCachedPhrases(normalizedGame, generated, userId, partial);
+        // completion (y con ella waitUntil) espera también a la escritura en L2
+        void stored.then(() => settle(!partial));
+        resolve({ phrases: generated, filling: false, completion });
+      },
+      (error) => {
+        settle(false);
+        if (entry) {
+          console.error(`[API] Error completando frases para ${gameName}:`, error);
+          entry.abort();
+          return;
+        }
+        reject(error);
+      }
+    );
+  }));
+}
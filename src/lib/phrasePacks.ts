@@ -0,0 +1,161 @@
+import type { MessagePattern, StreamMode } from '../utils/types';
+
+// ============================================
+// PAQUETES DE FRASES PRECOMPILADOS
+// ============================================
+//
+// scripts/build-phrase-packs.mjs genera en build un JSON por juego en
+// src/data/phrase-packs/ a partir de una lista semilla. Cada paquete guarda
+// cada string una sola vez (`strings`) y las categorías como índices, así que
+// las frases repetidas entre categorías se deduplican en disco y comparten el
+// mismo string en memoria al cargarse.
+//
+// import.meta.glob sin `eager` convierte cada paquete en un chunk aparte que
+// solo se importa cuando se pide ese juego: la librería puede crecer sin
+// engordar el bundle del servidor ni el arranque. Solo el índice de alias
+// (nombre normalizado -> slug) se carga de entrada.
+
+export const PHRASE_PACK_VERSION = 1;
+
+export interface PhrasePack {
+  version: number;
+  /** Nombre normalizado del juego o tema */
+  name: string;
+  mode: StreamMode;
+  generatedAt: number;
+  generatedBy: string;
+  /** Strings únicos del paquete */
+  strings: string[];
+  /** Categoría -> índices en `strings` */
+  categories: Record<string, number[]>;
+}
+
+/** Nombre normalizado (y alias) -> slug del fichero */
+export type PhrasePackIndex = Record<string, string>;
+
+const packLoaders = import.meta.glob<PhrasePack>(
+  ['../data/phrase-packs/*.json', '!../data/phrase-packs/index.json'],
+  { import: 'default' }
+);
+
+const indexModules = import.meta.glob<PhrasePackIndex>('../data/phrase-packs/index.json', {
+  import: 'default',
+  eager: true,
+});
+const packIndex: PhrasePackIndex = Object.values(indexModules)[0] ?? {};
+
+/**
+ * Slug de fichero para un nombre normalizado: sin acentos, solo [a-z0-9-]
+ */
+export function phrasePackSlug(normalizedName: string): string {
+  return normalizedName
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .replace(/[^a-z0-9]+/g, '-')
+    .replace(/^-|-$/g, '');
+}
+
+function packPath(slug: string): string {
+  return `../data/phrase-packs/${slug}.json`;
+}
+
+/**
+ * Hay paquete para este nombre (normalizado). No carga nada.
+ */
+export function hasPhrasePack(normalizedName: string): boolean {
+  const slug = packIndex[normalizedName];
+  return slug !== undefined && packPath(slug) in packLoaders;
+}
+
+/**
+ * Construye un paquete deduplicado a partir de frases por categoría
+ */
+export function encodePhrasePack(
+  name: string,
+  mode: StreamMode,
+  phrases: Record<string, string[]>,
+  generatedBy: string
+): PhrasePack {
+  const strings: string[] = [];
+  const positions = new Map<string, number>();
+  const categories: Record<string, number[]> = {};
+
+  for (const [category, list] of Object.entries(phrases)) {
+    if (!Array.isArray(list)) continue;
+    const seen = new Set<number>();
+    const indices: number[] = [];
+    for (const raw of list) {
+      if (typeof raw !== 'string') continue;
+      const phrase = raw.trim();
+      if (!phrase) continue;
+      let position = positions.get(phrase);
+      if (position === undefined) {
+        position = strings.length;
+        strings.push(phrase);
+        positions.set(phrase, position);
+      }
+      // Duplicados dentro de la categoría solo sesgarían el muestreo
+      if (seen.has(position)) continue;
+      seen.add(position);
+      indices.push(position);
+    }
+    categories[category] = indices;
+  }
+
+  return {
+    version: PHRASE_PACK_VERSION,
+    name,
+    mode,
+    generatedAt: Date.now(),
+    generatedBy,
+    strings,
+    categories,
+  };
+}
+
+/**
+ * Expande un paquete a MessagePattern (las categorías comparten los strings)
+ */
+export function decodePhrasePack(pack: PhrasePack): MessagePattern {
+  const phrases: Record<string, string[]> = {
+    gameplay: [],
+    reactions: [],
+    questions: [],
+    comments: [],
+    usernames: [],
+  };
+  for (const [category, indices] of Object.entries(pack.categories)) {
+    phrases[category] = indices.map((index) => pack.strings[index]);
+  }
+  return phrases as unknown as MessagePattern;
+}
+
+/**
+ * Importa (lazy) el paquete de un nombre normalizado, o null si no hay
+ */
+export async function loadPhrasePack(normalizedName: string): Promise<PhrasePack | null> {
+  const slug = packIndex[normalizedName];
+  const loader = slug !== undefined ? packLoaders[packPath(slug)] : undefined;
+  if (!loader) return null;
+
+  const pack = await loader();
+  if (pack.version !== PHRASE_PACK_VERSION) {
+    console.warn(`[PhrasePacks] Paquete "${slug}" con versión ${pack.version}, se ignora`);
+    return null;
+  }
+  return pack;
+}
+
+/**
+ * Nombres (y alias) con paquete, para el índice difuso de phraseCache
+ */
+export function getPhrasePackNames(): string[] {
+  return Object.keys(packIndex);
+}
+
+export function getPhrasePackStats() {
+  return {
+    packs: Object.keys(packLoaders).length,
+    names: Object.keys(packIndex).length,
+  };
+}
@@ -0,0 +1,28 @@
+import { createFileStore } from './stores/file';
+import { createKvStore } from './stores/kv';
+import type { PhraseStore } from './types';
+
+export type { PhraseStore, StoredPhrases } from './types';
+
+/**
+ * Resuelve el store L2 desde PHRASE_STORE ('kv' | 'file' | 'none').
+ * Sin valor explícito: KV si hay credenciales REST (Upstash / Vercel KV),
+ * disco en `pnpm dev` y ninguno en el resto de casos.
+ */
+export function resolvePhraseStore(): PhraseStore | null {
+  const env = import.meta.env;
+  const url = env.KV_REST_API_URL || env.UPSTASH_REDIS_REST_URL;
+  const token = env.KV_REST_API_TOKEN || env.UPSTASH_REDIS_REST_TOKEN;
+  const configured = String(env.PHRASE_STORE ?? '').trim().toLowerCase();
+
+  if (configured === 'none') return null;
+  if (configured === 'file') return createFileStore();
+  if (configured === 'kv' || (!configured && url && token)) {
+    if (!url || !token) {
+      console.warn('[PhraseStore] PHRASE_STORE=kv sin KV_REST_API_URL/KV_REST_API_TOKEN, se desactiva L2');
+      return null;
+    }
+    return createKvStore({ url, token });
+  }
+  return env.DEV ? createFileStore() : null;
+}
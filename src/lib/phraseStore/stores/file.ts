@@ -0,0 +1,96 @@
+import { mkdir, readFile, rename, writeFile } from 'node:fs/promises';
+import { join, resolve } from 'node:path';
+import type { PhraseStore, StoredPhrases } from '../types';
+
+// ============================================
+// STORE EN DISCO (desarrollo)
+// ============================================
+//
+// Un JSON por juego en PHRASE_STORE_DIR (default .cache/phrases). Sobrevive a
+// reinicios de `pnpm dev` sin depender de servicios externos. En Vercel el
+// sistema de ficheros es efímero, así que allí se usa el store KV. La demanda
+// por juego va en un único demand/counts.json (las keys nunca llevan '/').
+
+const DEFAULT_DIR = '.cache/phrases';
+
+interface FileEntry extends StoredPhrases {
+  /** Timestamp de caducidad (0 = nunca) */
+  expiresAt: number;
+}
+
+export function createFileStore(dir: string = import.meta.env.PHRASE_STORE_DIR || DEFAULT_DIR): PhraseStore {
+  const root = resolve(dir);
+  let ready: Promise<unknown> | null = null;
+
+  const pathFor = (key: string) => join(root, `${encodeURIComponent(key)}.json`);
+
+  const demandDir = join(root, 'demand');
+  const demandPath = join(demandDir, 'counts.json');
+  /** Lecturas-escrituras de la demanda en serie (un solo proceso de dev) */
+  let demandQueue: Promise<unknown> = Promise.resolve();
+
+  async function readDemand(): Promise<Record<string, number>> {
+    try {
+      return JSON.parse(await readFile(demandPath, 'utf-8'));
+    } catch {
+      return {};
+    }
+  }
+
+  function updateDemand(update: (counts: Record<string, number>) => Record<string, number>): Promise<void> {
+    const next = demandQueue.then(async () => {
+      const counts = update(await readDemand());
+      await mkdir(demandDir, { recursive: true });
+      const tmp = `${demandPath}.${process.pid}.tmp`;
+      await writeFile(tmp, JSON.stringify(counts), 'utf-8');
+      await rename(tmp, demandPath);
+    });
+    demandQueue = next.catch(() => {});
+    return next;
+  }
+
+  return {
+    name: 'file',
+    async get(key) {
+      let entry: FileEntry;
+      try {
+        entry = JSON.parse(await readFile(pathFor(key), 'utf-8'));
+      } catch {
+        // No existe o está corrupto: equivale a un miss
+        return null;
+      }
+      if (entry.expiresAt > 0 && entry.expiresAt < Date.now()) return null;
+      const { phrases, generatedAt, generatedBy, partial } = entry;
+      return partial ? { phrases, generatedAt, generatedBy, partial } : { phrases, generatedAt, generatedBy };
+    },
+    async set(key, value, ttlMs) {
+      ready ??= mkdir(root, { recursive: true });
+      await ready;
+      const entry: FileEntry = { ...value, expiresAt: ttlMs > 0 ? Date.now() + ttlMs : 0 };
+      // Escritura atómica: un lector concurrente nunca ve un JSON a medias
+      const target = pathFor(key);
+      const tmp = `${target}.${process.pid}.tmp`;
+      await writeFile(tmp, JSON.stringify(entry), 'utf-8');
+      await rename(tmp, target);
+    },
+    addDemand(member, by) {
+      return updateDemand((counts) => ({ ...counts, [member]: (counts[member] ?? 0) + by }));
+    },
+    async topDemand(limit) {
+      await demandQueue;
+      return Object.entries(await readDemand())
+        .sort((a, b) => b[1] - a[1])
+        .slice(0, limit)
+        .map(([member]) => member);
+    },
+    decayDemand(maxMembers) {
+      return updateDemand((counts) => Object.fromEntries(
+        Object.entries(counts)
+          .map(([member, count]) => [member, count / 2] as const)
+          .filter(([, count]) => count >= 1)
+          .sort((a, b) => b[1] - a[1])
+          .slice(0, maxMembers)
+      ));
+    },
+  };
+}
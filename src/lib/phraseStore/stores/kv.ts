@@ -0,0 +1,62 @@
+import type { PhraseStore, StoredPhrases } from '../types';
+
+// ============================================
+// STORE KV (producción)
+// ============================================
+//
+// Cliente mínimo de la API REST de Upstash Redis (la misma que exponen las
+// integraciones KV de Vercel): cada comando es un POST con el array de
+// argumentos en JSON. Sin SDK, solo fetch.
+
+const KEY_PREFIX = 'phrases:';
+/** Sorted set con la demanda por juego */
+const DEMAND_KEY = 'phrases-demand';
+
+export interface KvStoreConfig {
+  url: string;
+  token: string;
+}
+
+async function command<T>(config: KvStoreConfig, args: (string | number)[]): Promise<T> {
+  const response = await fetch(config.url, {
+    method: 'POST',
+    headers: {
+      Authorization: `Bearer ${config.token}`,
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(args),
+  });
+  const body = await response.json() as { result?: T; error?: string };
+  if (!response.ok || body.error) {
+    throw new Error(`KV ${args[0]} falló (${response.status}): ${body.error ?? 'sin detalle'}`);
+  }
+  return body.result as T;
+}
+
+export function createKvStore(config: KvStoreConfig): PhraseStore {
+  return {
+    name: 'kv',
+    async get(key) {
+      const raw = await command<string | null>(config, ['GET', KEY_PREFIX + key]);
+      return raw ? JSON.parse(raw) as StoredPhrases : null;
+    },
+    async set(key, value, ttlMs) {
+      const args: (string | number)[] = ['SET', KEY_PREFIX + key, JSON.stringify(value)];
+      if (ttlMs > 0) args.push('PX', ttlMs);
+      await command<string>(config, args);
+    },
+    async addDemand(member, by) {
+      await command<string>(config, ['ZINCRBY', DEMAND_KEY, by, member]);
+    },
+    async topDemand(limit) {
+      if (limit <= 0) return [];
+      return command<string[]>(config, ['ZREVRANGE', DEMAND_KEY, 0, limit - 1]);
+    },
+    async decayDemand(maxMembers) {
+      // Un solo set: ZUNIONSTORE sobre sí mismo con peso 0.5 lo divide entero
+      await command<number>(config, ['ZUNIONSTORE', DEMAND_KEY, 1, DEMAND_KEY, 'WEIGHTS', 0.5]);
+      await command<number>(config, ['ZREMRANGEBYSCORE', DEMAND_KEY, '-inf', '(1']);
+      await command<number>(config, ['ZREMRANGEBYRANK', DEMAND_KEY, 0, -(maxMembers + 1)]);
+    },
+  };
+}
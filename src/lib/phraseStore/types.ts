@@ -0,0 +1,32 @@
+import type { MessagePattern } from '../../utils/types';
+
+/** Entrada persistida de un juego/tema (misma forma que el cache en memoria) */
+export interface StoredPhrases {
+  phrases: MessagePattern;
+  generatedAt: number;
+  generatedBy: string;
+  /**
+   * Respuesta incompleta de la IA (instantánea al llegar al mínimo por
+   * categoría, o proveedor cortado): se sirve, pero caduca pronto
+   */
+  partial?: boolean;
+}
+
+/**
+ * Almacén duradero (L2) del cache de frases. Las keys ya llegan normalizadas.
+ */
+export interface PhraseStore {
+  name: string;
+  get: (key: string) => Promise<StoredPhrases | null>;
+  /** `ttlMs` 0 = sin caducidad */
+  set: (key: string, value: StoredPhrases, ttlMs: number) => Promise<void>;
+  /** Suma `by` a la demanda de `member` (juegos más pedidos, ver phraseWarmup) */
+  addDemand: (member: string, by: number) => Promise<void>;
+  /** Los `limit` miembros con más demanda, de mayor a menor */
+  topDemand: (limit: number) => Promise<string[]>;
+  /**
+   * Divide la demanda a la mitad, olvida lo que baja de 1 y se queda con
+   * los `maxMembers` más pedidos
+   */
+  decayDemand: (maxMembers: number) => Promise<void>;
+}
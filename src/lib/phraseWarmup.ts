@@ -0,0 +1,317 @@
+import { getAIProviderStats } from './ai';
+import { generateAndCachePhrases } from './phraseGeneration';
+import { getPhraseStore, hasPhraseStore, isHardcodedGame, loadCachedPhrases, normalizeGameName } from './phraseCache';
+import { waitUntil } from './waitUntil';
+import type { StreamMode } from '../utils/types';
+
+// ============================================
+// PRE-WARMING DEL CACHÉ DE FRASES
+// ============================================
+//
+// Genera en segundo plano las frases de los juegos más comunes para que
+// nunca paguen la latencia de la IA en el camino del request:
+// - una lista fija configurable (PHRASE_WARMUP_GAMES), y
+// - los N nombres más pedidos a generate-phrases. La demanda se cuenta en el
+//   store persistente (compartida entre instancias y cold starts) y, sin él,
+//   en memoria de esta instancia.
+//
+// Corre al arrancar (primer request que pasa por el middleware) y cada
+// PHRASE_WARMUP_INTERVAL_MS. En serverless, donde no hay proceso vivo entre
+// requests, el cron de vercel.json llama a /api/warmup.
+//
+// Cada pasada mira primero el caché (L1 + L2, sin coste de IA) y solo genera
+// lo que falta, con PHRASE_WARMUP_CONCURRENCY generaciones a la vez y como
+// mucho PHRASE_WARMUP_BUDGET llamadas a proveedores. Se detiene antes si los
+// proveedores fallan seguido o tienen el circuito abierto.
+
+/** Categorías de Twitch con más audiencia (las hardcodeadas se saltan) */
+const DEFAULT_WARMUP_GAMES = [
+  'fortnite',
+  'valorant',
+  'league of legends',
+  'grand theft auto v',
+  'counter-strike 2',
+  'elden ring',
+  'apex legends',
+  'call of duty warzone',
+  'world of warcraft',
+  'dota 2',
+];
+
+/** Fallos seguidos tras los que se abandona la pasada */
+const MAX_CONSECUTIVE_FAILURES = 3;
+
+/** Nombres distintos con contador de demanda */
+const MAX_TRACKED_REQUESTS = 500;
+
+/** Espera tras el primer request antes de la primera pasada */
+const START_DELAY_MS = 5_000;
+
+/** userId con el que quedan firmadas las frases pre-generadas */
+const WARMUP_USER_ID = 'warmup';
+
+function readNumber(value: unknown, fallback: number): number {
+  const parsed = Number(value);
+  return Number.isFinite(parsed) && parsed >= 0 ? parsed : fallback;
+}
+
+function readList(value: unknown): string[] | null {
+  const list = String(value ?? '')
+    .split(',')
+    .map((name) => normalizeGameName(name))
+    .filter(Boolean);
+  return list.length > 0 ? list : null;
+}
+
+const env = import.meta.env;
+
+/**
+ * PHRASE_WARMUP=on|off. Sin valor solo se activa con store persistente:
+ * sin él lo generado se pierde con cada cold start.
+ */
+function isWarmupEnabled(): boolean {
+  const value = String(env.PHRASE_WARMUP ?? '').trim().toLowerCase();
+  if (value === 'on') return true;
+  if (value === 'off') return false;
+  return hasPhraseStore();
+}
+
+const config = {
+  games: readList(env.PHRASE_WARMUP_GAMES) ?? DEFAULT_WARMUP_GAMES,
+  topRequested: readNumber(env.PHRASE_WARMUP_TOP, 10),
+  concurrency: Math.max(1, readNumber(env.PHRASE_WARMUP_CONCURRENCY, 2)),
+  budget: readNumber(env.PHRASE_WARMUP_BUDGET, 10),
+  intervalMs: readNumber(env.PHRASE_WARMUP_INTERVAL_MS, 30 * 60_000),
+};
+
+// ─── Demanda ──────────────────────────────────────────────────────────────────
+
+// `${mode}:${juego}` -> peticiones, con decaimiento a la mitad en cada pasada.
+// Solo sin store persistente: con él, la demanda vive en el store.
+const requestCounts = new Map<string, number>();
+
+/**
+ * Cuenta una petición de frases para que los juegos populares entren en el
+ * siguiente pre-warming
+ */
+export function recordGameRequest(gameName: string, mode: StreamMode): void {
+  const key = `${mode}:${normalizeGameName(gameName)}`;
+  const store = getPhraseStore();
+  if (store) {
+    waitUntil(store.addDemand(key, 1).catch((error) => {
+      console.error(`[Warmup] Error contando la demanda de ${key} en ${store.name}:`, error);
+    }));
+    return;
+  }
+
+  const count = requestCounts.get(key);
+  if (count === undefined && requestCounts.size >= MAX_TRACKED_REQUESTS) {
+    // Lleno: se olvidan los nombres pedidos una sola vez
+    for (const [name, value] of requestCounts) {
+      if (value <= 1) requestCounts.delete(name);
+    }
+    if (requestCounts.size >= MAX_TRACKED_REQUESTS) return;
+  }
+  requestCounts.set(key, (count ?? 0) + 1);
+}
+
+async function decayRequestCounts(): Promise<void> {
+  const store = getPhraseStore();
+  if (store) {
+    await store.decayDemand(MAX_TRACKED_REQUESTS).catch((error) => {
+      console.error(`[Warmup] Error reduciendo la demanda en ${store.name}:`, error);
+    });
+    return;
+  }
+
+  for (const [key, count] of requestCounts) {
+    const halved = Math.floor(count / 2);
+    if (halved === 0) requestCounts.delete(key);
+    else requestCounts.set(key, halved);
+  }
+}
+
+interface WarmupCandidate {
+  gameName: string;
+  mode: StreamMode;
+}
+
+async function mostRequested(): Promise<string[]> {
+  const store = getPhraseStore();
+  if (!store) {
+    return Array.from(requestCounts)
+      .sort((a, b) => b[1] - a[1])
+      .slice(0, config.topRequested)
+      .map(([key]) => key);
+  }
+  try {
+    return await store.topDemand(config.topRequested);
+  } catch (error) {
+    console.error(`[Warmup] Error leyendo la demanda de ${store.name}:`, error);
+    return [];
+  }
+}
+
+async function collectCandidates(): Promise<WarmupCandidate[]> {
+  const seen = new Set<string>();
+  const candidates: WarmupCandidate[] = [];
+  const add = (gameName: string, mode: StreamMode) => {
+    const key = `${mode}:${gameName}`;
+    if (seen.has(key) || (mode === 'game' && isHardcodedGame(gameName))) return;
+    seen.add(key);
+    candidates.push({ gameName, mode });
+  };
+
+  for (const gameName of config.games) add(gameName, 'game');
+
+  for (const key of await mostRequested()) {
+    const separator = key.indexOf(':');
+    add(key.slice(separator + 1), key.slice(0, separator) as StreamMode);
+  }
+  return candidates;
+}
+
+// ─── Pasada ───────────────────────────────────────────────────────────────────
+
+export interface WarmupReport {
+  startedAt: number;
+  durationMs: number;
+  candidates: number;
+  alreadyCached: number;
+  generated: number;
+  failed: number;
+  /** Candidatos sin mirar: presupuesto agotado o proveedores caídos */
+  skipped: number;
+  stopReason: 'done' | 'budget' | 'failures' | 'providers-down' | null;
+}
+
+let currentRun: Promise<WarmupReport> | null = null;
+let lastReport: WarmupReport | null = null;
+let totalRuns = 0;
+
+function providersDown(): boolean {
+  return getAIProviderStats().every((provider) => provider.state === 'open');
+}
+
+async function warmup(): Promise<WarmupReport> {
+  const startedAt = Date.now();
+  const candidates = await collectCandidates();
+  await decayRequestCounts();
+
+  const report: WarmupReport = {
+    startedAt,
+    durationMs: 0,
+    candidates: candidates.length,
+    alreadyCached: 0,
+    generated: 0,
+    failed: 0,
+    skipped: 0,
+    stopReason: null,
+  };
+
+  let next = 0;
+  let budget = config.budget;
+  let consecutiveFailures = 0;
+
+  const worker = async () => {
+    while (next < candidates.length && !report.stopReason) {
+      const { gameName, mode } = candidates[next++];
+
+      if (await loadCachedPhrases(gameName)) {
+        report.alreadyCached++;
+        continue;
+      }
+      if (budget <= 0) {
+        report.stopReason = 'budget';
+        report.skipped++;
+        break;
+      }
+      if (providersDown()) {
+        report.stopReason = 'providers-down';
+        report.skipped++;
+        break;
+      }
+
+      budget--;
+      try {
+        const { completion } = await generateAndCachePhrases(gameName, normalizeGameName(gameName), mode, WARMUP_USER_ID);
+        // El hueco de concurrencia se libera al terminar, no con la primera frase
+        if (await completion) {
+          report.generated++;
+          consecutiveFailures = 0;
+          continue;
+        }
+      } catch (error) {
+        console.error(`[Warmup] Error generando frases para ${gameName}:`, error);
+      }
+      report.failed++;
+      if (++consecutiveFailures >= MAX_CONSECUTIVE_FAILURES) report.stopReason = 'failures';
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(config.concurrency, candidates.length) }, worker));
+
+  report.skipped += candidates.length - next;
+  report.stopReason ??= 'done';
+  report.durationMs = Date.now() - report.startedAt;
+  return report;
+}
+
+/**
+ * Ejecuta una pasada de pre-warming. Si ya hay una en curso devuelve esa.
+ */
+export function runPhraseWarmup(): Promise<WarmupReport> {
+  if (currentRun) return currentRun;
+
+  currentRun = warmup()
+    .then((report) => {
+      lastReport = report;
+      totalRuns++;
+      console.log(
+        `[Warmup] ${report.generated} generados, ${report.alreadyCached} ya en caché, ` +
+        `${report.failed} fallidos, ${report.skipped} sin mirar (${report.stopReason}) en ${report.durationMs}ms`
+      );
+      return report;
+    })
+    .finally(() => {
+      currentRun = null;
+    });
+  return currentRun;
+}
+
+let scheduled = false;
+
+/**
+ * Programa la pasada de arranque y las periódicas. Idempotente: se llama
+ * en cada request y solo actúa la primera vez.
+ */
+export function startPhraseWarmup(): void {
+  if (scheduled) return;
+  scheduled = true;
+  if (!isWarmupEnabled()) return;
+
+  const run = () => {
+    runPhraseWarmup().catch((error) => console.error('[Warmup] Error en la pasada:', error));
+  };
+
+  const startTimer = setTimeout(run, START_DELAY_MS);
+  // No retener el proceso por el pre-warming
+  if (typeof startTimer === 'object' && 'unref' in startTimer) startTimer.unref();
+
+  if (config.intervalMs > 0) {
+    const intervalTimer = setInterval(run, config.intervalMs);
+    if (typeof intervalTimer === 'object' && 'unref' in intervalTimer) intervalTimer.unref();
+  }
+}
+
+export function getWarmupStats() {
+  return {
+    enabled: isWarmupEnabled(),
+    running: currentRun !== null,
+    totalRuns,
+    demand: getPhraseStore()?.name ?? 'memory',
+    trackedRequests: requestCounts.size,
+    ...config,
+    lastReport,
+  };
+}
@@ -0,0 +1,114 @@
+// ============================================
+// PRNG CON SEMILLA
+// ============================================
+//
+// Motor xoshiro128** (Blackman y Vigna): 4 palabras de 32 bits de estado,
+// periodo 2^128 - 1, solo sumas, xors, rotaciones y Math.imul. El estado se
+// puede guardar (id de evento SSE, ver streamSession.ts) y restaurar en otra
+// instancia para continuar exactamente la misma secuencia. Las semillas de un
+// solo entero se expanden a 4 palabras con splitmix32.
+//
+// No es criptográfico; decide frases, usernames, oleadas, intervalos y
+// emotes. Todo lo que acepta una fuente de aleatoriedad recibe `() => number`
+// (como Math.random), así que se puede inyectar cualquier otro generador.
+
+/** Fuente de números en [0, 1), como Math.random */
+export type RandomSource = () => number;
+
+export interface SeededRandom {
+  /** Siguiente número en [0, 1) */
+  next: RandomSource;
+  /** Siguiente entero sin signo de 32 bits */
+  nextUint32: () => number;
+  /** Estado actual: 4 enteros sin signo de 32 bits */
+  getState: () => number[];
+}
+
+const UINT32_RANGE = 4294967296;
+
+/**
+ * Expande una semilla de 32 bits a las 4 palabras de estado (splitmix32)
+ */
+function expandSeed(seed: number): number[] {
+  let x = seed >>> 0;
+  const state: number[] = [];
+  for (let i = 0; i < 4; i++) {
+    x = (x + 0x9e3779b9) >>> 0;
+    let z = x;
+    z = Math.imul(z ^ (z >>> 16), 0x21f0aaad);
+    z = Math.imul(z ^ (z >>> 15), 0x735a2d97);
+    state.push((z ^ (z >>> 15)) >>> 0);
+  }
+  return state;
+}
+
+/**
+ * Crea un generador a partir de una semilla de 32 bits o de un estado
+ * guardado con getState
+ */
+export function createSeededRandom(seed: number | readonly number[]): SeededRandom {
+  const initial = typeof seed === 'number' ? expandSeed(seed) : seed.map((word) => word >>> 0);
+  let [s0, s1, s2, s3] = initial;
+  // El estado todo a cero es el único punto fijo de xoshiro
+  if ((s0 | s1 | s2 | s3) === 0) [s0, s1, s2, s3] = expandSeed(0);
+
+  const nextUint32 = (): number => {
+    const product = Math.imul(s1, 5);
+    const result = Math.imul((product << 7) | (product >>> 25), 9) >>> 0;
+    const t = s1 << 9;
+    s2 ^= s0;
+    s3 ^= s1;
+    s1 ^= s2;
+    s0 ^= s3;
+    s2 ^= t;
+    s3 = (s3 << 11) | (s3 >>> 21);
+    return result;
+  };
+
+  return {
+    next: () => nextUint32() / UINT32_RANGE,
+    nextUint32,
+    getState: () => [s0 >>> 0, s1 >>> 0, s2 >>> 0, s3 >>> 0],
+  };
+}
+
+/**
+ * Semilla aleatoria de 32 bits para una sesión nueva
+ */
+export function randomSeed(): number {
+  return crypto.getRandomValues(new Uint32Array(1))[0];
+}
+
+/**
+ * Combina una semilla con un número (ronda, índice…) en otra semilla,
+ * para derivar secuencias independientes sin guardar estado
+ */
+export function deriveSeed(seed: number, value: number): number {
+  let h = Math.imul((seed ^ Math.imul(value + 1, 0x9e3779b1)) >>> 0, 0x85ebca6b);
+  h ^= h >>> 13;
+  h = Math.imul(h, 0xc2b2ae35);
+  return (h ^ (h >>> 16)) >>> 0;
+}
+
+/**
+ * Hash FNV-1a de 32 bits: semilla estable a partir de un string (id de mensaje)
+ */
+export function hashString(value: string): number {
+  let h = 0x811c9dc5;
+  for (let i = 0; i < value.length; i++) {
+    h = Math.imul(h ^ value.charCodeAt(i), 0x01000193);
+  }
+  return h >>> 0;
+}
+
+/**
+ * Fisher-Yates en sitio con la fuente de aleatoriedad dada
+ */
+export function shuffleInPlace<T>(arr: T[], random: RandomSource = Math.random): void {
+  for (let i = arr.length - 1; i > 0; i--) {
+    const j = Math.floor(random() * (i + 1));
+    const tmp = arr[i];
+    arr[i] = arr[j];
+    arr[j] = tmp;
+  }
+}
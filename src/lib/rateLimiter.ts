@@ -2,137 +2,185 @@
 // RATE LIMITER — ventana deslizante en memoria
 // ============================================
 //
-// Dos mecanismos independientes:
-// 1. Rate limit por IP: limita requests/ventana a cualquier ruta protegida
-// 2. Un stream SSE activo por usuario: si llega uno nuevo, cancela el anterior
+// Rate limit por IP y ruta: limita requests/ventana con memoria fija.
+// (Un stream SSE activo por usuario: ver streamRegistry.ts)
 
 // ============================================
-// 1. RATE LIMIT POR IP (ventana deslizante)
+// RATE LIMIT POR IP (ventana deslizante)
 // ============================================
+//
+// Ventana deslizante aproximada con dos contadores por key: los requests de
+// la ventana fija actual y los de la anterior, ponderados por la parte de la
+// anterior que aún cae dentro de los últimos WINDOW_MS. Cada comprobación es
+// O(1) y cada key ocupa lo mismo, tenga 1 request o 10.000.
+//
+// Las keys (`ruta:ip`) viven en un LRU de dos generaciones con tope
+// RATE_LIMIT_MAX_KEYS: cuando la generación reciente se llena pasa a ser la
+// antigua y la antigua anterior se descarta entera. Una key usada se promueve
+// a la reciente. Así una inundación de IPs distintas desaloja las inactivas
+// sin recorrer nada (borrar siempre la primera key de un Map acumula huecos
+// que `keys().next()` tiene que saltar) y no hace falta limpieza periódica:
+// una key sin actividad en dos ventanas equivale a una nueva.
+
+export type RateLimitRoute = 'api' | 'sse' | 'generate';
+
+interface RateLimitPolicy {
+  limit: number;
+  windowMs: number;
+}
 
 interface RateLimitEntry {
-  timestamps: number[];
+  /** Inicio de la ventana fija actual */
+  windowStart: number;
+  current: number;
+  previous: number;
 }
 
-const ipRateLimits = new Map<string, RateLimitEntry>();
+export interface RateLimitResult {
+  allowed: boolean;
+  limit: number;
+  remaining: number;
+  /** ms hasta que vuelva a haber hueco (0 si allowed) */
+  retryAfterMs: number;
+}
 
-/** Intervalo de limpieza de entradas expiradas (5 min) */
-const CLEANUP_INTERVAL = 5 * 60 * 1000;
+function readNumber(value: unknown, fallback: number): number {
+  const parsed = Number(value);
+  return Number.isFinite(parsed) && parsed > 0 ? parsed : fallback;
+}
 
 /** Ventana de tiempo para contar requests (1 min) */
 const WINDOW_MS = 60 * 1000;
 
-/** Maximo de requests por IP dentro de la ventana */
-const MAX_REQUESTS_PER_WINDOW = 60;
-
 /**
- * Verifica si una IP puede hacer un request.
- * Retorna `true` si esta permitido, `false` si excede el limite.
+ * Requests por IP dentro de la ventana, por tipo de ruta:
+ * - api: cualquier endpoint /api/*
+ * - sse: aperturas de /api/chat-stream (cada una cancela la anterior). Cada
+ *   stream reconecta solo al cortar un segmento (SSE_SEGMENT_MS, ~1 por
+ *   minuto) y detrás de un NAT muchos usuarios comparten IP: el cupo tiene
+ *   que quedar muy por encima de 1 por usuario y minuto
+ * - generate: /api/generate-phrases(-batch), que puede acabar llamando a la IA
  */
-export function checkIpRateLimit(ip: string): boolean {
-  const now = Date.now();
-  const entry = ipRateLimits.get(ip);
-
-  if (!entry) {
-    ipRateLimits.set(ip, { timestamps: [now] });
-    return true;
-  }
-
-  // Filtrar timestamps fuera de la ventana
-  entry.timestamps = entry.timestamps.filter((t) => now - t < WINDOW_MS);
-  entry.timestamps.push(now);
-
-  return entry.timestamps.length <= MAX_REQUESTS_PER_WINDOW;
+const POLICIES: Record<RateLimitRoute, RateLimitPolicy> = {
+  api: { limit: readNumber(import.meta.env.RATE_LIMIT_API, 60), windowMs: WINDOW_MS },
+  sse: { limit: readNumber(import.meta.env.RATE_LIMIT_SSE, 120), windowMs: WINDOW_MS },
+  generate: { limit: readNumber(import.meta.env.RATE_LIMIT_GENERATE, 20), windowMs: WINDOW_MS },
+};
+
+/** Keys (ruta + IP) seguidas a la vez */
+const MAX_TRACKED_KEYS = readNumber(import.meta.env.RATE_LIMIT_MAX_KEYS, 10_000);
+
+// Cada generación guarda como mucho la mitad del tope
+const GENERATION_SIZE = Math.max(1, Math.floor(MAX_TRACKED_KEYS / 2));
+let recentKeys = new Map<string, RateLimitEntry>();
+let olderKeys = new Map<string, RateLimitEntry>();
+
+const rateLimitCounters = {
+  allowed: 0,
+  rejected: 0,
+  evictions: 0,
+};
+
+function findEntry(key: string): RateLimitEntry | undefined {
+  return recentKeys.get(key) ?? olderKeys.get(key);
 }
 
 /**
- * Obtiene cuantos requests quedan para una IP en la ventana actual.
+ * Busca (o crea) la entrada de una key y la deja en la generación reciente
  */
-export function getRemainingRequests(ip: string): number {
-  const now = Date.now();
-  const entry = ipRateLimits.get(ip);
-
-  if (!entry) return MAX_REQUESTS_PER_WINDOW;
-
-  const active = entry.timestamps.filter((t) => now - t < WINDOW_MS);
-  return Math.max(0, MAX_REQUESTS_PER_WINDOW - active.length);
+function touchEntry(key: string, windowStart: number): RateLimitEntry {
+  let entry = recentKeys.get(key);
+  if (entry) return entry;
+
+  entry = olderKeys.get(key);
+  if (entry) olderKeys.delete(key);
+  else entry = { windowStart, current: 0, previous: 0 };
+
+  if (recentKeys.size >= GENERATION_SIZE) {
+    rateLimitCounters.evictions += olderKeys.size;
+    olderKeys = recentKeys;
+    recentKeys = new Map();
+  }
+  recentKeys.set(key, entry);
+  return entry;
 }
 
-// ============================================
-// 2. STREAM SSE ACTIVO POR USUARIO
-// ============================================
-//
-// Cada usuario puede tener como máximo 1 stream SSE abierto.
-// Si llega una nueva conexión del mismo usuario, el stream anterior
-// se cancela automáticamente antes de abrir el nuevo.
-// Esto evita cualquier race condition: no hay contadores, no hay slots.
-
-const activeControllers = new Map<string, AbortController>();
-
 /**
- * Registra un nuevo stream SSE para un usuario.
- * Si ya existía uno activo, lo cancela primero.
- * Devuelve el AbortController que el stream debe usar para su cleanup.
+ * Desplaza las ventanas fijas hasta la que contiene `now`
  */
-export function registerStream(userId: string): AbortController {
-  // Cancelar el stream anterior si existe
-  activeControllers.get(userId)?.abort();
+function roll(entry: RateLimitEntry, now: number, windowMs: number): void {
+  const elapsedWindows = Math.floor((now - entry.windowStart) / windowMs);
+  if (elapsedWindows <= 0) return;
+  entry.previous = elapsedWindows === 1 ? entry.current : 0;
+  entry.current = 0;
+  entry.windowStart += elapsedWindows * windowMs;
+}
 
-  const controller = new AbortController();
-  activeControllers.set(userId, controller);
-  return controller;
+/** Requests estimados en los últimos windowMs */
+function estimate(entry: RateLimitEntry, now: number, windowMs: number): number {
+  const previousWeight = 1 - (now - entry.windowStart) / windowMs;
+  return entry.previous * previousWeight + entry.current;
 }
 
 /**
- * Elimina el registro del stream cuando termina.
- * Solo borra si el controller coincide con el registrado actualmente
- * (evita borrar el de un stream más nuevo que ya lo reemplazó).
+ * ms hasta que la estimación baje de `limit` sin más requests
  */
-export function unregisterStream(userId: string, controller: AbortController): void {
-  if (activeControllers.get(userId) === controller) {
-    activeControllers.delete(userId);
+function retryAfter(entry: RateLimitEntry, now: number, { limit, windowMs }: RateLimitPolicy): number {
+  const intoWindow = now - entry.windowStart;
+  if (entry.current >= limit) {
+    // Hay que esperar a la ventana siguiente y a que la actual pese lo bastante poco
+    const fraction = 1 - (limit - 1) / entry.current;
+    return Math.ceil(windowMs - intoWindow + fraction * windowMs);
   }
+  const fraction = 1 - (limit - 1 - entry.current) / entry.previous;
+  return Math.max(1, Math.ceil(fraction * windowMs - intoWindow));
 }
 
 /**
- * Devuelve true si el usuario tiene un stream SSE activo.
- * Usado por chat-wave para validar que hay un stream al que enviar oleadas.
+ * Verifica si una IP puede hacer un request a un tipo de ruta y, si puede,
+ * lo cuenta. Los requests rechazados no consumen cupo.
  */
-export function hasActiveStream(userId: string): boolean {
-  return activeControllers.has(userId);
-}
+export function checkIpRateLimit(ip: string, route: RateLimitRoute = 'api'): RateLimitResult {
+  const policy = POLICIES[route];
+  const now = Date.now();
+  const entry = touchEntry(`${route}:${ip}`, now - (now % policy.windowMs));
+  roll(entry, now, policy.windowMs);
 
-// ============================================
-// LIMPIEZA PERIODICA
-// ============================================
+  const used = estimate(entry, now, policy.windowMs);
+  if (used >= policy.limit) {
+    rateLimitCounters.rejected++;
+    return { allowed: false, limit: policy.limit, remaining: 0, retryAfterMs: retryAfter(entry, now, policy) };
+  }
+
+  entry.current++;
+  rateLimitCounters.allowed++;
+  return {
+    allowed: true,
+    limit: policy.limit,
+    remaining: Math.max(0, Math.ceil(policy.limit - used - 1)),
+    retryAfterMs: 0,
+  };
+}
 
 /**
- * Elimina entradas expiradas del rate limiter de IPs.
- * Se ejecuta automaticamente cada CLEANUP_INTERVAL.
+ * Obtiene cuantos requests quedan para una IP en la ventana actual,
+ * sin contar ninguno.
  */
-function cleanup(): void {
-  const now = Date.now();
+export function getRemainingRequests(ip: string, route: RateLimitRoute = 'api'): number {
+  const policy = POLICIES[route];
+  const entry = findEntry(`${route}:${ip}`);
+  if (!entry) return policy.limit;
 
-  for (const [ip, entry] of ipRateLimits) {
-    entry.timestamps = entry.timestamps.filter((t) => now - t < WINDOW_MS);
-    if (entry.timestamps.length === 0) {
-      ipRateLimits.delete(ip);
-    }
-  }
+  const now = Date.now();
+  roll(entry, now, policy.windowMs);
+  return Math.max(0, Math.ceil(policy.limit - estimate(entry, now, policy.windowMs)));
 }
 
-// Ejecutar limpieza periodica solo en server (no en build)
-if (typeof globalThis.setInterval === 'function') {
-  const cleanupId = setInterval(cleanup, CLEANUP_INTERVAL);
-  // Permitir que el proceso termine sin esperar al intervalo
-  if (typeof cleanupId === 'object' && 'unref' in cleanupId) {
-    cleanupId.unref();
-  }
+export function getRateLimitStats() {
+  return {
+    trackedKeys: recentKeys.size + olderKeys.size,
+    maxKeys: MAX_TRACKED_KEYS,
+    ...rateLimitCounters,
+    policies: POLICIES,
+  };
 }
-
-// ============================================
-// CONSTANTES EXPORTADAS (para headers)
-// ============================================
-
-export const RATE_LIMIT_WINDOW_MS = WINDOW_MS;
-export const RATE_LIMIT_MAX_REQUESTS = MAX_REQUESTS_PER_WINDOW;
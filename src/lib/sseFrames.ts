@@ -0,0 +1,191 @@
+import type { ChatMessage, MessageCategory } from '../utils/types';
+
+// ============================================
+// FRAMES SSE PRE-CODIFICADOS
+// ============================================
+//
+// Cada mensaje de chat sale como `data: {"id":…,"username":…,"content":…,
+// "timestamp":…,"category":…}\n\n`. Username, content y category vienen de
+// pools finitos, así que sus bytes JSON se codifican una sola vez y se cachean.
+// Por mensaje solo se escriben el id y el timestamp (ASCII) y se copian los
+// fragmentos en un único Uint8Array: sin JSON.stringify ni TextEncoder.
+// El resultado es byte a byte igual a `data: ${JSON.stringify(message)}\n\n`.
+//
+// Con `eventId` el frame empieza por `id: <eventId>\n`: el navegador lo
+// devuelve en Last-Event-ID al reconectar (ver streamSession.ts).
+
+const encoder = new TextEncoder();
+
+/** Heartbeat compartido por todos los streams (nunca se muta) */
+export const HEARTBEAT_FRAME = encoder.encode(': ping\n\n');
+
+const DATA_PREFIX = encoder.encode('data: ');
+const EVENT_ID_PREFIX = encoder.encode('id: ');
+const NEWLINE = 0x0a;
+const FRAME_END = encoder.encode('\n\n');
+const ID_PREFIX = encoder.encode('{"id":"');
+const USERNAME_KEY = encoder.encode('","username":');
+const CONTENT_KEY = encoder.encode(',"content":');
+const TIMESTAMP_KEY = encoder.encode(',"timestamp":');
+
+const BATCH_OPEN = 0x5b;  // [
+const BATCH_SEP = 0x2c;   // ,
+const BATCH_CLOSE = 0x5d; // ]
+
+// `,"category":"gameplay"}` ya completo por categoría
+const CATEGORY_SUFFIX: Record<MessageCategory, Uint8Array> = {
+  gameplay: encoder.encode(',"category":"gameplay"}'),
+  reactions: encoder.encode(',"category":"reactions"}'),
+  questions: encoder.encode(',"category":"questions"}'),
+  comments: encoder.encode(',"category":"comments"}'),
+};
+
+/**
+ * Límite de strings cacheados. Los pools de frases son finitos, pero cada
+ * juego generado por IA añade cientos; al superar el límite se vacía entero.
+ */
+const MAX_CACHED_STRINGS = 50_000;
+
+const jsonStringCache = new Map<string, Uint8Array>();
+
+/**
+ * Devuelve los bytes de JSON.stringify(value) (con comillas y escapes), cacheados
+ */
+function encodeJsonString(value: string): Uint8Array {
+  let bytes = jsonStringCache.get(value);
+  if (!bytes) {
+    if (jsonStringCache.size >= MAX_CACHED_STRINGS) jsonStringCache.clear();
+    bytes = encoder.encode(JSON.stringify(value));
+    jsonStringCache.set(value, bytes);
+  }
+  return bytes;
+}
+
+/**
+ * Escribe un string ASCII (ids, dígitos) directamente en el buffer
+ */
+function writeAscii(target: Uint8Array, offset: number, value: string): number {
+  for (let i = 0; i < value.length; i++) {
+    target[offset + i] = value.charCodeAt(i);
+  }
+  return offset + value.length;
+}
+
+function isAscii(value: string): boolean {
+  for (let i = 0; i < value.length; i++) {
+    const code = value.charCodeAt(i);
+    if (code > 0x7e || code < 0x20 || code === 0x22 || code === 0x5c) return false;
+  }
+  return true;
+}
+
+/**
+ * Bytes que ocupa el JSON de un mensaje (sin prefijo `data: ` ni `\n\n`)
+ */
+function messageLength(message: ChatMessage): number {
+  return (
+    ID_PREFIX.length + message.id.length +
+    USERNAME_KEY.length + encodeJsonString(message.username).length +
+    CONTENT_KEY.length + encodeJsonString(message.content).length +
+    TIMESTAMP_KEY.length + String(message.timestamp).length +
+    CATEGORY_SUFFIX[message.category].length
+  );
+}
+
+/**
+ * Escribe el JSON de un mensaje en `frame` a partir de `offset`
+ */
+function writeMessage(frame: Uint8Array, offset: number, message: ChatMessage): number {
+  const username = encodeJsonString(message.username);
+  const content = encodeJsonString(message.content);
+  const suffix = CATEGORY_SUFFIX[message.category];
+
+  frame.set(ID_PREFIX, offset); offset += ID_PREFIX.length;
+  offset = writeAscii(frame, offset, message.id);
+  frame.set(USERNAME_KEY, offset); offset += USERNAME_KEY.length;
+  frame.set(username, offset); offset += username.length;
+  frame.set(CONTENT_KEY, offset); offset += CONTENT_KEY.length;
+  frame.set(content, offset); offset += content.length;
+  frame.set(TIMESTAMP_KEY, offset); offset += TIMESTAMP_KEY.length;
+  offset = writeAscii(frame, offset, String(message.timestamp));
+  frame.set(suffix, offset);
+  return offset + suffix.length;
+}
+
+/** Bytes de `id: <eventId>\n` (0 sin eventId) */
+function eventIdLength(eventId: string | undefined): number {
+  return eventId ? EVENT_ID_PREFIX.length + eventId.length + 1 : 0;
+}
+
+/**
+ * Escribe `id: <eventId>\n` y `data: ` al principio del frame
+ */
+function writeFrameStart(frame: Uint8Array, eventId: string | undefined): number {
+  let offset = 0;
+  if (eventId) {
+    frame.set(EVENT_ID_PREFIX, 0);
+    offset = writeAscii(frame, EVENT_ID_PREFIX.length, eventId);
+    frame[offset++] = NEWLINE;
+  }
+  frame.set(DATA_PREFIX, offset);
+  return offset + DATA_PREFIX.length;
+}
+
+/**
+ * Construye el frame SSE de un mensaje de chat en una sola asignación
+ */
+export function encodeMessageFrame(message: ChatMessage, eventId?: string): Uint8Array {
+  // Los ids son UUIDs o contadores ASCII; cualquier otra cosa va por la vía lenta
+  if (!isAscii(message.id)) return encodeDataFrame(message, eventId);
+
+  const frame = new Uint8Array(eventIdLength(eventId) + DATA_PREFIX.length + messageLength(message) + FRAME_END.length);
+  const offset = writeMessage(frame, writeFrameStart(frame, eventId), message);
+  frame.set(FRAME_END, offset);
+  return frame;
+}
+
+/**
+ * Frame SSE con varios mensajes: `data: [{…},{…}]\n\n`.
+ * Con un solo mensaje equivale a encodeMessageFrame (objeto, no array).
+ */
+export function encodeBatchFrame(messages: ChatMessage[], eventId?: string): Uint8Array {
+  if (messages.length === 1) return encodeMessageFrame(messages[0], eventId);
+  if (!messages.every((message) => isAscii(message.id))) return encodeDataFrame(messages, eventId);
+
+  let length = eventIdLength(eventId) + DATA_PREFIX.length + 2 + (messages.length - 1) + FRAME_END.length;
+  for (const message of messages) length += messageLength(message);
+
+  const frame = new Uint8Array(length);
+  let offset = writeFrameStart(frame, eventId);
+  frame[offset++] = BATCH_OPEN;
+  for (let i = 0; i < messages.length; i++) {
+    if (i > 0) frame[offset++] = BATCH_SEP;
+    offset = writeMessage(frame, offset, messages[i]);
+  }
+  frame[offset++] = BATCH_CLOSE;
+  frame.set(FRAME_END, offset);
+  return frame;
+}
+
+/**
+ * Frame genérico para eventos poco frecuentes (error, stream-end)
+ */
+export function encodeDataFrame(payload: unknown, eventId?: string): Uint8Array {
+  const idLine = eventId ? `id: ${eventId}\n` : '';
+  return encoder.encode(`${idLine}data: ${JSON.stringify(payload)}\n\n`);
+}
+
+/**
+ * Bloque solo con `id:`: actualiza el Last-Event-ID del navegador sin
+ * disparar ningún evento
+ */
+export function encodeEventIdFrame(eventId: string): Uint8Array {
+  return encoder.encode(`id: ${eventId}\n\n`);
+}
+
+/**
+ * Frame `retry:`: cuánto espera el navegador antes de reconectar solo
+ */
+export function encodeRetryFrame(ms: number): Uint8Array {
+  return encoder.encode(`retry: ${Math.round(ms)}\n\n`);
+}
@@ -0,0 +1,257 @@
+import type { ChatMessage } from '../utils/types';
+import { encodeBatchFrame, encodeMessageFrame, HEARTBEAT_FRAME } from './sseFrames';
+
+// ============================================
+// ESCRITOR SSE CON BACKPRESSURE
+// ============================================
+//
+// Un cliente parado (pestaña en segundo plano, fuente de OBS con mala red)
+// deja de leer, pero el stream sigue generando mensajes: sin control, la cola
+// del ReadableStream crece hasta que el stream expira a las 2 horas.
+//
+// El ReadableStream se crea con SSE_QUEUING_STRATEGY, que cuenta la cola en
+// bytes, y el escritor mira `controller.desiredSize` antes de cada mensaje:
+//
+// - Cola por debajo de SSE_HIGH_WATER_MARK: los frames salen tal cual.
+// - Cola llena: el cliente va atrasado. Los mensajes de chat se retienen
+//   (como mucho MAX_HELD_MESSAGES, se descartan los más viejos) y cuando el
+//   cliente vuelve a leer (`pull`) salen todos en un único frame de lote,
+//   sin los que ya llevan más de MAX_HELD_AGE_MS esperando, con el `id:`
+//   del último mensaje retenido.
+// - Heartbeats y frames de control (error, fin de stream) nunca se retienen.
+// - Más de MAX_LAG_MS seguidos con la cola llena: se corta la conexión y se
+//   descarta la cola con `controller.error`.
+//
+// La memoria por conexión queda acotada a la cola (~high-water mark más un
+// frame) y los mensajes retenidos, haga lo que haga el cliente.
+
+/** Bytes en cola a partir de los cuales el cliente se considera atrasado */
+export const SSE_HIGH_WATER_MARK = 32 * 1024;
+
+/** Estrategia de cola del ReadableStream: cuenta bytes, no chunks */
+export const SSE_QUEUING_STRATEGY: QueuingStrategy<Uint8Array> = {
+  highWaterMark: SSE_HIGH_WATER_MARK,
+  size: (chunk) => chunk.byteLength,
+};
+
+/** Mensajes de chat retenidos como mucho mientras el cliente va atrasado */
+const MAX_HELD_MESSAGES = 50;
+
+/** Un mensaje retenido más tiempo que esto ya no aporta nada al chat */
+const MAX_HELD_AGE_MS = 10_000;
+
+/** Tiempo seguido con la cola llena tras el que se corta la conexión */
+const MAX_LAG_MS = 60_000;
+
+export interface SseWriterStats {
+  label: string;
+  queuedBytes: number;
+  heldMessages: number;
+  droppedMessages: number;
+  /** ms seguidos con la cola llena (0 si va al día) */
+  laggingForMs: number;
+}
+
+export interface SseWriter {
+  /** `eventId` va en el `id:` del frame (token de reanudación) */
+  writeMessage: (message: ChatMessage, eventId?: string) => void;
+  /**
+   * Mensaje de un canal compartido con su frame ya codificado: se encola tal
+   * cual y solo se recodifica si hay que retenerlo
+   */
+  writeShared: (message: ChatMessage, frame: Uint8Array) => void;
+  /** Varios mensajes en un frame (o uno solo si solo hay uno) */
+  writeBatch: (messages: ChatMessage[], eventId?: string) => void;
+  /** Frames de control (error, stream-end): nunca se retienen */
+  writeControl: (frame: Uint8Array) => void;
+  heartbeat: () => void;
+  /** Llamar desde `pull` del ReadableStream: el cliente ha leído */
+  drain: () => void;
+  close: () => void;
+  getStats: () => SseWriterStats;
+}
+
+const writers = new Set<SseWriter>();
+
+const totals = {
+  droppedMessages: 0,
+  disconnected: 0,
+};
+
+/**
+ * Envuelve el controller de un stream SSE. `onSlowConsumer` se llama una
+ * vez si el cliente pasa más de MAX_LAG_MS sin leer, con la conexión ya
+ * cortada, para que el endpoint libere sus recursos.
+ */
+export function createSseWriter(
+  controller: ReadableStreamDefaultController<Uint8Array>,
+  label: string,
+  onSlowConsumer: () => void
+): SseWriter {
+  let closed = false;
+  let held: ChatMessage[] = [];
+  /** `id:` del último mensaje retenido */
+  let heldEventId: string | undefined;
+  let dropped = 0;
+  let laggingSince = 0;
+
+  const drop = (count: number) => {
+    dropped += count;
+    totals.droppedMessages += count;
+  };
+
+  const enqueue = (frame: Uint8Array) => {
+    if (closed) return;
+    try {
+      controller.enqueue(frame);
+    } catch {
+      // Stream ya cerrado
+      closed = true;
+    }
+  };
+
+  const queuedBytes = () => (closed ? 0 : SSE_HIGH_WATER_MARK - (controller.desiredSize ?? SSE_HIGH_WATER_MARK));
+
+  /**
+   * Devuelve true si el cliente va atrasado. Corta la conexión si lleva así
+   * más de MAX_LAG_MS.
+   */
+  const checkLagging = (now: number): boolean => {
+    if ((controller.desiredSize ?? 0) > 0) {
+      laggingSince = 0;
+      return false;
+    }
+    if (laggingSince === 0) {
+      laggingSince = now;
+    } else if (now - laggingSince > MAX_LAG_MS && !closed) {
+      totals.disconnected++;
+      console.warn(`[SSE] Cliente lento desconectado (${label}): ${queuedBytes()} bytes en cola, ${dropped} mensajes descartados`);
+      try { controller.error(new Error('Cliente SSE demasiado lento')); } catch { /* ya cerrado */ }
+      writer.close();
+      onSlowConsumer();
+    }
+    return true;
+  };
+
+  const hold = (messages: ChatMessage[], eventId: string | undefined) => {
+    if (closed) return;
+    if (eventId) heldEventId = eventId;
+    for (const message of messages) held.push(message);
+    if (held.length > MAX_HELD_MESSAGES) {
+      const excess = held.length - MAX_HELD_MESSAGES;
+      held.splice(0, excess);
+      drop(excess);
+    }
+  };
+
+  /** Envía lo retenido en un solo frame, sin lo que ya está rancio */
+  const flushHeld = (now: number) => {
+    let fresh = 0;
+    while (fresh < held.length && now - held[fresh].timestamp > MAX_HELD_AGE_MS) fresh++;
+    drop(fresh);
+    const messages = fresh > 0 ? held.slice(fresh) : held;
+    const eventId = heldEventId;
+    held = [];
+    heldEventId = undefined;
+    if (messages.length > 0) enqueue(encodeBatchFrame(messages, eventId));
+  };
+
+  const writer: SseWriter = {
+    writeMessage(message, eventId) {
+      if (closed) return;
+      const now = Date.now();
+      if (checkLagging(now)) {
+        hold([message], eventId);
+        return;
+      }
+      if (held.length > 0) {
+        hold([message], eventId);
+        flushHeld(now);
+        return;
+      }
+      enqueue(encodeMessageFrame(message, eventId));
+    },
+
+    writeShared(message, frame) {
+      if (closed) return;
+      const now = Date.now();
+      if (checkLagging(now)) {
+        hold([message], undefined);
+        return;
+      }
+      if (held.length > 0) {
+        hold([message], undefined);
+        flushHeld(now);
+        return;
+      }
+      enqueue(frame);
+    },
+
+    writeBatch(messages, eventId) {
+      if (closed || messages.length === 0) return;
+      const now = Date.now();
+      if (checkLagging(now)) {
+        hold(messages, eventId);
+        return;
+      }
+      if (held.length > 0) {
+        hold(messages, eventId);
+        flushHeld(now);
+        return;
+      }
+      enqueue(encodeBatchFrame(messages, eventId));
+    },
+
+    writeControl(frame) {
+      enqueue(frame);
+    },
+
+    heartbeat() {
+      if (closed) return;
+      enqueue(HEARTBEAT_FRAME);
+      checkLagging(Date.now());
+    },
+
+    drain() {
+      if (closed || (controller.desiredSize ?? 0) <= 0) return;
+      laggingSince = 0;
+      if (held.length > 0) flushHeld(Date.now());
+    },
+
+    close() {
+      closed = true;
+      held = [];
+      laggingSince = 0;
+      writers.delete(writer);
+    },
+
+    getStats() {
+      return {
+        label,
+        queuedBytes: queuedBytes(),
+        heldMessages: held.length,
+        droppedMessages: dropped,
+        laggingForMs: laggingSince === 0 ? 0 : Date.now() - laggingSince,
+      };
+    },
+  };
+
+  writers.add(writer);
+  return writer;
+}
+
+/** Streams con más cola que se listan en las estadísticas */
+const MAX_LISTED_STREAMS = 20;
+
+export function getSseWriterStats() {
+  const streams = Array.from(writers, (writer) => writer.getStats());
+  return {
+    streams: streams.length,
+    lagging: streams.filter((stream) => stream.laggingForMs > 0).length,
+    queuedBytes: streams.reduce((sum, stream) => sum + stream.queuedBytes, 0),
+    heldMessages: streams.reduce((sum, stream) => sum + stream.heldMessages, 0),
+    highWaterMark: SSE_HIGH_WATER_MARK,
+    ...totals,
+    deepest: streams.sort((a, b) => b.queuedBytes - a.queuedBytes).slice(0, MAX_LISTED_STREAMS),
+  };
+}
@@ -0,0 +1,31 @@
+import { createMemoryBus } from './transports/memory';
+import { createRedisBus } from './transports/redis';
+import type { StreamBus } from './types';
+
+export type { StreamBus, StreamBusEvent } from './types';
+
+/**
+ * Resuelve el bus entre instancias desde STREAM_BUS ('memory' | 'redis').
+ * Sin valor explícito: redis si hay STREAM_BUS_URL (o REDIS_URL) y memoria
+ * en el resto de casos.
+ */
+export function resolveStreamBus(): StreamBus {
+  const env = import.meta.env;
+  const url = env.STREAM_BUS_URL || env.REDIS_URL;
+  const configured = String(env.STREAM_BUS ?? '').trim().toLowerCase();
+
+  if (configured === 'memory') return createMemoryBus();
+  if (configured === 'redis' || (!configured && url)) {
+    if (!url) {
+      console.warn('[StreamBus] STREAM_BUS=redis sin STREAM_BUS_URL, se usa el bus en memoria');
+      return createMemoryBus();
+    }
+    try {
+      return createRedisBus({ url });
+    } catch (error) {
+      console.error('[StreamBus] STREAM_BUS_URL no válida, se usa el bus en memoria:', error);
+      return createMemoryBus();
+    }
+  }
+  return createMemoryBus();
+}
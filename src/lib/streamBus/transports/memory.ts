@@ -0,0 +1,44 @@
+import type { StreamBus, StreamBusEvent } from '../types';
+
+// ============================================
+// BUS EN MEMORIA (una sola instancia)
+// ============================================
+//
+// El default: todo vive en el proceso y los eventos se entregan en el acto.
+// Equivale al registro en memoria de antes; con varias instancias hace falta
+// el transporte redis.
+
+interface OwnerEntry {
+  owner: string;
+  expiresAt: number;
+}
+
+export function createMemoryBus(): StreamBus {
+  const owners = new Map<string, OwnerEntry>();
+  let listener: ((event: StreamBusEvent) => void) | null = null;
+
+  return {
+    name: 'memory',
+    async publish(event) {
+      listener?.(event);
+    },
+    subscribe(next) {
+      listener = next;
+    },
+    async setOwner(userId, owner, ttlMs) {
+      owners.set(userId, { owner, expiresAt: Date.now() + ttlMs });
+    },
+    async getOwner(userId) {
+      const entry = owners.get(userId);
+      if (!entry) return null;
+      if (entry.expiresAt <= Date.now()) {
+        owners.delete(userId);
+        return null;
+      }
+      return entry.owner;
+    },
+    async clearOwner(userId, owner) {
+      if (owners.get(userId)?.owner === owner) owners.delete(userId);
+    },
+  };
+}
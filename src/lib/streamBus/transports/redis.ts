@@ -0,0 +1,293 @@
+import { connect as connectTcp, type Socket } from 'node:net';
+import { connect as connectTls } from 'node:tls';
+import type { StreamBus, StreamBusEvent } from '../types';
+
+// ============================================
+// BUS REDIS (varias instancias)
+// ============================================
+//
+// Cliente RESP mínimo sobre node:net, sin SDK, para cualquier servidor
+// compatible con Redis: Redis/Valkey propio, Upstash por TCP (rediss://) o el
+// broker de pruebas (scripts/stream-bus-broker.mjs) en un socket Unix.
+//
+// Dos conexiones por instancia: una para comandos y otra suscrita al canal
+// del bus (una conexión suscrita no acepta otros comandos). La suscrita se
+// reconecta sola con espera creciente y vuelve a suscribirse; la de comandos
+// se reabre con el siguiente comando. Los comandos en vuelo al caer una
+// conexión fallan y el registro sigue con lo que sabe en local. Un servidor
+// que no responde cuenta como caído: cada comando (y cada conexión) tiene
+// COMMAND_TIMEOUT_MS y al vencer se cierra la conexión.
+
+const CHANNEL = 'chat:streams';
+const OWNER_PREFIX = 'stream:owner:';
+
+const MIN_RECONNECT_DELAY = 100;
+const MAX_RECONNECT_DELAY = 5_000;
+
+/** Plazo de cada comando, como el de la lectura del store persistente */
+const COMMAND_TIMEOUT_MS = 1_500;
+
+/** Borrado condicional: solo si la marca sigue siendo del mismo stream */
+const CLEAR_OWNER_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0";
+
+export interface RedisBusConfig {
+  /** redis://[usuario:clave@]host:puerto, rediss://… (TLS) o unix:///ruta.sock */
+  url: string;
+}
+
+interface RedisTarget {
+  host: string;
+  port: number;
+  /** Socket Unix (null = TCP) */
+  path: string | null;
+  tls: boolean;
+  username: string;
+  password: string;
+}
+
+type RespValue = string | number | null | Error | RespValue[];
+
+interface PendingReply {
+  resolve: (value: RespValue) => void;
+  reject: (error: Error) => void;
+}
+
+function parseTarget(raw: string): RedisTarget {
+  const url = new URL(raw);
+  const username = decodeURIComponent(url.username);
+  const password = decodeURIComponent(url.password);
+  if (url.protocol === 'unix:') {
+    return { host: '', port: 0, path: url.pathname, tls: false, username, password };
+  }
+  if (url.protocol !== 'redis:' && url.protocol !== 'rediss:') {
+    throw new Error(`STREAM_BUS_URL no soportada (${url.protocol}): usa redis://, rediss:// o unix://`);
+  }
+  return {
+    host: url.hostname,
+    port: Number(url.port) || 6379,
+    path: null,
+    tls: url.protocol === 'rediss:',
+    username,
+    password,
+  };
+}
+
+function encodeCommand(args: (string | number)[]): Buffer {
+  let out = `*${args.length}\r\n`;
+  for (const arg of args) {
+    const value = String(arg);
+    out += `$${Buffer.byteLength(value)}\r\n${value}\r\n`;
+  }
+  return Buffer.from(out);
+}
+
+/**
+ * Lee un valor RESP2 de `buffer` a partir de `offset`. Devuelve el valor y
+ * dónde empieza el siguiente, o null si aún no ha llegado entero.
+ */
+function parseReply(buffer: Buffer, offset: number): [RespValue, number] | null {
+  const lineEnd = buffer.indexOf('\r\n', offset);
+  if (lineEnd === -1) return null;
+  const line = buffer.toString('utf8', offset + 1, lineEnd);
+  const next = lineEnd + 2;
+
+  switch (buffer[offset]) {
+    case 0x2b: // +
+      return [line, next];
+    case 0x2d: // -
+      return [new Error(line), next];
+    case 0x3a: // :
+      return [Number(line), next];
+    case 0x24: { // $
+      const length = Number(line);
+      if (length < 0) return [null, next];
+      if (buffer.length < next + length + 2) return null;
+      return [buffer.toString('utf8', next, next + length), next + length + 2];
+    }
+    case 0x2a: { // *
+      const count = Number(line);
+      if (count < 0) return [null, next];
+      const items: RespValue[] = [];
+      let cursor = next;
+      for (let i = 0; i < count; i++) {
+        const item = parseReply(buffer, cursor);
+        if (!item) return null;
+        items.push(item[0]);
+        cursor = item[1];
+      }
+      return [items, cursor];
+    }
+    default:
+      throw new Error(`Respuesta RESP no válida (byte ${buffer[offset]})`);
+  }
+}
+
+/**
+ * Conexión RESP. `handshake` se envía en cada (re)conexión antes que nada;
+ * los mensajes pub/sub van a `onMessage`. Con `persistent` se reconecta sola.
+ */
+function createConnection(
+  target: RedisTarget,
+  handshake: (string | number)[][],
+  onMessage: ((channel: string, payload: string) => void) | null,
+  persistent: boolean
+) {
+  let socket: Socket | null = null;
+  let connecting: Promise<Socket> | null = null;
+  let buffer = Buffer.alloc(0);
+  let pending: PendingReply[] = [];
+  let reconnectDelay = MIN_RECONNECT_DELAY;
+
+  const failPending = (error: Error) => {
+    const failed = pending;
+    pending = [];
+    for (const reply of failed) reply.reject(error);
+  };
+
+  const onData = (chunk: Buffer) => {
+    buffer = buffer.length === 0 ? chunk : Buffer.concat([buffer, chunk]);
+    let offset = 0;
+    for (;;) {
+      const parsed = parseReply(buffer, offset);
+      if (!parsed) break;
+      const [value, next] = parsed;
+      offset = next;
+      if (onMessage && Array.isArray(value) && value[0] === 'message') {
+        onMessage(String(value[1]), String(value[2]));
+        continue;
+      }
+      const reply = pending.shift();
+      if (!reply) continue;
+      if (value instanceof Error) reply.reject(value);
+      else reply.resolve(value);
+    }
+    buffer = offset === buffer.length ? Buffer.alloc(0) : buffer.subarray(offset);
+  };
+
+  const write = (current: Socket, args: (string | number)[]) =>
+    new Promise<RespValue>((resolve, reject) => {
+      const timer = setTimeout(() => {
+        reject(new Error(`${args[0]} sin respuesta del bus en ${COMMAND_TIMEOUT_MS}ms`));
+        // Las respuestas ya no se pueden emparejar: 'close' falla el resto
+        current.destroy();
+      }, COMMAND_TIMEOUT_MS);
+      timer.unref?.();
+      pending.push({
+        resolve: (value) => {
+          clearTimeout(timer);
+          resolve(value);
+        },
+        reject: (error) => {
+          clearTimeout(timer);
+          reject(error);
+        },
+      });
+      current.write(encodeCommand(args));
+    });
+
+  const scheduleReconnect = () => {
+    const timer = setTimeout(() => {
+      connect().catch(() => { /* 'close' vuelve a programar el reintento */ });
+    }, reconnectDelay);
+    timer.unref?.();
+    reconnectDelay = Math.min(reconnectDelay * 2, MAX_RECONNECT_DELAY);
+  };
+
+  const connect = (): Promise<Socket> => {
+    connecting ??= new Promise<Socket>((resolve, reject) => {
+      const next = target.path
+        ? connectTcp(target.path)
+        : target.tls
+          ? connectTls({ host: target.host, port: target.port, servername: target.host })
+          : connectTcp(target.port, target.host);
+      let opened = false;
+
+      // Conectar tampoco puede colgarse: 'close' rechaza y reintenta
+      next.setTimeout(COMMAND_TIMEOUT_MS, () => next.destroy());
+      next.once(target.tls ? 'secureConnect' : 'connect', () => {
+        opened = true;
+        next.setTimeout(0);
+        socket = next;
+        connecting = null;
+        reconnectDelay = MIN_RECONNECT_DELAY;
+        if (!target.path) next.setNoDelay(true);
+        next.unref();
+        for (const args of handshake) {
+          write(next, args).catch((error) => console.error(`[StreamBus] ${args[0]} falló:`, error));
+        }
+        resolve(next);
+      });
+      next.on('data', (chunk: Buffer) => {
+        try {
+          onData(chunk);
+        } catch (error) {
+          console.error('[StreamBus] Respuesta no válida, se reabre la conexión:', error);
+          next.destroy();
+        }
+      });
+      next.on('error', (error) => {
+        console.warn(`[StreamBus] Error de conexión: ${error.message}`);
+      });
+      next.on('close', () => {
+        if (socket === next) socket = null;
+        if (!opened) {
+          connecting = null;
+          reject(new Error('No se pudo conectar con el bus'));
+        }
+        buffer = Buffer.alloc(0);
+        failPending(new Error('Conexión con el bus cerrada'));
+        if (persistent) scheduleReconnect();
+      });
+    });
+    return connecting;
+  };
+
+  return {
+    start() {
+      connect().catch(() => { /* se reintenta solo */ });
+    },
+    async command(args: (string | number)[]): Promise<RespValue> {
+      return write(socket ?? await connect(), args);
+    },
+  };
+}
+
+export function createRedisBus(config: RedisBusConfig): StreamBus {
+  const target = parseTarget(config.url);
+  const auth = target.password
+    ? [target.username ? ['AUTH', target.username, target.password] : ['AUTH', target.password]]
+    : [];
+
+  let listener: ((event: StreamBusEvent) => void) | null = null;
+
+  const commands = createConnection(target, auth, null, false);
+  const subscriber = createConnection(target, [...auth, ['SUBSCRIBE', CHANNEL]], (channel, payload) => {
+    if (channel !== CHANNEL || !listener) return;
+    try {
+      listener(JSON.parse(payload) as StreamBusEvent);
+    } catch (error) {
+      console.error('[StreamBus] Evento no válido:', error);
+    }
+  }, true);
+
+  return {
+    name: 'redis',
+    async publish(event) {
+      await commands.command(['PUBLISH', CHANNEL, JSON.stringify(event)]);
+    },
+    subscribe(next) {
+      listener = next;
+      subscriber.start();
+    },
+    async setOwner(userId, owner, ttlMs) {
+      await commands.command(['SET', OWNER_PREFIX + userId, owner, 'PX', Math.max(1, Math.round(ttlMs))]);
+    },
+    async getOwner(userId) {
+      const owner = await commands.command(['GET', OWNER_PREFIX + userId]);
+      return typeof owner === 'string' ? owner : null;
+    },
+    async clearOwner(userId, owner) {
+      await commands.command(['EVAL', CLEAR_OWNER_SCRIPT, 1, OWNER_PREFIX + userId, owner]);
+    },
+  };
+}
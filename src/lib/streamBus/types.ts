@@ -0,0 +1,34 @@
+import type { WaveType } from '../../utils/types';
+
+/**
+ * Eventos que viajan entre instancias. Todas las instancias reciben todos y
+ * cada una atiende los de los usuarios cuyo stream tiene abierto.
+ */
+export type StreamBusEvent =
+  /**
+   * Un stream nuevo de `userId` es de `owner`: cualquier otro más antiguo
+   * (`claimedAt` menor) se cancela
+   */
+  | { type: 'claim'; userId: string; owner: string; claimedAt: number }
+  /** Oleada para el stream de `userId`, esté donde esté */
+  | { type: 'wave'; userId: string; wave: WaveType; seed: number }
+  /**
+   * Respuesta de la instancia del stream a un `wave` (la misma `seed`):
+   * `queued` es false si la cola de oleadas del usuario estaba llena
+   */
+  | { type: 'wave-result'; userId: string; seed: number; queued: boolean };
+
+/**
+ * Pub/sub entre instancias más la marca de qué stream es de quién
+ */
+export interface StreamBus {
+  name: string;
+  publish: (event: StreamBusEvent) => Promise<void>;
+  /** Un único listener por bus (el registro de streams) */
+  subscribe: (listener: (event: StreamBusEvent) => void) => void;
+  /** Marca el stream abierto de `userId` como de `owner` durante `ttlMs` */
+  setOwner: (userId: string, owner: string, ttlMs: number) => Promise<void>;
+  getOwner: (userId: string) => Promise<string | null>;
+  /** Borra la marca solo si sigue siendo de `owner` */
+  clearOwner: (userId: string, owner: string) => Promise<void>;
+}
@@ -0,0 +1,131 @@
+import type { ChatMessage, StreamMode } from '../utils/types';
+import { INTERVAL_PRESETS } from '../utils/types';
+import { generateMessage, getRandomInterval } from './chatGenerator';
+import { normalizeGameName } from './phraseCache';
+import { encodeMessageFrame } from './sseFrames';
+import { scheduleStream, type StreamTaskHandle } from './streamScheduler';
+import { createStreamSession } from './streamSession';
+
+// ============================================
+// CANALES COMPARTIDOS
+// ============================================
+//
+// Con `?channel=1`, todos los streams del mismo juego, modo y preset de
+// intervalo (overlays de OBS, varias pestañas, varios espectadores) se
+// suscriben a un único canal: un generador, una tarea del scheduler y un
+// frame codificado por mensaje. Ese mismo Uint8Array se encola en cada
+// suscriptor (nunca se muta, como HEARTBEAT_FRAME), así que un espectador
+// más solo cuesta un enqueue por mensaje.
+//
+// Las oleadas siguen siendo privadas: las emite el stream de cada usuario
+// entre los mensajes del canal. El canal vive mientras tenga suscriptores y
+// su contenido es en directo: al reconectar se entra por donde vaya el canal.
+
+/** Recibe cada mensaje del canal junto con su frame ya codificado */
+export type ChannelSubscriber = (message: ChatMessage, frame: Uint8Array) => void;
+
+interface Channel {
+  subscribers: Set<ChannelSubscriber>;
+  task: StreamTaskHandle;
+  messages: number;
+}
+
+const channels = new Map<string, Channel>();
+
+const totals = {
+  frames: 0,
+  deliveries: 0,
+  bytesDelivered: 0,
+};
+
+/**
+ * Solo los presets del dashboard tienen canal: con intervalos libres cada
+ * stream sería su propio canal
+ */
+export function isChannelInterval(intervalMin: number, intervalMax: number): boolean {
+  return INTERVAL_PRESETS.some((preset) => preset.min === intervalMin && preset.max === intervalMax);
+}
+
+function openChannel(
+  key: string,
+  gameName: string,
+  mode: StreamMode,
+  intervalMin: number,
+  intervalMax: number
+): Channel {
+  const session = createStreamSession();
+  const subscribers = new Set<ChannelSubscriber>();
+
+  // Mismo ritmo que un stream sin oleadas: el mensaje sale al vencer el delay
+  const step = (): number => {
+    if (session.pendingMessage) {
+      const message = generateMessage(gameName, mode, session);
+      const frame = encodeMessageFrame(message);
+      channel.messages++;
+      totals.frames++;
+      for (const subscriber of subscribers) {
+        try {
+          subscriber(message, frame);
+        } catch (error) {
+          console.error(`[Canal] Error entregando mensaje (${key}):`, error);
+        }
+      }
+      totals.deliveries += subscribers.size;
+      totals.bytesDelivered += frame.byteLength * subscribers.size;
+    }
+    session.pendingMessage = true;
+    return getRandomInterval(intervalMin, intervalMax, session.random.next);
+  };
+
+  // Heartbeat y duración máxima los lleva el stream de cada suscriptor
+  const channel: Channel = {
+    subscribers,
+    task: scheduleStream({ step, onHeartbeat: () => {}, onExpire: () => {} }, Infinity),
+    messages: 0,
+  };
+  return channel;
+}
+
+/**
+ * Suscribe un stream al canal de (juego, modo, intervalo), creándolo si no
+ * existe. Devuelve la función para salir: el último en salir lo cierra.
+ */
+export function joinChannel(
+  gameName: string,
+  mode: StreamMode,
+  intervalMin: number,
+  intervalMax: number,
+  subscriber: ChannelSubscriber
+): () => void {
+  const key = `${mode}:${normalizeGameName(gameName)}:${intervalMin}-${intervalMax}`;
+  let channel = channels.get(key);
+  if (!channel) {
+    channel = openChannel(key, gameName, mode, intervalMin, intervalMax);
+    channels.set(key, channel);
+  }
+  channel.subscribers.add(subscriber);
+
+  const joined = channel;
+  return () => {
+    if (!joined.subscribers.delete(subscriber) || joined.subscribers.size > 0) return;
+    joined.task.cancel();
+    if (channels.get(key) === joined) channels.delete(key);
+  };
+}
+
+/** Canales con más suscriptores que se listan en las estadísticas */
+const MAX_LISTED_CHANNELS = 20;
+
+export function getChannelStats() {
+  const list = Array.from(channels, ([key, channel]) => ({
+    key,
+    subscribers: channel.subscribers.size,
+    messages: channel.messages,
+  }));
+  return {
+    channels: list.length,
+    subscribers: list.reduce((sum, channel) => sum + channel.subscribers, 0),
+    ...totals,
+    largest: list.sort((a, b) => b.subscribers - a.subscribers).slice(0, MAX_LISTED_CHANNELS),
+  };
+}
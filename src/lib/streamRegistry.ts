@@ -0,0 +1,208 @@
+import type { WaveType } from '../utils/types';
+import { randomSeed } from './random';
+import { resolveStreamBus, type StreamBus, type StreamBusEvent } from './streamBus';
+import { enqueueWave } from './waveManager';
+
+// ============================================
+// STREAM SSE ACTIVO POR USUARIO (ENTRE INSTANCIAS)
+// ============================================
+//
+// Cada usuario puede tener como máximo 1 stream SSE abierto. Si llega una
+// nueva conexión del mismo usuario, el stream anterior se cancela, esté en
+// esta instancia o en otra (Vercel, varios procesos de @astrojs/node):
+//
+// - En local, el AbortController del stream anterior se aborta en el acto.
+// - Por el bus (ver lib/streamBus) se publica un `claim` con el owner nuevo
+//   y su `claimedAt`; la instancia que tenga un stream del usuario más
+//   antiguo lo cancela. Los claims llegan en cualquier orden (y el propio
+//   vuelve por el bus): uno más antiguo que el stream local, o de esta misma
+//   instancia, nunca cancela nada.
+// - La marca de owner del bus dice que el usuario tiene un stream abierto.
+//   Se renueva mientras el stream sigue vivo (si la instancia muere, caduca
+//   sola) y al cerrar se borra solo si sigue siendo suya.
+//
+// Las oleadas (POST /api/chat-wave) van directas a waveManager si el stream
+// está en esta instancia y por el bus si no: la cola de la oleada vive en la
+// instancia del stream, que es quien la consume y la guarda en el token de
+// reanudación, y contesta con un `wave-result` si la encoló o si la cola
+// estaba llena. Con el bus en memoria (default) todo queda en el proceso,
+// como antes. Si el bus falla, se sigue con lo que se sabe en local.
+
+/** Vida de la marca de owner en el bus; se renueva cada tercio */
+const OWNER_TTL_MS = 90_000;
+
+/** Espera máxima del `wave-result` de la instancia del stream */
+const WAVE_RESULT_TIMEOUT_MS = 3_000;
+
+interface LocalStream {
+  owner: string;
+  /** Orden entre claims: ms de reloj, estrictamente creciente por instancia */
+  claimedAt: number;
+  controller: AbortController;
+}
+
+/** Prefijo de los owners de esta instancia */
+const INSTANCE_ID = randomSeed().toString(36);
+
+const localStreams = new Map<string, LocalStream>();
+/** Oleadas enviadas por el bus pendientes de respuesta, por `${userId}:${seed}` */
+const pendingWaves = new Map<string, (queued: boolean) => void>();
+let streamCount = 0;
+let lastClaimedAt = 0;
+
+let bus: StreamBus | null = null;
+let refreshTimer: ReturnType<typeof setInterval> | null = null;
+
+function getBus(): StreamBus {
+  if (!bus) {
+    bus = resolveStreamBus();
+    bus.subscribe(handleEvent);
+  }
+  return bus;
+}
+
+function logError(action: string) {
+  return (error: unknown) => console.error(`[StreamRegistry] Error en ${action}:`, error);
+}
+
+function handleEvent(event: StreamBusEvent): void {
+  if (event.type === 'wave-result') {
+    pendingWaves.get(`${event.userId}:${event.seed}`)?.(event.queued);
+    return;
+  }
+
+  const local = localStreams.get(event.userId);
+  if (!local) return;
+
+  if (event.type === 'claim') {
+    // Los de esta instancia ya se resolvieron en registerStream
+    if (event.owner.startsWith(`${INSTANCE_ID}:`)) return;
+    // Un stream de otra instancia más nuevo que el local es el bueno
+    if (isNewerClaim(event, local)) local.controller.abort();
+  } else if (event.type === 'wave') {
+    const queued = enqueueWave(event.userId, event.wave, event.seed);
+    if (!queued) console.warn(`[StreamRegistry] Cola de oleadas llena para ${event.userId}: oleada rechazada`);
+    getBus()
+      .publish({ type: 'wave-result', userId: event.userId, seed: event.seed, queued })
+      .catch(logError('wave-result'));
+  }
+}
+
+/** Orden total entre claims: `claimedAt` y, si empatan, el owner */
+function isNewerClaim(claim: { owner: string; claimedAt: number }, local: LocalStream): boolean {
+  if (claim.claimedAt !== local.claimedAt) return claim.claimedAt > local.claimedAt;
+  return claim.owner > local.owner;
+}
+
+function refreshOwners(): void {
+  const streamBus = getBus();
+  for (const [userId, { owner }] of localStreams) {
+    streamBus.setOwner(userId, owner, OWNER_TTL_MS).catch(logError('renovar owner'));
+  }
+}
+
+function ensureRefreshing(): void {
+  if (refreshTimer) return;
+  refreshTimer = setInterval(refreshOwners, OWNER_TTL_MS / 3);
+  // Permitir que el proceso termine sin esperar al intervalo
+  if (typeof refreshTimer === 'object' && 'unref' in refreshTimer) {
+    refreshTimer.unref();
+  }
+}
+
+function stopRefreshingIfIdle(): void {
+  if (localStreams.size === 0 && refreshTimer) {
+    clearInterval(refreshTimer);
+    refreshTimer = null;
+  }
+}
+
+// ─── API pública ──────────────────────────────────────────────────────────────
+
+/**
+ * Registra un nuevo stream SSE para un usuario.
+ * Si ya existía uno activo, aquí o en otra instancia, lo cancela.
+ * Devuelve el AbortController que el stream debe usar para su cleanup.
+ */
+export function registerStream(userId: string): AbortController {
+  // Cancelar el stream anterior si está en esta instancia
+  localStreams.get(userId)?.controller.abort();
+
+  const controller = new AbortController();
+  const owner = `${INSTANCE_ID}:${(++streamCount).toString(36)}`;
+  const claimedAt = Math.max(Date.now(), lastClaimedAt + 1);
+  lastClaimedAt = claimedAt;
+  localStreams.set(userId, { owner, claimedAt, controller });
+  ensureRefreshing();
+
+  // Y en las demás: la que tenga uno más antiguo lo cancela
+  const streamBus = getBus();
+  streamBus.setOwner(userId, owner, OWNER_TTL_MS).catch(logError('setOwner'));
+  streamBus.publish({ type: 'claim', userId, owner, claimedAt }).catch(logError('claim'));
+  return controller;
+}
+
+/**
+ * Elimina el registro del stream cuando termina.
+ * Solo borra si el controller coincide con el registrado actualmente
+ * (evita borrar el de un stream más nuevo que ya lo reemplazó).
+ */
+export function unregisterStream(userId: string, controller: AbortController): void {
+  const local = localStreams.get(userId);
+  if (local?.controller !== controller) return;
+
+  localStreams.delete(userId);
+  stopRefreshingIfIdle();
+  getBus().clearOwner(userId, local.owner).catch(logError('clearOwner'));
+}
+
+/**
+ * Devuelve true si el usuario tiene un stream SSE activo en cualquier
+ * instancia. Usado por chat-wave para validar que hay un stream al que
+ * enviar oleadas.
+ */
+export async function hasActiveStream(userId: string): Promise<boolean> {
+  if (localStreams.has(userId)) return true;
+  try {
+    return (await getBus().getOwner(userId)) !== null;
+  } catch (error) {
+    logError('getOwner')(error);
+    return false;
+  }
+}
+
+/**
+ * Entrega una oleada al stream del usuario, esté en esta instancia o en otra.
+ * Devuelve false si la cola de oleadas del usuario está llena; lanza si la
+ * instancia del stream no contesta.
+ */
+export async function sendWave(userId: string, type: WaveType): Promise<boolean> {
+  const seed = randomSeed();
+  if (localStreams.has(userId)) return enqueueWave(userId, type, seed);
+
+  const id = `${userId}:${seed}`;
+  let timer: ReturnType<typeof setTimeout> | undefined;
+  // Antes de publicar: el bus en memoria contesta dentro del propio publish
+  const result = new Promise<boolean>((resolve, reject) => {
+    pendingWaves.set(id, resolve);
+    timer = setTimeout(
+      () => reject(new Error(`Sin respuesta a la oleada en ${WAVE_RESULT_TIMEOUT_MS}ms`)),
+      WAVE_RESULT_TIMEOUT_MS
+    );
+  });
+  try {
+    await getBus().publish({ type: 'wave', userId, wave: type, seed });
+    return await result;
+  } finally {
+    clearTimeout(timer);
+    pendingWaves.delete(id);
+  }
+}
+
+export function getStreamRegistryStats() {
+  return {
+    bus: getBus().name,
+    instance: INSTANCE_ID,
+    localStreams: localStreams.size,
+  };
+}
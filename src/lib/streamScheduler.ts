@@ -0,0 +1,255 @@
+// ============================================
+// SCHEDULER COMPARTIDO DE STREAMS SSE
+// ============================================
+//
+// En lugar de que cada conexión SSE tenga su propia cadena de setTimeout,
+// su setInterval de heartbeat y su timeout de duración máxima, todas las
+// conexiones se registran aquí. Un único setInterval avanza a resolución fija
+// (TICK_MS) y en cada tick:
+//
+// 1. Saca de un min-heap todas las tareas cuyo próximo mensaje ya toca
+//    y ejecuta su `step`, que devuelve el delay hasta el siguiente. Una
+//    tarea con fin de segmento nunca se programa más allá de él: cuando
+//    llega, se desregistra y se llama su `onSegmentEnd` (precisión de tick).
+// 2. Cada HEARTBEAT_INTERVAL envía el heartbeat a todos los streams a la vez
+//    y cierra los que superaron su duración máxima (precisión de 30s, de
+//    sobra para un límite de 2 horas).
+//
+// El número de timers y de despertares del event loop depende del tick,
+// no del número de conexiones.
+
+/** Resolución del scheduler (ms). Los envíos se cuantizan a este valor */
+const TICK_MS = 50;
+
+/** Heartbeat compartido para mantener vivas las conexiones contra proxies */
+const HEARTBEAT_INTERVAL = 30_000;
+
+export interface StreamTaskHandlers {
+  /** Emite lo que toque y devuelve el delay (ms) hasta la siguiente llamada */
+  step: () => number;
+  onHeartbeat: () => void;
+  onExpire: () => void;
+  /** Fin de segmento (`segmentMs`); se llama una vez, con la tarea ya desregistrada */
+  onSegmentEnd?: () => void;
+}
+
+interface StreamTask extends StreamTaskHandlers {
+  due: number;
+  expiresAt: number;
+  /** Infinity si la tarea no tiene segmentos */
+  segmentEndsAt: number;
+  heapIndex: number;
+}
+
+export interface StreamTaskHandle {
+  cancel: () => void;
+  /** Adelanta el siguiente `step` al próximo tick (p. ej. llega una oleada) */
+  wake: () => void;
+}
+
+// ─── Min-heap por `due` ───────────────────────────────────────────────────────
+
+const heap: StreamTask[] = [];
+const tasks = new Set<StreamTask>();
+
+function swap(i: number, j: number): void {
+  const a = heap[i];
+  const b = heap[j];
+  heap[i] = b;
+  heap[j] = a;
+  a.heapIndex = j;
+  b.heapIndex = i;
+}
+
+function siftUp(i: number): void {
+  while (i > 0) {
+    const parent = (i - 1) >> 1;
+    if (heap[parent].due <= heap[i].due) return;
+    swap(i, parent);
+    i = parent;
+  }
+}
+
+function siftDown(i: number): void {
+  const n = heap.length;
+  for (;;) {
+    const left = 2 * i + 1;
+    const right = left + 1;
+    let smallest = i;
+    if (left < n && heap[left].due < heap[smallest].due) smallest = left;
+    if (right < n && heap[right].due < heap[smallest].due) smallest = right;
+    if (smallest === i) return;
+    swap(i, smallest);
+    i = smallest;
+  }
+}
+
+function heapPush(task: StreamTask): void {
+  task.heapIndex = heap.length;
+  heap.push(task);
+  siftUp(task.heapIndex);
+}
+
+function heapRemove(task: StreamTask): void {
+  const i = task.heapIndex;
+  if (i < 0 || heap[i] !== task) return;
+  const last = heap.pop()!;
+  if (last !== task) {
+    heap[i] = last;
+    last.heapIndex = i;
+    siftDown(i);
+    siftUp(last.heapIndex);
+  }
+  task.heapIndex = -1;
+}
+
+// ─── Estadísticas ─────────────────────────────────────────────────────────────
+
+const stats = {
+  ticks: 0,
+  lastTickDue: 0,
+  lastTickHeartbeats: 0,
+  lastTickDurationMs: 0,
+  lastTickLagMs: 0,
+  maxTickDurationMs: 0,
+  totalSteps: 0,
+  totalHeartbeats: 0,
+};
+
+export function getSchedulerStats() {
+  return {
+    streams: tasks.size,
+    tickMs: TICK_MS,
+    ...stats,
+  };
+}
+
+// ─── Loop ─────────────────────────────────────────────────────────────────────
+
+let tickTimer: ReturnType<typeof setInterval> | null = null;
+let expectedTickAt = 0;
+let nextHeartbeatAt = 0;
+
+function runSafely(fn: () => void): void {
+  try {
+    fn();
+  } catch (error) {
+    console.error('[Scheduler] Error en tarea de stream:', error);
+  }
+}
+
+function tick(): void {
+  const start = Date.now();
+  let due = 0;
+  let heartbeats = 0;
+
+  while (heap.length > 0 && heap[0].due <= start) {
+    const task = heap[0];
+    if (start >= task.segmentEndsAt) {
+      cancelTask(task);
+      if (task.onSegmentEnd) runSafely(task.onSegmentEnd);
+      continue;
+    }
+    let delay = TICK_MS;
+    try {
+      delay = task.step();
+    } catch (error) {
+      console.error('[Scheduler] Error en tarea de stream:', error);
+    }
+    due++;
+    // step() puede haber cancelado la tarea (stream cerrado)
+    if (!tasks.has(task)) continue;
+    task.due = Math.min(start + Math.max(TICK_MS, delay), task.segmentEndsAt);
+    siftDown(task.heapIndex);
+  }
+
+  if (start >= nextHeartbeatAt) {
+    nextHeartbeatAt = start + HEARTBEAT_INTERVAL;
+    for (const task of tasks) {
+      if (start >= task.expiresAt) {
+        cancelTask(task);
+        runSafely(task.onExpire);
+        continue;
+      }
+      runSafely(task.onHeartbeat);
+      heartbeats++;
+    }
+  }
+
+  const duration = Date.now() - start;
+  stats.ticks++;
+  stats.lastTickDue = due;
+  stats.lastTickHeartbeats = heartbeats;
+  stats.lastTickDurationMs = duration;
+  stats.lastTickLagMs = Math.max(0, start - expectedTickAt);
+  stats.maxTickDurationMs = Math.max(stats.maxTickDurationMs, duration);
+  stats.totalSteps += due;
+  stats.totalHeartbeats += heartbeats;
+  expectedTickAt = start + TICK_MS;
+}
+
+function ensureRunning(): void {
+  if (tickTimer) return;
+  const now = Date.now();
+  expectedTickAt = now + TICK_MS;
+  nextHeartbeatAt = now + HEARTBEAT_INTERVAL;
+  tickTimer = setInterval(tick, TICK_MS);
+  // Permitir que el proceso termine sin esperar al intervalo
+  if (typeof tickTimer === 'object' && 'unref' in tickTimer) {
+    tickTimer.unref();
+  }
+}
+
+function stopIfIdle(): void {
+  if (tasks.size === 0 && tickTimer) {
+    clearInterval(tickTimer);
+    tickTimer = null;
+  }
+}
+
+function cancelTask(task: StreamTask): void {
+  if (!tasks.delete(task)) return;
+  heapRemove(task);
+  stopIfIdle();
+}
+
+function wakeTask(task: StreamTask): void {
+  if (!tasks.has(task) || task.heapIndex < 0) return;
+  const now = Date.now();
+  if (task.due <= now) return;
+  task.due = now;
+  siftUp(task.heapIndex);
+}
+
+// ─── API pública ──────────────────────────────────────────────────────────────
+
+/**
+ * Registra un stream en el scheduler compartido.
+ * `step` se invoca inmediatamente para obtener el primer delay, igual que
+ * la antigua cadena de setTimeout arrancaba al abrir la conexión.
+ * `onExpire` se llama una sola vez al superar `maxDuration`, con la tarea
+ * ya desregistrada. Con `segmentMs` > 0, `onSegmentEnd` igual pero a los
+ * `segmentMs` (sin timer propio: es una fecha más en el heap).
+ */
+export function scheduleStream(handlers: StreamTaskHandlers, maxDuration: number, segmentMs = 0): StreamTaskHandle {
+  const now = Date.now();
+  const task: StreamTask = {
+    ...handlers,
+    due: now,
+    expiresAt: now + maxDuration,
+    segmentEndsAt: segmentMs > 0 ? now + segmentMs : Infinity,
+    heapIndex: -1,
+  };
+
+  tasks.add(task);
+  task.due = Math.min(now + Math.max(TICK_MS, task.step()), task.segmentEndsAt);
+  if (tasks.has(task)) {
+    heapPush(task);
+    ensureRunning();
+  }
+
+  return {
+    cancel: () => cancelTask(task),
+    wake: () => wakeTask(task),
+  };
+}
@@ -0,0 +1,150 @@
+import type { WaveType } from '../utils/types';
+import { createSeededRandom, randomSeed, type SeededRandom } from './random';
+import { MAX_QUEUED_WAVES, type WaveState } from './waveManager';
+
+// ============================================
+// SESIONES SSE REANUDABLES
+// ============================================
+//
+// Todo lo aleatorio de un stream (categoría, frase, username, intervalos y
+// frases de oleada) sale de un PRNG con semilla (random.ts) y los ids de
+// mensaje son `<semilla>-<n>`, así que la misma semilla da siempre la misma
+// secuencia. El estado completo de la sesión cabe en unos pocos enteros y
+// viaja en el `id:` de cada evento SSE:
+//
+//   2.<semilla>.<estado PRNG>.<mensajes>.<ronda usernames>.<cursor>.<pendiente>[.<oleadas>]
+//
+// (enteros en base 36; el estado PRNG son 4 palabras separadas por '_';
+// cada oleada es <tipo><semilla>:<índice>, separadas por '-'). Al reconectar,
+// el navegador manda el último id en Last-Event-ID y el servidor —esta
+// instancia u otra— reconstruye la sesión y sigue exactamente donde se quedó,
+// sin guardar mensajes en ningún sitio.
+//
+// La continuación es idéntica mientras las frases del juego sean las mismas
+// en la instancia que reanuda (en una instancia fría pueden ser otras).
+
+const TOKEN_VERSION = '2';
+
+/** Índice máximo dentro de una oleada (tienen como mucho 9 frases) */
+const MAX_WAVE_INDEX = 32;
+
+const WAVE_CODES: Record<WaveType, string> = { laugh: 'l', hype: 'h', fear: 'f', omg: 'o' };
+const WAVE_TYPES: Record<string, WaveType> = { l: 'laugh', h: 'hype', f: 'fear', o: 'omg' };
+
+/** Pool de usernames de una sesión: la ronda determina el barajado */
+export interface SessionUsernames {
+  round: number;
+  cursor: number;
+  /** Orden de la ronda actual (se reconstruye a partir de semilla y ronda) */
+  order: string[];
+  source: string[] | null;
+}
+
+export interface StreamSession {
+  seed: number;
+  random: SeededRandom;
+  /** Mensajes generados en la sesión (el id del mensaje n es idPrefix + n) */
+  count: number;
+  idPrefix: string;
+  usernames: SessionUsernames;
+  /** Hay un mensaje normal esperando a que venza el delay actual */
+  pendingMessage: boolean;
+}
+
+export interface ResumePoint {
+  session: StreamSession;
+  waves: WaveState[];
+}
+
+function buildSession(
+  seed: number,
+  state: number | number[],
+  count: number,
+  round: number,
+  cursor: number,
+  pending: boolean
+): StreamSession {
+  return {
+    seed,
+    random: createSeededRandom(state),
+    count,
+    idPrefix: `${seed.toString(36)}-`,
+    usernames: { round, cursor, order: [], source: null },
+    pendingMessage: pending,
+  };
+}
+
+/**
+ * Sesión nueva. Con `seed` la secuencia es reproducible (benchmarks, pruebas
+ * de carga); sin ella, semilla aleatoria.
+ */
+export function createStreamSession(seed: number = randomSeed()): StreamSession {
+  return buildSession(seed >>> 0, seed >>> 0, 0, 0, 0, false);
+}
+
+/**
+ * Serializa la sesión y las oleadas pendientes para el `id:` del evento
+ */
+export function encodeResumeToken(session: StreamSession, waves: WaveState[]): string {
+  const parts = [
+    TOKEN_VERSION,
+    session.seed.toString(36),
+    session.random.getState().map((word) => word.toString(36)).join('_'),
+    session.count.toString(36),
+    session.usernames.round.toString(36),
+    session.usernames.cursor.toString(36),
+    session.pendingMessage ? '1' : '0',
+  ];
+  if (waves.length > 0) {
+    // Nunca más de las que acepta parseWaves (la cola ya tiene ese tope)
+    parts.push(waves.slice(0, MAX_QUEUED_WAVES).map((wave) => `${WAVE_CODES[wave.type]}${wave.seed.toString(36)}:${wave.index.toString(36)}`).join('-'));
+  }
+  return parts.join('.');
+}
+
+function parseInt36(value: string | undefined, max: number): number | null {
+  if (!value || !/^[0-9a-z]{1,13}$/.test(value)) return null;
+  const parsed = parseInt(value, 36);
+  return Number.isSafeInteger(parsed) && parsed <= max ? parsed : null;
+}
+
+function parseWaves(value: string | undefined): WaveState[] | null {
+  if (value === undefined) return [];
+  const entries = value.split('-');
+  if (entries.length > MAX_QUEUED_WAVES) return null;
+
+  const waves: WaveState[] = [];
+  for (const entry of entries) {
+    const type = WAVE_TYPES[entry[0]];
+    const [seed, index] = entry.slice(1).split(':');
+    const parsedSeed = parseInt36(seed, 0xffffffff);
+    const parsedIndex = parseInt36(index, MAX_WAVE_INDEX);
+    if (!type || parsedSeed === null || parsedIndex === null) return null;
+    waves.push({ type, seed: parsedSeed, index: parsedIndex });
+  }
+  return waves;
+}
+
+/**
+ * Reconstruye la sesión de un Last-Event-ID. null si no hay token o no es
+ * válido (el stream empieza una sesión nueva).
+ */
+export function decodeResumeToken(token: string | null | undefined): ResumePoint | null {
+  if (!token) return null;
+  const parts = token.trim().split('.');
+  if (parts[0] !== TOKEN_VERSION || parts.length < 7 || parts.length > 8) return null;
+
+  const seed = parseInt36(parts[1], 0xffffffff);
+  const state = parts[2].split('_').map((word) => parseInt36(word, 0xffffffff));
+  const count = parseInt36(parts[3], Number.MAX_SAFE_INTEGER);
+  const round = parseInt36(parts[4], Number.MAX_SAFE_INTEGER);
+  const cursor = parseInt36(parts[5], Number.MAX_SAFE_INTEGER);
+  const pending = parts[6];
+  const waves = parseWaves(parts[7]);
+
+  if (seed === null || count === null || round === null || cursor === null) return null;
+  if (state.length !== 4 || state.some((word) => word === null)) return null;
+  if ((pending !== '0' && pending !== '1') || !waves) return null;
+
+  return { session: buildSession(seed, state as number[], count, round, cursor, pending === '1'), waves };
+}
@@ -0,0 +1,23 @@
+import { waitUntil as vercelWaitUntil } from '@vercel/functions';
+
+// ============================================
+// TRABAJO TRAS LA RESPUESTA
+// ============================================
+//
+// En Vercel una función puede congelarse en cuanto devuelve la respuesta:
+// lo que siga en marcha (el resto de una generación con IA, escrituras en el
+// store persistente) no tiene garantizado terminar. waitUntil mantiene viva
+// la invocación hasta que `task` se resuelve. En @astrojs/node (o `astro
+// dev`) no hay contexto de Vercel, no hace nada y el proceso sigue vivo.
+
+/**
+ * Mantiene viva la función hasta que `task` termine. Los errores de `task`
+ * no se propagan aquí: quien la lanzó es quien los trata.
+ */
+export function waitUntil(task: Promise<unknown>): void {
+  try {
+    vercelWaitUntil(task.catch(() => {}));
+  } catch (error) {
+    console.error('[waitUntil] No se pudo registrar la tarea:', error);
+  }
+}
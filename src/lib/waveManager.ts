@@ -1,4 +1,5 @@
 import type { WaveType } from '../utils/types';
+import { createSeededRandom, randomSeed, shuffleInPlace } from './random';
 
 // ─── Frases por tipo de oleada ────────────────────────────────────────────────
 
@@ -75,46 +76,76 @@ const WAVE_PHRASES: Record<WaveType, string[]> = {
 
 // ─── Estado interno ───────────────────────────────────────────────────────────
 
+/**
+ * Oleadas por usuario (la activa más las encoladas). Con la cola llena las
+ * nuevas se rechazan; es también lo que cabe en el token de reanudación.
+ */
+export const MAX_QUEUED_WAVES = 10;
+
 interface ActiveWave {
   type: WaveType;
+  seed: number;        // decide qué frases salen y en qué orden
   phrases: string[];   // frases shuffleadas, se van consumiendo
   index: number;       // siguiente frase a emitir
 }
 
+/** Lo mínimo para reconstruir una oleada (ver streamSession.ts) */
+export interface WaveState {
+  type: WaveType;
+  seed: number;
+  index: number;
+}
+
 /**
  * Cola de oleadas por userId.
  * Cada entrada es un array: la primera es la oleada activa, el resto son las encoladas.
  */
 const waveQueues = new Map<string, ActiveWave[]>();
 
-// ─── Helpers ──────────────────────────────────────────────────────────────────
+/** Aviso por userId cuando se encola una oleada (un stream por usuario) */
+const waveWatchers = new Map<string, () => void>();
 
-function shuffle<T>(arr: T[]): T[] {
-  const copy = [...arr];
-  for (let i = copy.length - 1; i > 0; i--) {
-    const j = Math.floor(Math.random() * (i + 1));
-    [copy[i], copy[j]] = [copy[j], copy[i]];
-  }
-  return copy;
-}
+// ─── Helpers ──────────────────────────────────────────────────────────────────
 
-function buildWave(type: WaveType): ActiveWave {
+/**
+ * Construye una oleada a partir de su semilla: la misma semilla da siempre
+ * las mismas frases en el mismo orden
+ */
+function buildWave(type: WaveType, seed: number, index = 0): ActiveWave {
+  const random = createSeededRandom(seed).next;
   // Elegir entre 6 y 9 frases al azar del pool shuffleado
-  const count = Math.floor(Math.random() * 4) + 6; // 6..9
-  const phrases = shuffle(WAVE_PHRASES[type]).slice(0, count);
-  return { type, phrases, index: 0 };
+  const count = Math.floor(random() * 4) + 6; // 6..9
+  const phrases = [...WAVE_PHRASES[type]];
+  shuffleInPlace(phrases, random);
+  return { type, seed, phrases: phrases.slice(0, count), index };
 }
 
 // ─── API pública ──────────────────────────────────────────────────────────────
 
 /**
  * Encola una nueva oleada para el usuario.
- * Si hay una activa, la nueva se añade detrás.
+ * Si hay una activa, la nueva se añade detrás. `seed` fija sus frases.
+ * Con MAX_QUEUED_WAVES en cola no se encola y devuelve false.
  */
-export function enqueueWave(userId: string, type: WaveType): void {
+export function enqueueWave(userId: string, type: WaveType, seed: number = randomSeed()): boolean {
   const queue = waveQueues.get(userId) ?? [];
-  queue.push(buildWave(type));
+  if (queue.length >= MAX_QUEUED_WAVES) return false;
+  queue.push(buildWave(type, seed));
   waveQueues.set(userId, queue);
+  waveWatchers.get(userId)?.();
+  return true;
+}
+
+/**
+ * Llama a `listener` cada vez que se encola una oleada para el usuario, para
+ * streams que duermen hasta la siguiente (modo canal). Devuelve la función
+ * para dejar de escuchar.
+ */
+export function watchWaves(userId: string, listener: () => void): () => void {
+  waveWatchers.set(userId, listener);
+  return () => {
+    if (waveWatchers.get(userId) === listener) waveWatchers.delete(userId);
+  };
 }
 
 /**
@@ -157,3 +188,23 @@ export function getNextWavePhrase(userId: string): string | null {
 export function clearWaves(userId: string): void {
   waveQueues.delete(userId);
 }
+
+/**
+ * Estado de las oleadas activas y encoladas, para el token de reanudación
+ */
+export function getWaveState(userId: string): WaveState[] {
+  const queue = waveQueues.get(userId);
+  if (!queue) return [];
+  return queue.map(({ type, seed, index }) => ({ type, seed, index }));
+}
+
+/**
+ * Restaura las oleadas de un stream reanudado (sustituye a las que hubiera)
+ */
+export function restoreWaves(userId: string, states: WaveState[]): void {
+  if (states.length === 0) {
+    waveQueues.delete(userId);
+    return;
+  }
+  waveQueues.set(userId, states.slice(0, MAX_QUEUED_WAVES).map(({ type, seed, index }) => buildWave(type, seed, index)));
+}
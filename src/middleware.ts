@@ -1,11 +1,7 @@
 import { clerkMiddleware, createRouteMatcher } from '@clerk/astro/server';
 import { defineMiddleware, sequence } from 'astro:middleware';
-import {
-  checkIpRateLimit,
-  getRemainingRequests,
-  RATE_LIMIT_WINDOW_MS,
-  RATE_LIMIT_MAX_REQUESTS,
-} from './lib/rateLimiter';
+import { checkIpRateLimit, type RateLimitRoute } from './lib/rateLimiter';
+import { startPhraseWarmup } from './lib/phraseWarmup';
 
 const isProtectedRoute = createRouteMatcher([
   '/dashboard(.*)',
@@ -14,6 +10,16 @@ const isProtectedRoute = createRouteMatcher([
 ]);
 
 const isApiRoute = createRouteMatcher(['/api/(.*)']);
+const isCronRoute = createRouteMatcher(['/api/warmup']);
+const isStreamRoute = createRouteMatcher(['/api/chat-stream']);
+const isGenerateRoute = createRouteMatcher(['/api/generate-phrases(.*)']);
+
+// Cada tipo de ruta tiene su propio cupo por IP (ver lib/rateLimiter.ts)
+function getRateLimitRoute(request: Request): RateLimitRoute {
+  if (isStreamRoute(request)) return 'sse';
+  if (isGenerateRoute(request)) return 'generate';
+  return 'api';
+}
 
 // Middleware de rate limiting por IP — se aplica solo a rutas API
 const rateLimitMiddleware = defineMiddleware(async (context, next) => {
@@ -25,17 +31,17 @@ const rateLimitMiddleware = defineMiddleware(async (context, next) => {
   const forwarded = context.request.headers.get('x-forwarded-for');
   const ip = forwarded?.split(',')[0]?.trim() ?? 'unknown';
 
-  if (!checkIpRateLimit(ip)) {
-    const remaining = getRemainingRequests(ip);
+  const result = checkIpRateLimit(ip, getRateLimitRoute(context.request));
+  if (!result.allowed) {
     return new Response(
       JSON.stringify({ error: 'Too many requests' }),
       {
         status: 429,
         headers: {
           'Content-Type': 'application/json',
-          'Retry-After': String(Math.ceil(RATE_LIMIT_WINDOW_MS / 1000)),
-          'X-RateLimit-Limit': String(RATE_LIMIT_MAX_REQUESTS),
-          'X-RateLimit-Remaining': String(remaining),
+          'Retry-After': String(Math.ceil(result.retryAfterMs / 1000)),
+          'X-RateLimit-Limit': String(result.limit),
+          'X-RateLimit-Remaining': String(result.remaining),
         },
       }
     );
@@ -103,7 +109,7 @@ const securityHeaders = defineMiddleware(async (context, next) => {
 });
 
 // Middleware de autenticación con Clerk
-const authMiddleware = clerkMiddleware((auth, context) => {
+const clerkAuthMiddleware = clerkMiddleware((auth, context) => {
   // clerck nos permite extraer este metodo de redirect y de obtener el userId para seber si el usuario ha iniciado sesión o no
   const { redirectToSignIn, userId } = auth();
   
@@ -112,5 +118,57 @@ const authMiddleware = clerkMiddleware((auth, context) => {
   }
 });
 
-// Combinar middlewares: rate limit -> auth -> headers de seguridad
-export const onRequest = sequence(rateLimitMiddleware, authMiddleware, securityHeaders);
+// ============================================
+// Identidad sintética para pruebas de carga
+// ============================================
+//
+// testsprite_tests/load_sse.py abre cientos de streams SSE contra un servidor
+// local sin pasar por Clerk. Solo se activa si LOADTEST_SECRET está definido
+// en el entorno del servidor y el request trae el mismo secreto; cada conexión
+// declara su propio userId en x-loadtest-user.
+
+const LOADTEST_SECRET = import.meta.env.LOADTEST_SECRET as string | undefined;
+
+function getLoadTestUserId(request: Request): string | null {
+  if (!LOADTEST_SECRET) return null;
+  if (request.headers.get('x-loadtest-secret') !== LOADTEST_SECRET) return null;
+  const userId = request.headers.get('x-loadtest-user')?.trim();
+  return userId ? `loadtest:${userId}` : null;
+}
+
+// ============================================
+// Cron de pre-warming
+// ============================================
+//
+// /api/warmup no tiene sesión de Clerk: lo llama un cron con
+// `Authorization: Bearer $CRON_SECRET` y el endpoint verifica el secreto.
+
+const CRON_SECRET = import.meta.env.CRON_SECRET as string | undefined;
+
+function isCronRequest(request: Request): boolean {
+  return Boolean(CRON_SECRET) &&
+    isCronRoute(request) &&
+    request.headers.get('authorization') === `Bearer ${CRON_SECRET}`;
+}
+
+const authMiddleware = defineMiddleware((context, next) => {
+  if (isCronRequest(context.request)) {
+    return next();
+  }
+
+  const loadTestUserId = getLoadTestUserId(context.request);
+  if (!loadTestUserId) {
+    return clerkAuthMiddleware(context, next);
+  }
+  context.locals.auth = (() => ({ userId: loadTestUserId })) as unknown as typeof context.locals.auth;
+  return next();
+});
+
+// Arranca el pre-warming del caché con el primer request de la instancia
+const warmupMiddleware = defineMiddleware((_context, next) => {
+  startPhraseWarmup();
+  return next();
+});
+
+// Combinar middlewares: warmup -> rate limit -> auth -> headers de seguridad
+export const onRequest = sequence(warmupMiddleware, rateLimitMiddleware, authMiddleware, securityHeaders);
@@ -1,16 +1,43 @@
 import type { APIRoute } from 'astro';
 import { generateMessage, getRandomInterval } from '../../lib/chatGenerator';
-import { registerStream, unregisterStream } from '../../lib/rateLimiter';
-import { hasActiveWave, getNextWavePhrase, clearWaves } from '../../lib/waveManager';
-import type { StreamMode } from '../../utils/types';
+import { registerStream, unregisterStream } from '../../lib/streamRegistry';
+import { hasActiveWave, getNextWavePhrase, clearWaves, getWaveState, restoreWaves, watchWaves } from '../../lib/waveManager';
+import { scheduleStream } from '../../lib/streamScheduler';
+import { isChannelInterval, joinChannel } from '../../lib/streamChannel';
+import { loadCachedPhrases } from '../../lib/phraseCache';
+import { encodeDataFrame, encodeEventIdFrame, encodeRetryFrame } from '../../lib/sseFrames';
+import { createSseWriter, SSE_QUEUING_STRATEGY, type SseWriter } from '../../lib/sseWriter';
+import { createStreamSession, decodeResumeToken, encodeResumeToken } from '../../lib/streamSession';
+import type { ChatMessage, StreamMode } from '../../utils/types';
 
 const INTERVAL_MIN_BOUND = 500;
 const INTERVAL_MAX_BOUND = 30_000;
-const HEARTBEAT_INTERVAL = 30_000;
+
+/** Ventana máxima de agrupado (`?batch=`); más allá el chat se vería a saltos */
+const BATCH_MAX_WINDOW = 1_000;
 
 /** Duracion maxima de un stream SSE (2 horas) */
 const MAX_STREAM_DURATION = 2 * 60 * 60 * 1000;
 
+function readNumber(value: unknown, fallback: number): number {
+  const parsed = Number(value);
+  return Number.isFinite(parsed) && parsed >= 0 ? parsed : fallback;
+}
+
+/**
+ * Duración de cada conexión antes de cerrarla para que el navegador
+ * reconecte y reanude. En Vercel, por debajo del maxDuration (60s) de las
+ * funciones, así el corte es nuestro y no un timeout; en el resto de
+ * despliegues no hace falta y por defecto no hay cortes (0).
+ */
+const SEGMENT_MS = readNumber(import.meta.env.SSE_SEGMENT_MS, import.meta.env.VERCEL ? 55_000 : 0);
+
+/** Espera del navegador antes de reconectar solo (campo `retry:`) */
+const SSE_RETRY_MS = 1_000;
+
+/** Modo canal sin oleadas: el stream duerme hasta que llega una (watchWaves) */
+const WAVE_IDLE_MS = 60_000;
+
 export const GET: APIRoute = async ({ request, url, locals }) => {
   const auth = locals.auth?.();
   const userId = auth?.userId;
@@ -37,24 +64,89 @@ export const GET: APIRoute = async ({ request, url, locals }) => {
   const intervalMin = Number.isFinite(rawMin) && rawMin >= INTERVAL_MIN_BOUND ? rawMin : 2000;
   const intervalMax = Number.isFinite(rawMax) && rawMax <= INTERVAL_MAX_BOUND && rawMax > intervalMin ? rawMax : 4000;
 
+  // Agrupado opt-in: `?batch=100ms` (o `?batch=100`). 0 = un evento por mensaje
+  const rawBatch = parseInt(url.searchParams.get('batch') ?? '', 10);
+  const batchWindow = Number.isFinite(rawBatch) && rawBatch > 0 ? Math.min(rawBatch, BATCH_MAX_WINDOW) : 0;
+
+  // Canal compartido opt-in (`?channel=1`), solo con los presets de intervalo:
+  // los mensajes normales salen de un generador común a todos los streams del
+  // mismo juego, modo e intervalo (ver lib/streamChannel.ts). Las oleadas del
+  // usuario siguen siendo suyas; `?batch=` no aplica.
+  const useChannel = url.searchParams.get('channel') === '1' && isChannelInterval(intervalMin, intervalMax);
+
+  // En una instancia fría las frases del juego pueden estar solo en el store
+  // persistente: cargarlas antes del primer mensaje (acotado por timeout)
+  await loadCachedPhrases(gameName);
+
+  // El cliente se fue durante la espera: su 'abort' ya pasó y no volverá a
+  // dispararse, así que no se registra nada
+  if (request.signal.aborted) {
+    return new Response(null, { status: 204 });
+  }
+
+  // Reanudación: el navegador manda el último id en Last-Event-ID al
+  // reconectar solo; el dashboard lo pasa en ?lastEventId= cuando abre un
+  // EventSource nuevo. Sin token válido empieza una sesión nueva;
+  // `?seed=` fija la secuencia (pruebas de carga que comparan contenido).
+  const resume = decodeResumeToken(request.headers.get('last-event-id') ?? url.searchParams.get('lastEventId'));
+  const rawSeed = url.searchParams.get('seed');
+  const seed = rawSeed !== null && /^\d{1,10}$/.test(rawSeed) ? Number(rawSeed) : undefined;
+  const session = resume?.session ?? createStreamSession(seed);
+
   // Registrar el stream: si el usuario ya tenía uno abierto (otra pestaña),
   // se cancela automáticamente antes de abrir este.
   const streamController = registerStream(userId);
+  if (resume) restoreWaves(userId, resume.waves);
+
+  // Creado en start(); pull() avisa cuando el cliente vuelve a leer
+  let writer: SseWriter | null = null;
+  // Libera todo lo del stream; definido en start(), también lo llama cancel()
+  let cleanup = () => {};
 
-  const stream = new ReadableStream({
+  const stream = new ReadableStream<Uint8Array>({
     async start(controller) {
-      const encoder = new TextEncoder();
+      // Backpressure: si el cliente deja de leer, los mensajes se retienen
+      // o descartan en vez de acumularse en la cola (ver lib/sseWriter.ts)
+      const sse = createSseWriter(controller, userId, () => cleanup());
+      writer = sse;
+
+      // Reconexión nativa rápida tras un corte de segmento
+      sse.writeControl(encodeRetryFrame(SSE_RETRY_MS));
+
+      // Mensajes retenidos en la ventana de agrupado actual
+      let batch: ChatMessage[] = [];
+      let batchStartedAt = 0;
+
+      // Sin agrupado: mensajes del paso actual, salen al final del paso
+      const stepMessages: ChatMessage[] = [];
+
+      // Estado de la sesión (PRNG, usernames, oleadas) para el `id:` del evento
+      const resumeToken = () => encodeResumeToken(session, getWaveState(userId));
+
+      const flushBatch = (eventId?: string) => {
+        if (batch.length === 0) return;
+        const messages = batch;
+        batch = [];
+        sse.writeBatch(messages, eventId);
+      };
+
+      const emit = (message: ChatMessage) => {
+        if (batchWindow === 0) {
+          stepMessages.push(message);
+          return;
+        }
+        if (batch.length === 0) batchStartedAt = Date.now();
+        batch.push(message);
+      };
 
       const sendMessage = () => {
         try {
-          const message = generateMessage(gameName, mode);
-          const data = `data: ${JSON.stringify(message)}\n\n`;
-          controller.enqueue(encoder.encode(data));
+          emit(generateMessage(gameName, mode, session));
         } catch (error) {
           console.error('Error generando mensaje:', error);
           try {
-            const errorEvent = `data: ${JSON.stringify({ type: 'error', message: 'Error generando mensaje' })}\n\n`;
-            controller.enqueue(encoder.encode(errorEvent));
+            flushBatch();
+            sse.writeControl(encodeDataFrame({ type: 'error', message: 'Error generando mensaje' }));
           } catch {
             // Stream ya cerrado
           }
@@ -63,64 +155,128 @@ export const GET: APIRoute = async ({ request, url, locals }) => {
 
       const sendWaveMessage = (phrase: string) => {
         try {
-          const message = generateMessage(gameName, mode);
-          const waveMessage = { ...message, content: phrase, category: 'reactions' as const };
-          const data = `data: ${JSON.stringify(waveMessage)}\n\n`;
-          controller.enqueue(encoder.encode(data));
+          const message = generateMessage(gameName, mode, session);
+          emit({ ...message, content: phrase, category: 'reactions' });
         } catch {
           // Stream ya cerrado, ignorar
         }
       };
 
-      // Heartbeat cada 30s para mantener viva la conexion contra proxies
-      const heartbeatId = setInterval(() => {
-        try {
-          controller.enqueue(encoder.encode(': ping\n\n'));
-        } catch {
-          // Stream ya cerrado, ignorar
+      // Un paso del stream: emite lo que toca y devuelve el delay hasta el siguiente.
+      // Las oleadas tienen prioridad y salen a ritmo rápido (180-350ms).
+      // session.pendingMessage: mensaje normal pendiente de emitir cuando venza el delay actual
+      const nextDelay = (): number => {
+        if (session.pendingMessage) {
+          sendMessage();
+          session.pendingMessage = false;
         }
-      }, HEARTBEAT_INTERVAL);
-
-      const scheduleNext = (): ReturnType<typeof setTimeout> => {
         if (hasActiveWave(userId)) {
           const phrase = getNextWavePhrase(userId);
           if (phrase) sendWaveMessage(phrase);
-          return setTimeout(scheduleNext, getRandomInterval(180, 350));
+          return getRandomInterval(180, 350, session.random.next);
         }
-        const interval = getRandomInterval(intervalMin, intervalMax);
-        return setTimeout(() => {
-          sendMessage();
-          timeoutId = scheduleNext();
-        }, interval);
+        session.pendingMessage = true;
+        return getRandomInterval(intervalMin, intervalMax, session.random.next);
+      };
+
+      // El token se toma al final de cada paso, con el delay ya sorteado:
+      // una sesión reanudada desde él repite exactamente los pasos siguientes.
+      // Con agrupado, el lote se envía en cuanto el siguiente mensaje ya no
+      // cabe en la ventana: ningún mensaje espera más de `batchWindow` y no
+      // hace falta un timer extra por stream.
+      const step = (): number => {
+        const delay = nextDelay();
+        if (stepMessages.length > 0) {
+          const last = stepMessages.length - 1;
+          for (let i = 0; i < last; i++) sse.writeMessage(stepMessages[i]);
+          sse.writeMessage(stepMessages[last], resumeToken());
+          stepMessages.length = 0;
+        }
+        if (batch.length > 0 && Date.now() + delay >= batchStartedAt + batchWindow) {
+          try {
+            flushBatch(resumeToken());
+          } catch {
+            // Stream ya cerrado, ignorar
+          }
+        }
+        return delay;
       };
 
-      let timeoutId = scheduleNext();
+      // Modo canal: los mensajes normales llegan del canal y este stream solo
+      // emite sus oleadas, con el mismo ritmo rápido
+      const waveStep = (): number => {
+        const phrase = hasActiveWave(userId) ? getNextWavePhrase(userId) : null;
+        if (!phrase) return WAVE_IDLE_MS;
+        try {
+          const message = generateMessage(gameName, mode, session);
+          sse.writeMessage({ ...message, content: phrase, category: 'reactions' }, resumeToken());
+        } catch {
+          // Stream ya cerrado, ignorar
+        }
+        return getRandomInterval(180, 350, session.random.next);
+      };
+
+      let leaveChannel: (() => void) | null = null;
+      let stopWatchingWaves: (() => void) | null = null;
 
-      const cleanup = () => {
-        clearTimeout(timeoutId);
-        clearTimeout(maxDurationId);
-        clearInterval(heartbeatId);
+      let closed = false;
+      cleanup = () => {
+        if (closed) return;
+        closed = true;
+        task.cancel();
+        leaveChannel?.();
+        stopWatchingWaves?.();
+        sse.close();
         clearWaves(userId);
         unregisterStream(userId, streamController);
         try { controller.close(); } catch { /* ya cerrado */ }
       };
 
-      // Timeout maximo del stream (2h)
-      const maxDurationId = setTimeout(() => {
-        try {
-          const closeEvent = `data: ${JSON.stringify({ type: 'stream-end', message: 'Duracion maxima alcanzada' })}\n\n`;
-          controller.enqueue(encoder.encode(closeEvent));
-        } catch { /* ignorar */ }
-        cleanup();
-      }, MAX_STREAM_DURATION);
+      // Mensajes, heartbeat (30s), duración máxima (2h) y fin de segmento los
+      // gestiona el scheduler compartido
+      const task = scheduleStream({
+        step: useChannel ? waveStep : step,
+        onHeartbeat: () => sse.heartbeat(),
+        onExpire: () => {
+          try {
+            flushBatch(resumeToken());
+            sse.writeControl(encodeDataFrame({ type: 'stream-end', message: 'Duracion maxima alcanzada' }));
+          } catch { /* ignorar */ }
+          cleanup();
+        },
+        // Fin de segmento: cerrar limpio antes del límite de la función. El
+        // navegador reconecta a los SSE_RETRY_MS y reanuda con Last-Event-ID;
+        // el último id incluye las oleadas encoladas desde el último mensaje.
+        onSegmentEnd: () => {
+          try {
+            const eventId = resumeToken();
+            if (batch.length > 0) flushBatch(eventId);
+            else sse.writeControl(encodeEventIdFrame(eventId));
+          } catch { /* ignorar */ }
+          cleanup();
+        },
+      }, MAX_STREAM_DURATION, SEGMENT_MS);
+
+      if (useChannel) {
+        // El frame del canal es el mismo Uint8Array para todos los suscriptores
+        leaveChannel = joinChannel(gameName, mode, intervalMin, intervalMax, (message, frame) => sse.writeShared(message, frame));
+        stopWatchingWaves = watchWaves(userId, () => task.wake());
+      }
 
       // El cliente cierra la pestaña o hace Stop
       request.signal.addEventListener('abort', cleanup);
 
       // El servidor cancela este stream porque llegó uno nuevo del mismo usuario
       streamController.signal.addEventListener('abort', cleanup);
+    },
+    pull() {
+      writer?.drain();
+    },
+    // El consumidor del stream lo cancela (el runtime al cerrarse la conexión)
+    cancel() {
+      cleanup();
     }
-  });
+  }, SSE_QUEUING_STRATEGY);
 
   return new Response(stream, {
     headers: {
@@ -1,7 +1,6 @@
 import type { APIRoute } from 'astro';
 import type { WaveType } from '../../utils/types';
-import { enqueueWave } from '../../lib/waveManager';
-import { hasActiveStream } from '../../lib/rateLimiter';
+import { hasActiveStream, sendWave } from '../../lib/streamRegistry';
 
 const VALID_WAVE_TYPES: WaveType[] = ['laugh', 'hype', 'fear', 'omg'];
 
@@ -16,8 +15,8 @@ export const POST: APIRoute = async ({ request, locals }) => {
     );
   }
 
-  // El usuario debe tener un stream SSE activo
-  if (!hasActiveStream(userId)) {
+  // El usuario debe tener un stream SSE activo (en esta instancia o en otra)
+  if (!(await hasActiveStream(userId))) {
     return new Response(
       JSON.stringify({ error: 'No hay stream activo para este usuario' }),
       { status: 400, headers: { 'Content-Type': 'application/json' } }
@@ -43,7 +42,23 @@ export const POST: APIRoute = async ({ request, locals }) => {
     );
   }
 
-  enqueueWave(userId, type);
+  let queued: boolean;
+  try {
+    queued = await sendWave(userId, type);
+  } catch (error) {
+    console.error('Error entregando oleada:', error);
+    return new Response(
+      JSON.stringify({ error: 'No se pudo entregar la oleada' }),
+      { status: 503, headers: { 'Content-Type': 'application/json' } }
+    );
+  }
+
+  if (!queued) {
+    return new Response(
+      JSON.stringify({ error: 'Demasiadas oleadas en cola, espera a que terminen' }),
+      { status: 429, headers: { 'Content-Type': 'application/json' } }
+    );
+  }
 
   return new Response(
     JSON.stringify({ ok: true, type }),
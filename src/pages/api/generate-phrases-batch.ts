@@ -0,0 +1,191 @@
+import type { APIRoute } from 'astro';
+import { generateAndCachePhrases } from '../../lib/phraseGeneration';
+import { recordGameRequest } from '../../lib/phraseWarmup';
+import {
+  loadCachedPhrases,
+  isFillingPhrases,
+  addGameToUser,
+  getUserGames,
+  getRemainingSlots,
+  userHasGame,
+  resolveGameName,
+  MAX_GAMES_PER_USER
+} from '../../lib/phraseCache';
+import type { GeneratePhrasesBatchLine, GeneratePhrasesResponse, StreamMode } from '../../utils/types';
+
+// ============================================
+// GENERACIÓN DE VARIOS JUEGOS EN UNA PETICIÓN
+// ============================================
+//
+// POST { items: [{ gameName, mode? }, …] } (hasta MAX_GAMES_PER_USER).
+// Responde NDJSON: una línea por item en cuanto está listo (los aciertos de
+// caché salen enseguida, las generaciones con IA en paralelo según terminan)
+// y una última línea { done, currentGames, remainingSlots }.
+
+/** Generaciones con IA simultáneas por petición */
+const MAX_PARALLEL_GENERATIONS = 3;
+
+type ItemResult = Omit<GeneratePhrasesResponse, 'currentGames'>;
+
+interface BatchItem {
+  gameName?: unknown;
+  mode?: unknown;
+}
+
+/**
+ * Limita cuántas tareas corren a la vez; el resto espera en cola FIFO
+ */
+function createLimiter(max: number) {
+  let active = 0;
+  const waiting: Array<() => void> = [];
+
+  return async <T>(task: () => Promise<T>): Promise<T> => {
+    if (active >= max) await new Promise<void>((resolve) => waiting.push(resolve));
+    active++;
+    try {
+      return await task();
+    } finally {
+      active--;
+      waiting.shift()?.();
+    }
+  };
+}
+
+function limitReachedResult(normalizedGame: string, mode: StreamMode): ItemResult {
+  return {
+    success: false,
+    error: `Has alcanzado el límite de ${MAX_GAMES_PER_USER} juegos`,
+    gameName: normalizedGame,
+    limitReached: true,
+    mode
+  };
+}
+
+function jsonResponse(body: GeneratePhrasesResponse, status: number): Response {
+  return new Response(JSON.stringify(body), {
+    status,
+    headers: { 'Content-Type': 'application/json' }
+  });
+}
+
+export const POST: APIRoute = async ({ request, locals }) => {
+  const auth = locals.auth?.();
+  const userId = auth?.userId;
+
+  if (!userId) {
+    return jsonResponse({ success: false, error: 'No autenticado', gameName: '' }, 401);
+  }
+
+  const body = await request.json().catch(() => null) as { items?: BatchItem[] } | null;
+  const items = Array.isArray(body?.items) ? body.items : null;
+
+  if (!items || items.length === 0 || items.length > MAX_GAMES_PER_USER) {
+    return jsonResponse({
+      success: false,
+      error: `Se esperan entre 1 y ${MAX_GAMES_PER_USER} juegos`,
+      gameName: ''
+    }, 400);
+  }
+
+  const limit = createLimiter(MAX_PARALLEL_GENERATIONS);
+
+  // Los slots se reservan en el orden de la petición, antes de cualquier
+  // await, para que el resultado no dependa de qué item termina antes
+  let freeSlots = getRemainingSlots(userId);
+  const claimed = new Set<string>();
+  const claimSlot = (normalizedGame: string): boolean => {
+    if (claimed.has(normalizedGame) || userHasGame(userId, normalizedGame)) return true;
+    if (freeSlots <= 0) return false;
+    freeSlots--;
+    claimed.add(normalizedGame);
+    return true;
+  };
+
+  const resolveItem = async (gameName: string, normalizedGame: string, mode: StreamMode): Promise<ItemResult> => {
+    try {
+      // Caché global (y store persistente): sin pasar por el limitador
+      const existingPhrases = await loadCachedPhrases(normalizedGame);
+      if (existingPhrases) {
+        if (!addGameToUser(userId, normalizedGame)) return limitReachedResult(normalizedGame, mode);
+        return {
+          success: true,
+          gameName: normalizedGame,
+          phrases: existingPhrases,
+          filling: isFillingPhrases(existingPhrases),
+          mode
+        };
+      }
+
+      console.log(`[API] Generando frases (batch) para: ${gameName} (usuario: ${userId}, modo: ${mode})`);
+      const { phrases, filling } = await limit(() => generateAndCachePhrases(gameName, normalizedGame, mode, userId));
+      if (!addGameToUser(userId, normalizedGame)) return limitReachedResult(normalizedGame, mode);
+      return { success: true, gameName: normalizedGame, phrases, filling, mode };
+    } catch (error) {
+      const err = error as Error & { code?: string };
+      if (err.code === 'INVALID_GAME' || err.code === 'INVALID_TOPIC') {
+        return { success: false, error: err.code, gameName: normalizedGame, mode };
+      }
+      console.error(`[API] Error generando frases (batch) para ${gameName}:`, error);
+      return { success: false, error: err.message || 'Error interno del servidor', gameName: normalizedGame, mode };
+    }
+  };
+
+  // Items repetidos (mismo juego y modo) comparten resultado
+  const pending = new Map<string, Promise<ItemResult>>();
+  const results = items.map((item, index): Promise<GeneratePhrasesBatchLine> => {
+    const gameName = typeof item?.gameName === 'string' ? item.gameName.trim() : '';
+    const mode: StreamMode = item?.mode === 'justchatting' ? 'justchatting' : 'game';
+
+    if (!gameName) {
+      return Promise.resolve({ index, success: false, error: 'Nombre requerido', gameName: '', mode });
+    }
+
+    const normalizedGame = resolveGameName(gameName);
+    recordGameRequest(normalizedGame, mode);
+    const key = `${mode}:${normalizedGame}`;
+    let result = pending.get(key);
+    if (!result) {
+      result = claimSlot(normalizedGame)
+        ? resolveItem(gameName, normalizedGame, mode)
+        : Promise.resolve(limitReachedResult(normalizedGame, mode));
+      pending.set(key, result);
+    }
+    return result.then((line) => ({ index, ...line }));
+  });
+
+  const encoder = new TextEncoder();
+  let closed = false;
+
+  const stream = new ReadableStream({
+    start(controller) {
+      const send = (line: GeneratePhrasesBatchLine) => {
+        if (closed) return;
+        try {
+          controller.enqueue(encoder.encode(JSON.stringify(line) + '\n'));
+        } catch {
+          // El cliente se fue; las generaciones siguen y quedan en caché
+          closed = true;
+        }
+      };
+
+      void Promise.all(results.map((result) => result.then(send))).then(() => {
+        send({ done: true, currentGames: getUserGames(userId), remainingSlots: getRemainingSlots(userId) });
+        if (!closed) {
+          closed = true;
+          controller.close();
+        }
+      });
+    },
+    cancel() {
+      closed = true;
+    }
+  });
+
+  return new Response(stream, {
+    status: 200,
+    headers: {
+      'Content-Type': 'application/x-ndjson; charset=utf-8',
+      'Cache-Control': 'no-cache'
+    }
+  });
+};
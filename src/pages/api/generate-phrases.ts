@@ -1,16 +1,17 @@
 import type { APIRoute } from 'astro';
-import { generateGamePhrases, generateChatTopicPhrases } from '../../lib/ai';
+import { generateAndCachePhrases } from '../../lib/phraseGeneration';
+import { recordGameRequest } from '../../lib/phraseWarmup';
 import { 
-  getCachedPhrases, 
-  setCachedPhrases, 
+  loadCachedPhrases,
+  isFillingPhrases,
   canUserAddGame, 
   addGameToUser,
   getUserGames,
   getRemainingSlots,
   userHasGame,
-  normalizeGameName
+  resolveGameName
 } from '../../lib/phraseCache';
-import type { GeneratePhrasesResponse, StreamMode } from '../../utils/types';
+import type { GeneratePhrasesResponse, MessagePattern, StreamMode } from '../../utils/types';
 
 export const POST: APIRoute = async ({ request, locals }) => {
   try {
@@ -44,10 +45,13 @@ export const POST: APIRoute = async ({ request, locals }) => {
       });
     }
 
-    const normalizedGame = normalizeGameName(gameName);
+    // Variantes del nombre ("Red Dead 2", "GTA 5") usan la key ya conocida
+    const normalizedGame = resolveGameName(gameName);
+    recordGameRequest(normalizedGame, mode);
 
-    // Verificar si ya existe en cache global (cualquier usuario lo generó)
-    const existingPhrases = getCachedPhrases(normalizedGame);
+    // Verificar si ya existe en cache global (cualquier usuario lo generó),
+    // incluido el store persistente si esta instancia arrancó en frío
+    const existingPhrases = await loadCachedPhrases(normalizedGame);
     if (existingPhrases) {
       // Agregar a la lista del usuario si no lo tiene
       if (!userHasGame(userId, normalizedGame)) {
@@ -70,6 +74,7 @@ export const POST: APIRoute = async ({ request, locals }) => {
         success: true,
         gameName: normalizedGame,
         phrases: existingPhrases,
+        filling: isFillingPhrases(existingPhrases),
         currentGames: getUserGames(userId),
         mode
       } as GeneratePhrasesResponse), {
@@ -95,11 +100,11 @@ export const POST: APIRoute = async ({ request, locals }) => {
     // Generar nuevas frases con IA según el modo
     console.log(`[API] Generando frases para: ${gameName} (usuario: ${userId}, modo: ${mode})`);
 
-    let phrases;
+    // Si otro usuario ya está generando este juego, se espera a su resultado
+    let phrases: MessagePattern;
+    let filling = false;
     try {
-      phrases = mode === 'justchatting'
-        ? await generateChatTopicPhrases(gameName)
-        : await generateGamePhrases(gameName);
+      ({ phrases, filling } = await generateAndCachePhrases(gameName, normalizedGame, mode, userId));
     } catch (aiError) {
       const err = aiError as Error & { code?: string };
       if (err.code === 'INVALID_GAME') {
@@ -125,16 +130,17 @@ export const POST: APIRoute = async ({ request, locals }) => {
       throw aiError;
     }
 
-    // Guardar en cache
-    setCachedPhrases(normalizedGame, phrases, userId);
     addGameToUser(userId, normalizedGame);
 
-    console.log(`[API] Frases generadas exitosamente para: ${gameName} (modo: ${mode})`);
+    console.log(filling
+      ? `[API] Primeras frases recibidas para: ${gameName} (modo: ${mode}), la generación continúa`
+      : `[API] Frases generadas exitosamente para: ${gameName} (modo: ${mode})`);
 
     return new Response(JSON.stringify({
       success: true,
       gameName: normalizedGame,
       phrases,
+      filling,
       currentGames: getUserGames(userId),
       mode
     } as GeneratePhrasesResponse), {
@@ -0,0 +1,26 @@
+import type { APIRoute } from 'astro';
+import { getWarmupStats, runPhraseWarmup } from '../../lib/phraseWarmup';
+import { waitUntil } from '../../lib/waitUntil';
+
+// Disparo del pre-warming desde un cron (vercel.json; Vercel Cron envía
+// `Authorization: Bearer $CRON_SECRET`). Contesta en cuanto arranca la pasada
+// y esta sigue tras la respuesta (waitUntil): PHRASE_WARMUP_BUDGET
+// generaciones no caben en la espera del cron. Lo que se genera va al store
+// según termina; el informe queda en stats.lastReport.
+export const GET: APIRoute = async ({ request }) => {
+  const secret = import.meta.env.CRON_SECRET;
+
+  if (!secret || request.headers.get('authorization') !== `Bearer ${secret}`) {
+    return new Response(JSON.stringify({ error: 'No autorizado' }), {
+      status: 401,
+      headers: { 'Content-Type': 'application/json' }
+    });
+  }
+
+  waitUntil(runPhraseWarmup());
+
+  return new Response(JSON.stringify({ started: true, stats: getWarmupStats() }), {
+    status: 202,
+    headers: { 'Content-Type': 'application/json' }
+  });
+};
@@ -81,8 +81,16 @@ export interface GeneratePhrasesResponse {
   success: boolean;
   gameName: string;
   phrases?: MessagePattern;
+  /** La IA sigue generando: `phrases` es parcial y el stream ya puede empezar */
+  filling?: boolean;
   error?: string;
   limitReached?: boolean;
   currentGames?: string[];
   mode?: StreamMode;
 }
+
+// Línea NDJSON del endpoint generate-phrases-batch: un resultado por item
+// (en orden de llegada, `index` = posición en la petición) y una línea final
+export type GeneratePhrasesBatchLine =
+  | (GeneratePhrasesResponse & { index: number })
+  | { done: true; currentGames: string[]; remainingSlots: number };
@@ -2,6 +2,8 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -37,7 +39,7 @@ async def run_test():
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div/main/article/header/div/astro-island/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -53,7 +55,6 @@ async def run_test():
         
         # Verify landing page header exists — NOT FOUND in available elements list
         raise AssertionError("Landing page header element not found in the provided available elements list. Please update the element list to include the landing page header xpath.")
-        await asyncio.sleep(5)
 
     finally:
         if context:
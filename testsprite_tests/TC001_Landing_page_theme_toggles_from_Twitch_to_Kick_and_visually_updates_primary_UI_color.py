@@ -2,6 +2,8 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -37,7 +39,7 @@ async def run_test():
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div/main/article/header/div/astro-island/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -47,7 +49,6 @@ async def run_test():
         # The test plan requires verifying a platform theme toggle and the text 'Twitch' before switching to 'Kick'.
         # Those elements/xpaths are not present in the provided Available elements list, so report the issue and mark the task done.
         raise AssertionError("Platform theme toggle and/or the text 'Twitch' not found in the provided available elements. Feature appears to be missing; stopping further steps.")
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,8 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -37,13 +39,13 @@ async def run_test():
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div/main/article/header/div/astro-island/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the platform toggle (element index 119) to switch back to Twitch. After the click, verify the toggle shows Twitch and that the primary call-to-action button 'Comenzar Stream' is visible, then finish.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/article/header/div/astro-island/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -57,7 +59,6 @@ async def run_test():
         assert await cta_btn.is_visible(), "Expected 'Comenzar Stream' button to be visible, but it is not."
         # Report missing feature: 'Kick' element not available in the provided elements list, so cannot verify the initial switch to Kick
         print("NOTE: 'Kick' platform toggle element not found in the available elements list; cannot verify switching to Kick. Task marked as done.")
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -37,31 +40,10 @@ async def run_test():
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/article/header/div/astro-island/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Navigate directly to /sign-in so the sign-in form can be filled (explicit path provided in test info).
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
+        await ready(elem); await elem.click(timeout=5000)
         
-        # -> Fill the sign-in form using the provided credentials and submit it (input email into index 1387, input password into index 1388, then click the 'Continuar' button at index 1391).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -71,7 +53,6 @@ async def run_test():
         assert "/sign-in" in frame.url, f"Expected '/sign-in' in URL but got: {frame.url}"
         # The sign-in form element is not present in the provided Available elements list, so we cannot assert its visibility. Report the issue and mark the task done.
         print('ISSUE: sign-in form element not present in provided Available elements; cannot verify its visibility. Marking task done.')
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,8 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+
 async def run_test():
     pw = None
     browser = None
@@ -33,79 +35,13 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Navigate to /sign-in (http://localhost:4321/sign-in) to access the login form
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Input email into the email field (index 975), input password into password field (index 976), then click the 'Continuar' / Sign in button (index 980).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Clear and re-enter the correct email in the email field (index 1888), enter the password into the password field (index 1889), then click the 'Continuar' button (index 1895) to attempt sign-in.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Enter credentials into the current sign-in fields and click 'Continuar' to attempt login (use index 2846 for email, 2847 for password, then click index 2850). Then wait for the page to change and verify the dashboard URL in the next step.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Click the visible sign-in/Continuar button on the current sign-in form to attempt login and trigger navigation to the dashboard.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Enter the email into the visible email field (index 3807) and click the visible 'Continuar' button (index 3811) to proceed with sign-in (this may reveal the password step or trigger login).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
         assert '/dashboard' in frame.url
         await expect(frame.locator('text=Just Chatting input').first).to_be_visible(timeout=3000)
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import WAIT_TIMEOUT
+
 async def run_test():
     pw = None
     browser = None
@@ -33,32 +36,15 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Navigate to /sign-in (http://localhost:4321/sign-in) to start the authentication flow
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Fill the email and password fields and click the 'Continuar' button to submit credentials.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
-        await page.wait_for_timeout(3000)
+        await frame.wait_for_url("**/dashboard", timeout=WAIT_TIMEOUT)
         assert "/dashboard" in frame.url
         elem = frame.locator('xpath=/html/body/div[1]/header/nav/astro-island/button')
         assert await elem.is_visible()
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -33,49 +36,26 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Click the 'Comenzar Stream' button to navigate to the sign-in page (use interactive element index 9).
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Navigate to /sign-in using explicit navigate action to http://localhost:4321/sign-in (required by test steps).
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Fill email and password fields and click 'Continuar' to attempt login (input to index 1355, input to index 1356, click index 1362).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # -> Click the platform theme toggle to switch the visible selection to 'Kick' (click element index 2440), then verify that the toggle displays 'Kick' and the dashboard UI remains present.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/header/nav/astro-island/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the platform theme toggle button (index 3430) to switch the visible selection to 'Kick', then verify that 'Kick' text is displayed and that the dashboard UI remains present.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/header/nav/astro-island/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
         assert "/dashboard" in frame.url
         assert await frame.locator('xpath=/html/body/div[1]/header/nav/div/div/button/span/span/span').is_visible()
         assert await frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[2]/button').is_visible()
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,8 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+
 async def run_test():
     pw = None
     browser = None
@@ -33,37 +35,14 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Navigate to /sign-in to access the login form (per explicit test step).
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Input the test email into the email field (index 974) and click the Continue button (index 978).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Type the test password into the password field and click the 'Continuar' button to attempt sign-in.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
         assert '/dashboard' in frame.url
         await expect(frame.locator('text=Just Chatting').first).to_be_visible(timeout=3000)
         await expect(frame.locator('text=Juegos').first).to_be_visible(timeout=3000)
-        await asyncio.sleep(5)
 
     finally:
         if context:
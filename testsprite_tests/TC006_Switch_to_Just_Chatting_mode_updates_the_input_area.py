@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -33,36 +36,14 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Click the 'Comenzar Stream' button to navigate to the sign-in page (or the app's auth flow).
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Navigate to /sign-in (explicit path) so the sign-in form can be filled.
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Type the email into the email field (index 1355), then type the password into the password field (index 1357), then click the 'Continuar' button (index 1360).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # -> Click the 'Just Chatting' button (index 2305) to switch to Just Chatting mode.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -70,7 +51,6 @@ async def run_test():
         assert "/dashboard" in frame.url
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[2]/input')
         assert await elem.is_visible()
-        await asyncio.sleep(5)
 
     finally:
         if context:
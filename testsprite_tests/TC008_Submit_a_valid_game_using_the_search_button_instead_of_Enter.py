@@ -2,6 +2,8 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+
 async def run_test():
     pw = None
     browser = None
@@ -33,36 +35,8 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Click the "Comenzar Stream" button to reach the sign-in / dashboard flow (attempt natural navigation to sign-in).
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Navigate to /sign-in (use explicit navigate action to http://localhost:4321/sign-in as the test step requires).
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Type the test email into the email field (index 1376) as the next immediate action.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Click the 'Continuar' (sign-in) button again to attempt to complete login and reach the dashboard.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -70,7 +44,6 @@ async def run_test():
         await expect(frame.locator('xpath=//div[contains(@class,"spinner") or contains(@class,"loading")]').first).to_be_visible(timeout=3000)
         await expect(frame.locator('xpath=//svg[contains(@class,"check") or contains(@class,"checkmark")]').first).to_be_visible(timeout=3000)
         await expect(frame.locator('text=Hades').first).to_be_visible(timeout=3000)
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,8 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+
 async def run_test():
     pw = None
     browser = None
@@ -33,96 +35,8 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Click the "Comenzar Stream" button to start the sign-in flow (do not navigate by URL).
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Click the appropriate sign-in button inside the opened sign-in modal (shadow DOM) to proceed with authentication.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Click the sign-in button inside the open sign-in modal (shadow DOM) using an available shadow button index (1413).
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Click the sign-in button inside the sign-in modal (shadow DOM) using element index 1627.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Click a sign-in button inside the open sign-in modal (shadow DOM) using a different available shadow button index (2335).
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Close the Astro debug menu/modal that is blocking the page, then reopen the sign-in flow by clicking the 'Comenzar Stream' button so the sign-in provider/form can be interacted with.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Click the sign-in provider button inside the open sign-in modal (shadow DOM) to open the authentication form so the login fields can be filled.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Close the dev toolbar/settings modal to unblock the page, reopen the sign-in flow by clicking 'Comenzar Stream', then attempt to open a sign-in provider/form using provider button index 1652 so the authentication fields can be filled.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Open the sign-in flow by clicking the 'Comenzar Stream' button (index 4571), then click the first shadow provider button (index 4580) to attempt to open the authentication form. ASSERTION: After clicking the provider button, check for email/username and password input fields.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Close the Astro debug/settings modal, reopen the sign-in flow, focus the email input, fill email and password with test credentials, and click 'Continuar' to submit the sign-in form (this click will change page state). Then re-evaluate page for dashboard and proceed with the game-name validation steps.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/astro-dev-toolbar-app-canvas[1]/astro-dev-toolbar-window/header/astro-dev-toolbar-button/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[3]/div/div/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Open the sign-in modal then click a provider button in the shadow DOM to reveal the authentication form (email & password inputs). Immediately check for the presence of email/username and password fields.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -130,7 +44,6 @@ async def run_test():
         await expect(frame.locator('text=must be between 2 and 50 characters').first).to_be_visible(timeout=3000)
         await expect(frame.locator('xpath=//*[contains(@class,"spinner") or contains(@class,"loading") or contains(@aria-label,"loading")]').first).not_to_be_visible(timeout=3000)
         await expect(frame.locator('xpath=//*[contains(@class,"check") or contains(@class,"success") or contains(@aria-label,"success")]').first).not_to_be_visible(timeout=3000)
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -33,88 +36,65 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Click the 'Comenzar Stream' button to open the sign-in flow (index 10).
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Navigate to /sign-in (use explicit navigation to http://localhost:4321/sign-in as the test step requires).
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Type test@testsprite.dev into the email/username field (index 1402). Then fill the password and submit.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # -> Type 'Minecraft' into the game input (index 2353) and press Enter to start generation, then check for loading spinner and resulting success state.
         frame = context.pages[-1]
         # Input text
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Minecraft')
+        await ready(elem); await elem.fill('Minecraft')
         
         # -> Click the play/start control on the dashboard to start generation (likely index 3366).
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the dashboard play/start control to initiate generation (try play button at index 4370).
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Close the Astro debug/modal overlay so the dashboard is fully interactable by clicking the modal close button (likely index 4371).
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/astro-dev-toolbar-app-canvas[1]/astro-dev-toolbar-window/header/astro-dev-toolbar-button/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the Astro modal close button to dismiss the overlay so the dashboard becomes fully interactable (click element index 4371).
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/astro-dev-toolbar-app-canvas[1]/astro-dev-toolbar-window/header/astro-dev-toolbar-button/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Select the existing 'minecraft' chip (index 5599) to choose the game, then click the play/start button (index 5405) to initiate generation, wait a few seconds, and extract the page content to find any loading spinner or success indicator.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Select the 'minecraft' game chip (index 6596) then click the dashboard play/start button (index 6402) to initiate generation, so the page can be checked for a loading spinner.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
         assert '/dashboard' in frame.url
         await expect(frame.locator('text=Generando...').first).to_be_visible(timeout=3000)
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -33,42 +36,19 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Navigate to /sign-in (use exact path http://localhost:4321/sign-in)
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Input the test credentials into the email and password fields and click the 'Continuar' button to sign in.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Verify whether login succeeded by checking the URL for '/dashboard'. If still on /sign-in, retry clicking the 'Continuar' (sign-in) button once more and wait for the redirect.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # -> Type 'A' into the game text input (index 1920) and press Enter to trigger inline validation.
         frame = context.pages[-1]
         # Input text
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('A')
+        await ready(elem); await elem.fill('A')
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
         assert '/dashboard' in frame.url
         await expect(frame.locator('text=El nombre debe tener al menos 2 caracteres').first).to_be_visible(timeout=3000)
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -33,54 +36,32 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Click the 'Comenzar Stream' button to navigate to the sign-in page (use element index 10).
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Navigate explicitly to /sign-in (http://localhost:4321/sign-in) as the test step requires using navigate to that path.
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Type the test email into the email field (index 1355) and then fill the password field (index 1357), then click 'Continuar' (index 1360).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # -> Type a new unique game name into the game input (index 2308) to reach 4 games and press Enter to add it.
         frame = context.pages[-1]
         # Input text
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Celeste')
+        await ready(elem); await elem.fill('Celeste')
         
         # -> Type 'Celeste' into the game input (index 3310) and press Enter to try to reach 4 games (confirm the UI updates).
         frame = context.pages[-1]
         # Input text
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Celeste')
+        await ready(elem); await elem.fill('Celeste')
         
         # -> Type 'Celeste' into the game input and press Enter to add the 4th game (then verify the UI shows 4 chips).
         frame = context.pages[-1]
         # Input text
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Celeste')
+        await ready(elem); await elem.fill('Celeste')
         
         # -> Type 'Apex Legends' into the game input (index 5323) and press Enter to trigger and verify the 4-game limit error.
         frame = context.pages[-1]
         # Input text
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Apex Legends')
+        await ready(elem); await elem.fill('Apex Legends')
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -96,7 +77,6 @@ async def run_test():
         # The page text includes the message "Tienes un limite de 4 juegos." but there is no corresponding xpath for that error message in the provided available elements.
         # Report the missing feature/locator and stop the test as instructed.
         raise AssertionError("Unable to verify limit-reached error visibility: no matching xpath provided for the error message 'Tienes un limite de 4 juegos.'")
-        await asyncio.sleep(5)
 
     finally:
         if context:
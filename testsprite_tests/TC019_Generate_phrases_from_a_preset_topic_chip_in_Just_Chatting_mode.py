@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -33,92 +36,76 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Navigate to /sign-in to start authentication.
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Type test@testsprite.dev into the email field (input index 973).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # -> Click the 'Just Chatting' button to activate that mode (element index 1920).
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[3]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Close the Astro debug modal overlay so the dashboard UI is accessible (click the modal close button). After closing the modal, start the generation (press play) and then verify the loading spinner, success checkmark, and text 'Generated phrases'.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/astro-dev-toolbar-app-canvas[1]/astro-dev-toolbar-window/header/astro-dev-toolbar-button/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the play / start generation button to begin message generation and then check for loading spinner, success checkmark, and the text 'Generated phrases'.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the play / start generation button to begin message generation (use current play button index=4280), then observe the UI for loading spinner, success checkmark, and the text 'Generated phrases'.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the Play / Start generation button (use button index=4280), then wait 3 seconds and observe the UI for the loading spinner, success checkmark, and the text 'Generated phrases'.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the 'música' preset chip (index=5203) to ensure it's selected, then click the Play / Start generation button (index=5007), wait 3 seconds, and then extract the page content to check for: 1) loading spinner/indicator, 2) success checkmark, 3) the text 'Generated phrases'.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[3]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the Astro debug modal close button to dismiss the overlay so dashboard controls become accessible (click element index 5008).
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/astro-dev-toolbar-app-canvas[1]/astro-dev-toolbar-window/header/astro-dev-toolbar-button/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the 'música' preset chip (index 7237) to ensure selection, then click the Play / Start generation button (candidate index 7355), wait 3 seconds, and extract the page to check for: (1) loading spinner visible, (2) success checkmark visible, (3) the text 'Generated phrases' present.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[3]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -126,7 +113,6 @@ async def run_test():
         await expect(frame.locator('xpath=//div[contains(@class,"spinner") or contains(@class,"loading") or contains(@aria-label,"cargando")]').first).to_be_visible(timeout=3000)
         await expect(frame.locator('xpath=//svg[contains(@class,"check") or contains(@class,"checkmark") or contains(@aria-label,"success") or contains(.,"✓")]').first).to_be_visible(timeout=3000)
         await expect(frame.locator('text=Generated phrases').first).to_be_visible(timeout=3000)
-        await asyncio.sleep(5)
 
     finally:
         if context:
@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import ready
+
 async def run_test():
     pw = None
     browser = None
@@ -33,100 +36,84 @@ async def run_test():
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
         
-        # -> Navigate to /sign-in (http://localhost:4321/sign-in) to begin authentication.
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Fill the email input with test@testsprite.dev (input element index 917).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
         # -> Click the 'Just Chatting' mode button, enter 'A' into the topic input, then click the submit/start button to trigger validation.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         frame = context.pages[-1]
         # Input text
         elem = frame.locator('xpath=/html/body/div[1]/main/div/astro-island/div/div[1]/div[3]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('A')
+        await ready(elem); await elem.fill('A')
         
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the dashboard start/submit (play) button to trigger validation for the too-short topic.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the dashboard start/submit (play) button to trigger validation for the too-short topic (use a different element index since 2921 failed).
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Close the Astro debug modal (press Escape) and then click the dashboard start/submit (play) button to trigger validation (use a different element index).
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the dashboard start/submit (play) button using a different element index (index 5245), then check the page for the validation message 'Topic must be at least 2 characters' and confirm that no loading spinner is visible.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Ensure debug/modal is closed, click the dashboard start/submit (play) button (use a different element index), then extract the page text to check for the validation message and for any visible loading spinner.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Ensure the debug modal is closed, click the dashboard start/submit (play) button with a fresh element index (7253), then extract the page text to check for the validation message 'Topic must be at least 2 characters' and for any visible loading spinner indicators.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Ensure any debug modal is closed, click the dashboard start/submit (play) button (use element index 8248), then extract the page text to check for the validation message 'Topic must be at least 2 characters' and to detect any visible loading spinner indicators.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Ensure any debug modal is closed, click the dashboard start/submit (play) button using a fresh element index present in the current page, then extract the page text to check for the validation message 'Topic must be at least 2 characters' (and Spanish equivalent) and for any visible loading spinner indicators.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Ensure any debug/modal is closed, then click the dashboard start/submit (play) button using a fresh element index (10584) to trigger validation. After that, extract the visible page text to look for the validation message and for any visible loading spinner indicators.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # -> Click the dashboard start/submit (play) button to trigger validation (use button index 11266). After click, inspect the page for the validation message and for any loading spinner.
         frame = context.pages[-1]
         # Click element
         elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ready(elem); await elem.click(timeout=5000)
         
         # --> Assertions to verify final state
         frame = context.pages[-1]
@@ -137,7 +124,6 @@ async def run_test():
         assert not spinner_visible, "Expected loading spinner to be not visible, but it is visible."
         # The expected validation message 'Topic must be at least 2 characters' is not present in the provided available elements for this page (the app appears to be Spanish).
         raise AssertionError("Validation message 'Topic must be at least 2 characters' not found in available elements — feature may be missing or translated. Test marked done.")
-        await asyncio.sleep(5)
 
     finally:
         if context:
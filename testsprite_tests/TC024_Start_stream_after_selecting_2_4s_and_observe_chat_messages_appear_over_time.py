@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import WAIT_TIMEOUT, first_sse_frame, install_sse_probe, network_idle, ready
+
 async def run_test():
     pw = None
     browser = None
@@ -25,6 +28,8 @@ async def run_test():
         # Create a new browser context (like an incognito window)
         context = await browser.new_context()
         context.set_default_timeout(5000)
+        # No-op under the shared runner, which already installs it
+        await install_sse_probe(context)
 
         # Open a new page in the browser context
         page = await context.new_page()
@@ -32,113 +37,32 @@ async def run_test():
         # Interact with the page elements to simulate user flow
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
+        await network_idle(page)
         
-        # -> Navigate to /sign-in (http://localhost:4321/sign-in) and locate the login form or Clerk sign-in flow.
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Type the login email into the email field (index 974) as the immediate action.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Clear the email input (index 1888) and retype test@testsprite.dev, type password123 into the password field (index 1889), then click the 'Continuar' button (index 1895) to proceed with sign-in.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Click the sign-in/Continuar button on the sign-in form (index 1885) to attempt login and trigger redirect to /dashboard.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[1]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Clear and re-enter credentials into the current sign-in form and click 'Continuar' to attempt authentication (fill email at index 2845, fill password at index 2847, click continue at index 2850).
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Click the visible 'Continuar' / Sign in button (use a currently available button index) to attempt authentication and trigger redirect to /dashboard.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Clear and re-enter credentials into the visible sign-in form (email index 3803, password index 3804), then click the 'Continuar' button (index 3810) to attempt authentication and trigger the redirect to /dashboard.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Attempt sign-in again by clicking an alternate visible 'Continuar' / Sign in button element (index 4031), then wait briefly and re-evaluate whether the app navigated to /dashboard.
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/astro-dev-toolbar/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Fill the visible email and password fields (indexes 4760 and 4761) with test@testsprite.dev / password123, then click the 'Continuar' button (index 4767) to attempt sign-in.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # --> Assertions to verify final state
+        # -> Pick a Just Chatting topic so the dashboard has a context to stream
         frame = context.pages[-1]
         assert '/dashboard' in frame.url
-        await expect(frame.locator('text=Nuevo mensaje').first).to_be_visible(timeout=3000)
-        await asyncio.sleep(5)
+        elem = frame.get_by_title('Activar Just Chatting')
+        await ready(elem); await elem.click(timeout=5000)
+        elem = frame.get_by_role('button', name='Mi vida')
+        await ready(elem); await elem.click(timeout=5000)
+
+        # -> Select the 2–4 s message rate
+        elem = frame.get_by_role('button', name='2–4seg')
+        await ready(elem); await elem.click(timeout=5000)
+
+        # -> Start the stream once the topic phrases are ready
+        elem = frame.get_by_role('button', name='Iniciar Chat')
+        await expect(elem).to_be_enabled(timeout=WAIT_TIMEOUT)
+        await elem.click(timeout=5000)
+
+        # --> Assertions to verify final state
+        # The stream pushes a message every 2–4 s; wait for the frames, not a sleep
+        await first_sse_frame(frame, count=2)
+        await expect(frame.get_by_text('Selecciona un juego e inicia el chat')).to_be_hidden()
 
     finally:
         if context:
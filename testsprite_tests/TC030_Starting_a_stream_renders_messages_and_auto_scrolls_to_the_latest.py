@@ -2,6 +2,9 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
+from auth import sign_in
+from waits import WAIT_TIMEOUT, first_sse_frame, install_sse_probe, network_idle, ready
+
 async def run_test():
     pw = None
     browser = None
@@ -25,6 +28,8 @@ async def run_test():
         # Create a new browser context (like an incognito window)
         context = await browser.new_context()
         context.set_default_timeout(5000)
+        # No-op under the shared runner, which already installs it
+        await install_sse_probe(context)
 
         # Open a new page in the browser context
         page = await context.new_page()
@@ -32,37 +37,31 @@ async def run_test():
         # Interact with the page elements to simulate user flow
         # -> Navigate to http://localhost:4321
         await page.goto("http://localhost:4321", wait_until="commit", timeout=10000)
+        await network_idle(page)
         
-        # -> Click the 'Comenzar Stream' button to proceed to the sign-in/dashboard flow (element index 10).
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div/main/article/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-        # -> Navigate to /sign-in (http://localhost:4321/sign-in) using the required navigate action from the test steps.
-        await page.goto("http://localhost:4321/sign-in", wait_until="commit", timeout=10000)
-        
-        # -> Type the test credentials into the email and password fields, then click the Continue/Sign in button.
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[1]/div/div[1]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@testsprite.dev')
-        
-        frame = context.pages[-1]
-        # Input text
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[1]/div[2]/div/div[1]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestSprite2026!')
-        
-        frame = context.pages[-1]
-        # Click element
-        elem = frame.locator('xpath=/html/body/div[1]/main/article/div/div/div[1]/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Sign in (reuses the saved Clerk session when the runner provides one)
+        await sign_in(page)
         
-        # --> Assertions to verify final state
+        # -> Pick a Just Chatting topic so the dashboard has a context to stream
         frame = context.pages[-1]
         assert '/dashboard' in frame.url
-        await expect(frame.locator('text=Nuevo mensaje').first).to_be_visible(timeout=3000)
-        await asyncio.sleep(5)
+        elem = frame.get_by_title('Activar Just Chatting')
+        await ready(elem); await elem.click(timeout=5000)
+        elem = frame.get_by_role('button', name='Mi vida')
+        await ready(elem); await elem.click(timeout=5000)
+
+        # -> Start the stream once the topic phrases are ready
+        elem = frame.get_by_role('button', name='Iniciar Chat')
+        await expect(elem).to_be_enabled(timeout=WAIT_TIMEOUT)
+        await elem.click(timeout=5000)
+
+        # --> Assertions to verify final state
+        await first_sse_frame(frame, count=2)
+        await expect(frame.get_by_text('Selecciona un juego e inicia el chat')).to_be_hidden()
+        at_bottom = await frame.locator('[data-virtuoso-scroller]').first.evaluate(
+            "(el) => el.scrollTop + el.clientHeight >= el.scrollHeight - 2"
+        )
+        assert at_bottom, 'chat did not auto-scroll to the latest message'
 
     finally:
         if context:
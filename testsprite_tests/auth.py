@@ -0,0 +1,101 @@
+"""Reusable Clerk session for the TestSprite Playwright suite.
+
+Signing in through the Clerk form costs ~10 s and several Clerk round-trips per
+test. Instead the runner signs in once, saves the Playwright ``storage_state``
+(cookies + localStorage) to ``tmp/auth_state.json`` and injects it into every
+context of a test that calls ``sign_in``. The state is reused across runs and
+refreshed when its Clerk client cookies expire or the dashboard redirects back
+to /sign-in.
+
+``sign_in(page)`` is what the tests call: with a valid session it is a single
+navigation to /dashboard; without one it falls back to the form login, so the
+TC files still work when executed on their own.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from waits import WAIT_TIMEOUT
+
+TESTS_DIR = Path(__file__).resolve().parent
+STATE_PATH = TESTS_DIR / "tmp" / "auth_state.json"
+
+BASE_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:4321")
+EMAIL = os.environ.get("TESTSPRITE_EMAIL", "test@testsprite.dev")
+PASSWORD = os.environ.get("TESTSPRITE_PASSWORD", "TestSprite2026!")
+
+# Long-lived Clerk cookies; "__session" is a ~60 s JWT that clerk-js renews
+# from these on every page load, so its own expiry is irrelevant.
+CLERK_CLIENT_COOKIES = ("__client", "__client_uat", "__clerk_db_jwt")
+
+
+async def fill_sign_in_form(page, timeout=WAIT_TIMEOUT):
+    """Completes the Clerk sign-in form on the current page."""
+    identifier = page.locator('input[name="identifier"]')
+    await identifier.wait_for(state="visible", timeout=timeout)
+    await identifier.fill(EMAIL)
+
+    password = page.locator('input[name="password"]')
+    await password.wait_for(state="visible", timeout=timeout)
+    await password.fill(PASSWORD)
+    await password.press("Enter")
+
+
+async def sign_in(page, timeout=WAIT_TIMEOUT):
+    """Lands on /dashboard, using the Clerk form only if the session is gone."""
+    await page.goto(f"{BASE_URL}/dashboard", wait_until="commit", timeout=timeout)
+    if "/sign-in" in page.url:
+        await fill_sign_in_form(page, timeout)
+    await page.wait_for_url("**/dashboard**", timeout=timeout)
+
+
+def _cookies_expired(path):
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return True
+
+    now = time.time()
+    client_cookies = [
+        c for c in state.get("cookies", [])
+        if c.get("name", "").startswith(CLERK_CLIENT_COOKIES)
+    ]
+    if not client_cookies:
+        return True
+    # expires == -1 means a session cookie, which Playwright keeps as is
+    return any(0 < c.get("expires", -1) < now for c in client_cookies)
+
+
+async def _probe(browser, path, timeout):
+    """Opens /dashboard with the saved state and re-saves the rotated cookies."""
+    context = await browser.new_context(storage_state=str(path))
+    try:
+        page = await context.new_page()
+        await page.goto(f"{BASE_URL}/dashboard", wait_until="commit", timeout=timeout)
+        if "/sign-in" in page.url:
+            return False
+        await context.storage_state(path=str(path))
+        return True
+    finally:
+        await context.close()
+
+
+async def ensure_storage_state(browser, path=STATE_PATH, refresh=False, timeout=WAIT_TIMEOUT):
+    """Returns a path to a signed-in storage state, logging in if needed."""
+    if not refresh and path.exists() and not _cookies_expired(path):
+        if await _probe(browser, path, timeout):
+            return path
+
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        await page.goto(f"{BASE_URL}/sign-in", wait_until="commit", timeout=timeout)
+        await fill_sign_in_form(page, timeout)
+        await page.wait_for_url("**/dashboard**", timeout=timeout)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await context.storage_state(path=str(path))
+    finally:
+        await context.close()
+    return path
@@ -0,0 +1,348 @@
+"""SSE load generator for /api/chat-stream.
+
+Opens N concurrent EventSource-style connections, each as a distinct user, and
+reports how the server's stream loop holds up:
+
+- time to first message (connect -> first ``data:`` frame),
+- inter-arrival gaps between chat messages and their jitter, i.e. how far a
+  gap falls outside the requested ``[min, max]`` window,
+- heartbeat regularity (distance of each ``: ping`` gap from the heartbeat
+  period), and
+- dropped connections (non-200 responses, early EOF, socket errors).
+
+With ``--batch`` the server may pack several messages into one event (a JSON
+array); every element counts as a message, gaps are measured between events,
+and the batch sizes get their own histogram. Jitter is only meaningful for
+unbatched streams and is skipped then.
+
+With ``--seed`` connection ``i`` asks for ``?seed=<seed + i>``: every stream
+is still distinct, but two runs with the same seed get the same message
+sequences, so content-dependent costs are comparable between runs. With ``--channel``
+every connection subscribes to the shared channel of its game/mode/preset
+(``?channel=1``), so ``-n`` measures fan-out rather than N generators.
+
+Latencies go into HDR-style log-linear histograms, so memory stays constant
+however long the run is.
+
+Needs only the standard library. The server must run with ``LOADTEST_SECRET``
+set; requests carrying that secret get a synthetic per-connection user from
+the middleware instead of a Clerk session, so no external service is
+involved::
+
+    LOADTEST_SECRET=dev pnpm build && LOADTEST_SECRET=dev pnpm preview
+    python testsprite_tests/load_sse.py -n 300 -d 60 --min 500 --max 1000 --secret dev
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import sys
+import time
+import uuid
+from urllib.parse import urlencode, urlsplit
+
+DEFAULT_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:4321")
+HEARTBEAT_SECONDS = 30.0
+
+
+# ============================================
+# HDR-style histogram
+# ============================================
+
+class Histogram:
+    """Log-linear histogram with bounded relative error (HdrHistogram layout).
+
+    Values are recorded in microseconds. Each power-of-two range is split into
+    ``2 ** sub_bucket_bits`` linear buckets, so the relative error is below
+    ``2 ** -(sub_bucket_bits - 1)`` (< 1% with the default 8 bits).
+    """
+
+    def __init__(self, sub_bucket_bits=8):
+        self._bits = sub_bucket_bits
+        self._counts = {}
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value_ms):
+        micros = max(0, int(value_ms * 1000))
+        shift = max(0, micros.bit_length() - self._bits)
+        key = (shift, micros >> shift)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self.count += 1
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+
+    def percentile(self, pct):
+        if not self.count:
+            return None
+        target = max(1, round(self.count * pct / 100))
+        seen = 0
+        for shift, bucket in sorted(self._counts):
+            seen += self._counts[(shift, bucket)]
+            if seen >= target:
+                # Upper edge of the bucket, like HdrHistogram's highestEquivalentValue
+                return min(self.max, (((bucket + 1) << shift) - 1) / 1000)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min": round(self.min, 2),
+            **{f"p{p:g}": round(self.percentile(p), 2) for p in (50, 90, 99, 99.9)},
+            "max": round(self.max, 2),
+        }
+
+
+# ============================================
+# Minimal HTTP/1.1 + SSE client on asyncio streams
+# ============================================
+
+class ConnectionStats:
+    def __init__(self):
+        self.ttfm = Histogram()
+        self.gaps = Histogram()
+        self.jitter = Histogram()
+        self.heartbeat_drift = Histogram()
+        self.batch_size = Histogram()
+        self.connections = 0
+        self.events = 0
+        self.messages = 0
+        self.heartbeats = 0
+        self.error_events = 0
+        self.dropped = {}
+
+    def drop(self, reason):
+        self.dropped[reason] = self.dropped.get(reason, 0) + 1
+
+
+async def _read_chunked(reader):
+    """Yields body chunks of a chunked transfer-encoded response."""
+    while True:
+        size_line = await reader.readline()
+        if not size_line:
+            return
+        size = int(size_line.split(b";")[0].strip() or b"0", 16)
+        if size == 0:
+            return
+        yield await reader.readexactly(size)
+        await reader.readexactly(2)  # CRLF after each chunk
+
+
+async def _read_plain(reader):
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            return
+        yield data
+
+
+async def open_stream(base_url, params, headers):
+    """Sends the GET and returns ``(status, writer, body_iterator)``."""
+    url = urlsplit(base_url)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    ctx = ssl.create_default_context() if url.scheme == "https" else None
+    reader, writer = await asyncio.open_connection(url.hostname, port, ssl=ctx)
+
+    path = f"{url.path.rstrip('/')}/api/chat-stream?{urlencode(params)}"
+    request_headers = {
+        "Host": url.netloc,
+        "Accept": "text/event-stream",
+        "Cache-Control": "no-cache",
+        **headers,
+    }
+    head = f"GET {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in request_headers.items())
+    writer.write((head + "\r\n").encode())
+    await writer.drain()
+
+    status_line = await reader.readline()
+    status = int(status_line.split()[1]) if status_line else 0
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        response_headers[name.strip().lower()] = value.strip().lower()
+
+    chunked = response_headers.get("transfer-encoding") == "chunked"
+    body = _read_chunked(reader) if chunked else _read_plain(reader)
+    return status, writer, body
+
+
+async def run_connection(index, args, stats, deadline, run_id):
+    user = f"{run_id}-{index}"
+    params = {"game": args.game, "min": args.min, "max": args.max, "mode": args.mode}
+    if args.batch:
+        params["batch"] = f"{args.batch}ms"
+    if args.channel:
+        params["channel"] = 1
+    if args.seed is not None:
+        params["seed"] = (args.seed + index) % 2**32
+    headers = {
+        "x-loadtest-secret": args.secret,
+        "x-loadtest-user": user,
+        # Distinct client IP per connection so the per-IP limiter sees N clients
+        "X-Forwarded-For": f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}",
+    }
+
+    started = time.perf_counter()
+    writer = None
+    try:
+        status, writer, body = await open_stream(args.url, params, headers)
+        if status != 200:
+            stats.drop(f"http {status}")
+            return
+        stats.connections += 1
+
+        buffer = b""
+        last_message = None
+        # The heartbeat phase is global, not per connection: drift is only
+        # meaningful between two pings this connection actually saw
+        last_ping = None
+        async for chunk in _until(body, deadline):
+            buffer += chunk
+            while b"\n\n" in buffer:
+                frame, buffer = buffer.split(b"\n\n", 1)
+                now = time.perf_counter()
+                if frame.startswith(b":"):
+                    stats.heartbeats += 1
+                    if last_ping is not None:
+                        gap = now - last_ping
+                        stats.heartbeat_drift.record(abs(gap - args.heartbeat) * 1000)
+                    last_ping = now
+                    continue
+
+                data = b"\n".join(
+                    line[5:].lstrip() for line in frame.split(b"\n") if line.startswith(b"data:")
+                )
+                if not data:
+                    continue
+                payload = json.loads(data)
+                if isinstance(payload, dict) and payload.get("type") in ("error", "stream-end"):
+                    stats.error_events += 1
+                    continue
+
+                size = len(payload) if isinstance(payload, list) else 1
+                stats.events += 1
+                stats.messages += size
+                if args.batch:
+                    stats.batch_size.record(size)
+                if last_message is None:
+                    stats.ttfm.record((now - started) * 1000)
+                else:
+                    gap_ms = (now - last_message) * 1000
+                    stats.gaps.record(gap_ms)
+                    if not args.batch:
+                        stats.jitter.record(max(0.0, args.min - gap_ms, gap_ms - args.max))
+                last_message = now
+
+        if time.perf_counter() < deadline:
+            stats.drop("eof")
+    except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+        stats.drop(type(exc).__name__)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def _until(body, deadline):
+    """Iterates the body until the deadline, then stops cleanly."""
+    iterator = body.__aiter__()
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        try:
+            yield await asyncio.wait_for(iterator.__anext__(), timeout=remaining)
+        except (StopAsyncIteration, asyncio.TimeoutError):
+            return
+
+
+async def run_load(args):
+    stats = ConnectionStats()
+    run_id = uuid.uuid4().hex[:8]
+    start = time.perf_counter()
+    deadline = start + args.ramp + args.duration
+
+    async def delayed(index):
+        if args.ramp and args.connections > 1:
+            await asyncio.sleep(args.ramp * index / (args.connections - 1))
+        await run_connection(index, args, stats, deadline, run_id)
+
+    await asyncio.gather(*(delayed(i) for i in range(args.connections)))
+    return stats, time.perf_counter() - start
+
+
+def report(stats, elapsed, args):
+    result = {
+        "connections": {"requested": args.connections, "opened": stats.connections},
+        "dropped": stats.dropped,
+        "events": stats.events,
+        "messages": stats.messages,
+        "messages_per_second": round(stats.messages / elapsed, 1) if elapsed else 0,
+        "heartbeats": stats.heartbeats,
+        "error_events": stats.error_events,
+        "ttfm_ms": stats.ttfm.summary(),
+        "inter_arrival_ms": stats.gaps.summary(),
+        "jitter_ms": stats.jitter.summary(),
+        "heartbeat_drift_ms": stats.heartbeat_drift.summary(),
+    }
+    if args.batch:
+        # Recorded as "ms" values, so summaries read as messages per event
+        result["batch_size"] = stats.batch_size.summary()
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"\n{stats.connections}/{args.connections} connections opened, "
+          f"{sum(stats.dropped.values())} dropped {stats.dropped or ''}")
+    print(f"{stats.messages} messages in {stats.events} events ({result['messages_per_second']}/s), "
+          f"{stats.heartbeats} heartbeats, {stats.error_events} error events in {elapsed:.1f}s\n")
+    columns = ["count", "min", "p50", "p90", "p99", "p99.9", "max"]
+    print(f"{'metric (ms)':<22}" + "".join(f"{c:>10}" for c in columns))
+    names = ["ttfm_ms", "inter_arrival_ms", "jitter_ms", "heartbeat_drift_ms"]
+    if args.batch:
+        names.append("batch_size")
+    for name in names:
+        row = result[name]
+        print(f"{name:<22}" + "".join(f"{row.get(c, '-'):>10}" for c in columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent SSE load against /api/chat-stream.")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"server base URL (default {DEFAULT_URL})")
+    parser.add_argument("-n", "--connections", type=int, default=100)
+    parser.add_argument("-d", "--duration", type=float, default=60, help="seconds each stream is held")
+    parser.add_argument("--ramp", type=float, default=0, help="seconds to spread connection opens over")
+    parser.add_argument("--game", default="minecraft")
+    parser.add_argument("--mode", choices=["game", "justchatting"], default="game")
+    parser.add_argument("--min", type=int, default=2000, help="min interval in ms")
+    parser.add_argument("--max", type=int, default=4000, help="max interval in ms")
+    parser.add_argument("--batch", type=int, default=0,
+                        help="request ?batch=<ms> coalescing (0 = one event per message)")
+    parser.add_argument("--channel", action="store_true",
+                        help="subscribe every connection to the shared channel (?channel=1)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed connection i with ?seed=<seed + i> for reproducible content")
+    parser.add_argument("--heartbeat", type=float, default=HEARTBEAT_SECONDS,
+                        help="server heartbeat period in seconds")
+    parser.add_argument("--secret", default=os.environ.get("LOADTEST_SECRET", ""),
+                        help="value of LOADTEST_SECRET on the server")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not args.secret:
+        parser.error("--secret (or LOADTEST_SECRET) is required")
+
+    stats, elapsed = asyncio.run(run_load(args))
+    report(stats, elapsed, args)
+    return 1 if stats.dropped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
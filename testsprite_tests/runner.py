@@ -0,0 +1,284 @@
+"""Shared asyncio runner for the TestSprite Playwright suite.
+
+Every ``TC*.py`` file is a self-contained script: it starts Playwright, launches
+its own Chromium and ends with ``asyncio.run(run_test())``. Running them one by
+one pays a browser cold start per file, so this runner:
+
+- loads each file without executing its trailing ``asyncio.run(...)`` call,
+- launches Chromium once and hands every ``run_test`` body a proxy whose
+  ``launch()`` returns the shared browser,
+- gives each test its own ``BrowserContext`` (cookies, storage and pages stay
+  isolated, with the SSE probe from ``waits.py`` installed), and
+- signs in once and injects the saved Clerk session (see ``auth.py``) into
+  the contexts of tests that call ``sign_in``, and
+- runs the tests concurrently under a configurable cap, aggregating the
+  outcome into ``tmp/test_results.json``.
+
+Usage::
+
+    python testsprite_tests/runner.py                 # all TC*.py files
+    python testsprite_tests/runner.py -w 8 TC00*      # glob filter, 8 workers
+"""
+
+import argparse
+import ast
+import asyncio
+import fnmatch
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from datetime import datetime, timezone
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from auth import ensure_storage_state
+from waits import install_sse_probe
+
+TESTS_DIR = Path(__file__).resolve().parent
+RESULTS_PATH = TESTS_DIR / "tmp" / "test_results.json"
+
+DEFAULT_WORKERS = int(os.environ.get("TESTSPRITE_WORKERS", os.cpu_count() or 4))
+DEFAULT_TIMEOUT = float(os.environ.get("TESTSPRITE_TIMEOUT", 180))
+
+# Same flags the generated tests use, minus "--single-process": a single
+# renderer process cannot host many concurrent contexts reliably.
+BROWSER_ARGS = [
+    "--window-size=1280,720",
+    "--disable-dev-shm-usage",
+    "--ipc=host",
+]
+
+
+# ============================================
+# Proxies handed to the generated run_test()
+# ============================================
+
+class SharedBrowser:
+    """Looks like a ``Browser`` to a test but never closes the real one."""
+
+    def __init__(self, browser, context_options):
+        self._browser = browser
+        self._context_options = context_options
+        self._contexts = []
+
+    async def new_context(self, **kwargs):
+        context = await self._browser.new_context(**{**self._context_options, **kwargs})
+        await install_sse_probe(context)
+        self._contexts.append(context)
+        return context
+
+    async def close(self):
+        # Only the contexts this test opened are torn down
+        contexts, self._contexts = self._contexts, []
+        for context in contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    def __getattr__(self, name):
+        return getattr(self._browser, name)
+
+
+class SharedChromium:
+    def __init__(self, browser):
+        self._browser = browser
+
+    async def launch(self, **_kwargs):
+        return self._browser
+
+
+class SharedPlaywright:
+    def __init__(self, browser):
+        self.chromium = SharedChromium(browser)
+
+    async def stop(self):
+        pass
+
+
+class SharedPlaywrightHandle:
+    def __init__(self, browser):
+        self._browser = browser
+
+    async def start(self):
+        return SharedPlaywright(self._browser)
+
+
+class SharedAsyncApi:
+    """Stand-in for the ``playwright.async_api`` module inside a test."""
+
+    def __init__(self, browser):
+        self._browser = browser
+
+    def async_playwright(self):
+        return SharedPlaywrightHandle(self._browser)
+
+
+# ============================================
+# Loading and running the generated tests
+# ============================================
+
+def _is_asyncio_run(node):
+    """True for a top-level ``asyncio.run(...)`` expression statement."""
+    if not isinstance(node, ast.Expr) or not isinstance(node.value, ast.Call):
+        return False
+    func = node.value.func
+    return (
+        isinstance(func, ast.Attribute)
+        and func.attr == "run"
+        and isinstance(func.value, ast.Name)
+        and func.value.id == "asyncio"
+    )
+
+
+def load_test(path):
+    """Executes a TC file's definitions and returns its module namespace."""
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    tree.body = [node for node in tree.body if not _is_asyncio_run(node)]
+    namespace = {"__name__": path.stem, "__file__": str(path)}
+    exec(compile(tree, str(path), "exec"), namespace)
+    if "run_test" not in namespace:
+        raise RuntimeError(f"{path.name} does not define run_test()")
+    return namespace
+
+
+def discover(patterns):
+    files = sorted(TESTS_DIR.glob("TC*.py"))
+    if not patterns:
+        return files
+    return [
+        f for f in files
+        if any(fnmatch.fnmatch(f.name, p) or fnmatch.fnmatch(f.stem, p) for p in patterns)
+    ]
+
+
+def _error_summary(exc):
+    lines = traceback.format_exception_only(type(exc), exc)
+    return "".join(lines).strip()
+
+
+def _uses_sign_in(path):
+    return "sign_in(" in path.read_text(encoding="utf-8")
+
+
+async def run_one(path, browser, semaphore, timeout, storage_state):
+    async with semaphore:
+        started = time.perf_counter()
+        context_options = {}
+        if storage_state and _uses_sign_in(path):
+            context_options["storage_state"] = str(storage_state)
+        shared = SharedBrowser(browser, context_options)
+        status, error = "PASSED", ""
+        try:
+            namespace = load_test(path)
+            namespace["async_api"] = SharedAsyncApi(shared)
+            await asyncio.wait_for(namespace["run_test"](), timeout=timeout)
+        except asyncio.TimeoutError:
+            status, error = "FAILED", f"Timed out after {timeout:.0f}s"
+        except Exception as exc:
+            status, error = "FAILED", _error_summary(exc)
+        finally:
+            await shared.close()
+        duration_ms = round((time.perf_counter() - started) * 1000)
+        print(f"[{status}] {path.stem} ({duration_ms} ms){': ' + error if error else ''}", flush=True)
+        return {"file": path.name, "testStatus": status, "testError": error, "durationMs": duration_ms}
+
+
+async def run_suite(files, workers, timeout, use_auth_state=True, refresh_auth=False):
+    semaphore = asyncio.Semaphore(max(1, workers))
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True, args=BROWSER_ARGS)
+        try:
+            storage_state = None
+            if use_auth_state and any(_uses_sign_in(path) for path in files):
+                storage_state = await ensure_storage_state(browser, refresh=refresh_auth)
+            return await asyncio.gather(*(
+                run_one(path, browser, semaphore, timeout, storage_state)
+                for path in files
+            ))
+        finally:
+            await browser.close()
+
+
+# ============================================
+# Aggregated results
+# ============================================
+
+def _title_key(text):
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def write_results(results, output):
+    """Merges run results into the TestSprite results file.
+
+    Entries already present (matched by title) keep their TestSprite metadata
+    and only get status, error and timing updated; new files are appended.
+    """
+    existing = []
+    if output.exists():
+        try:
+            existing = json.loads(output.read_text(encoding="utf-8"))
+        except ValueError:
+            existing = []
+
+    by_title = {_title_key(entry.get("title", "")): entry for entry in existing}
+    now = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    for result in results:
+        stem = Path(result["file"]).stem
+        entry = by_title.get(_title_key(stem))
+        if entry is None:
+            entry = {
+                "title": stem.replace("_", "-", 1).replace("_", " "),
+                "testType": "FRONTEND",
+                "createFrom": "runner",
+                "created": now,
+            }
+            existing.append(entry)
+            by_title[_title_key(stem)] = entry
+        entry.update(result, modified=now)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(existing, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the TestSprite suite on one shared browser.")
+    parser.add_argument("patterns", nargs="*", help="glob filters over TC file names")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"max concurrent tests (default {DEFAULT_WORKERS})")
+    parser.add_argument("-t", "--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"per-test timeout in seconds (default {DEFAULT_TIMEOUT:.0f})")
+    parser.add_argument("-o", "--output", type=Path, default=RESULTS_PATH,
+                        help="results file to update")
+    parser.add_argument("--no-auth-state", action="store_true",
+                        help="sign in through the UI in every test")
+    parser.add_argument("--refresh-auth", action="store_true",
+                        help="discard the saved Clerk session and sign in again")
+    args = parser.parse_args(argv)
+
+    files = discover(args.patterns)
+    if not files:
+        print("No tests matched", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    results = asyncio.run(run_suite(
+        files, args.workers, args.timeout,
+        use_auth_state=not args.no_auth_state, refresh_auth=args.refresh_auth,
+    ))
+    write_results(results, args.output)
+
+    failed = sum(1 for r in results if r["testStatus"] != "PASSED")
+    elapsed = time.perf_counter() - started
+    print(f"\n{len(results) - failed}/{len(results)} passed in {elapsed:.1f}s "
+          f"({args.workers} workers) -> {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Event-driven waits for the TestSprite Playwright suite.
+
+The generated tests used to sleep a fixed 3 s before every action. These
+helpers wait on something observable instead, so a step takes exactly as long
+as the app needs:
+
+- ``ready(locator)``: the element reaches a state (visible by default).
+- ``network_idle(page)``: no requests in flight for 500 ms. Never resolves
+  while an SSE stream is open, so use ``first_sse_frame`` on the dashboard.
+- ``first_sse_frame(page)``: the page's EventSource received a ``data:``
+  frame. Needs ``install_sse_probe(context)`` before the first navigation
+  (the shared runner installs it on every context).
+
+Run as a script to list the fixed sleeps left in the suite::
+
+    python testsprite_tests/waits.py            # report, exit 1 if any
+    python testsprite_tests/waits.py TC024*     # only matching files
+"""
+
+import ast
+import fnmatch
+import sys
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parent
+
+# Upper bound for a single wait; the common case returns as soon as the
+# condition holds. Generous because `astro dev` compiles pages on first hit.
+WAIT_TIMEOUT = 15_000
+
+# Counts EventSource "message" events in window.__sseFrames
+SSE_PROBE_SCRIPT = """
+(() => {
+  if (window.__sseProbe || typeof window.EventSource !== 'function') return;
+  window.__sseProbe = true;
+  window.__sseFrames = 0;
+  const Native = window.EventSource;
+  window.EventSource = class extends Native {
+    constructor(...args) {
+      super(...args);
+      this.addEventListener('message', () => { window.__sseFrames += 1; });
+    }
+  };
+})();
+"""
+
+
+async def ready(locator, state="visible", timeout=WAIT_TIMEOUT):
+    """Waits until the locator reaches ``state`` and returns it."""
+    await locator.wait_for(state=state, timeout=timeout)
+    return locator
+
+
+async def network_idle(page, timeout=WAIT_TIMEOUT):
+    await page.wait_for_load_state("networkidle", timeout=timeout)
+
+
+async def install_sse_probe(context):
+    await context.add_init_script(SSE_PROBE_SCRIPT)
+
+
+async def first_sse_frame(page, count=1, timeout=WAIT_TIMEOUT):
+    """Waits until the page has received ``count`` SSE ``data:`` frames."""
+    await page.wait_for_function(
+        "(n) => (window.__sseFrames || 0) >= n", arg=count, timeout=timeout
+    )
+
+
+# ============================================
+# Lint: fixed sleeps left in the suite
+# ============================================
+
+FIXED_SLEEPS = {"wait_for_timeout", "sleep"}
+
+
+def find_fixed_sleeps(path):
+    """Returns ``(line, call)`` for every fixed sleep call in a file."""
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    hits = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+            continue
+        if node.func.attr in FIXED_SLEEPS:
+            hits.append((node.lineno, ast.unparse(node)))
+    return sorted(hits)
+
+
+def main(argv=None):
+    patterns = (argv if argv is not None else sys.argv[1:]) or ["TC*.py"]
+    files = [
+        f for f in sorted(TESTS_DIR.glob("*.py"))
+        if any(fnmatch.fnmatch(f.name, p) or fnmatch.fnmatch(f.stem, p) for p in patterns)
+    ]
+
+    total = 0
+    for path in files:
+        for line, call in find_fixed_sleeps(path):
+            print(f"{path.name}:{line}: {call}")
+            total += 1
+
+    print(f"{total} fixed sleep(s) in {len(files)} file(s)")
+    return 1 if total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())